@@ -4,7 +4,6 @@ ScoutPulse Assembly Line - Automated Feature Development System
 Systematically builds features, tests, and deploys improvements
 """
 
-import subprocess
 import json
 import os
 import time
@@ -12,6 +11,9 @@ from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from quality_gates import GateRunner, gate
+from repo_index import get_repo_index
+
 class AssemblyLine:
     def __init__(self, project_path=None):
         self.project_path = Path(project_path or os.getcwd())
@@ -123,77 +125,52 @@ class AssemblyLine:
         
         return all_passed
     
+    def quality_gates(self) -> List[Dict]:
+        """Build, type check, tests and lint, slowest first so the total approaches the slowest gate"""
+        def type_errors(lines):
+            errors = [line for line in lines if "error TS" in line]
+            if not errors:
+                return "\n".join(lines[-10:])[:500]
+            return f"{len(errors)} type errors: {'; '.join(errors[:5])}"
+
+        return [
+            gate("build", ["npm", "run", "build"], timeout=300,
+                 passed="Build successful", failed="Build failed",
+                 summarise=lambda lines: "\n".join(lines[-15:])[:500]),
+            # Reuses tsconfig.tsbuildinfo from earlier runs
+            gate("types", ["npx", "tsc", "--noEmit", "--incremental", "--pretty", "false"], timeout=300,
+                 missing_ok=True, passed="No type errors", failed="Type check failed", summarise=type_errors),
+            gate("tests", ["npm", "test"], timeout=60, hard=False, missing_ok=True,
+                 passed="All tests passed", failed="Some tests failed",
+                 summarise=lambda lines: "\n".join(lines[-10:])[:200]),
+            gate("lint", ["npm", "run", "lint"], timeout=120, hard=False, missing_ok=True,
+                 passed="No linting errors", failed="Linting issues found",
+                 summarise=lambda lines: "\n".join(lines[-10:])[:300]),
+        ]
+    
+    def run_quality_gates(self, names: Optional[List[str]] = None, force: bool = False) -> Dict[str, Dict]:
+        """Run the named gates (default: all) concurrently; {name: result}
+
+        Gates reuse their last verdict while the project tree is unchanged, unless force is set.
+        """
+        gates = [g for g in self.quality_gates() if names is None or g["name"] in names]
+        return GateRunner(str(self.project_path), log=self.log, force=force).run(gates)
+    
     def run_tests(self) -> bool:
         """Run project tests"""
-        self.log("Running tests...")
-        try:
-            result = subprocess.run(
-                ["npm", "test"],
-                cwd=self.project_path,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            if result.returncode == 0:
-                self.log("✅ All tests passed")
-                return True
-            else:
-                self.log(f"⚠️  Some tests failed: {result.stderr[:200]}", "WARN")
-                return False
-        except subprocess.TimeoutExpired:
-            self.log("⚠️  Tests timed out", "WARN")
-            return False
-        except FileNotFoundError:
-            self.log("⚠️  Test script not found, skipping", "WARN")
-            return True  # Not a blocker
+        return self.run_quality_gates(["tests"])["tests"]["ok"]
     
     def check_build(self) -> bool:
         """Check if project builds successfully"""
-        self.log("Checking build...")
-        try:
-            result = subprocess.run(
-                ["npm", "run", "build"],
-                cwd=self.project_path,
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
-            if result.returncode == 0:
-                self.log("✅ Build successful")
-                return True
-            else:
-                self.log(f"❌ Build failed: {result.stderr[:500]}", "ERROR")
-                return False
-        except subprocess.TimeoutExpired:
-            self.log("⚠️  Build timed out", "WARN")
-            return False
-        except Exception as e:
-            self.log(f"⚠️  Build check error: {e}", "WARN")
-            return False
+        return self.run_quality_gates(["build"])["build"]["ok"]
+    
+    def check_types(self) -> bool:
+        """Type-check the project"""
+        return self.run_quality_gates(["types"])["types"]["ok"]
     
     def check_linter(self) -> bool:
         """Check for linting errors"""
-        self.log("Checking linter...")
-        try:
-            result = subprocess.run(
-                ["npm", "run", "lint"],
-                cwd=self.project_path,
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            if result.returncode == 0:
-                self.log("✅ No linting errors")
-                return True
-            else:
-                self.log(f"⚠️  Linting issues found: {result.stdout[:300]}", "WARN")
-                return False
-        except FileNotFoundError:
-            self.log("⚠️  Linter not configured, skipping", "WARN")
-            return True
-        except Exception as e:
-            self.log(f"⚠️  Linter check error: {e}", "WARN")
-            return False
+        return self.run_quality_gates(["lint"])["lint"]["ok"]
     
     def analyze_codebase(self) -> Dict:
         """Analyze current codebase state"""
@@ -207,24 +184,16 @@ class AssemblyLine:
             "issues": []
         }
         
+        index = get_repo_index(self.project_path)
+        
         # Count routes
-        app_path = self.project_path / "app"
-        if app_path.exists():
-            for pattern in ["*.tsx", "*.ts"]:
-                routes = list(app_path.rglob(f"**/page.{pattern}"))
-                analysis["routes"] += len(routes)
+        analysis["routes"] = index.count("app", (".tsx", ".ts"), pattern="page.*")
         
         # Count components
-        components_path = self.project_path / "components"
-        if components_path.exists():
-            for pattern in ["*.tsx", "*.ts"]:
-                components = list(components_path.rglob(pattern))
-                analysis["components"] += len(components)
+        analysis["components"] = index.count("components", (".tsx", ".ts"))
         
         # Count migrations
-        migrations_path = self.project_path / "supabase" / "migrations"
-        if migrations_path.exists():
-            analysis["migrations"] = len(list(migrations_path.glob("*.sql")))
+        analysis["migrations"] = index.count("supabase/migrations", ".sql", recursive=False)
         
         self.log(f"  Found {analysis['routes']} routes, {analysis['components']} components, {analysis['migrations']} migrations")
         
@@ -251,8 +220,8 @@ class AssemblyLine:
         
         return plan
     
-    def start_assembly_line(self):
-        """Start the assembly line process"""
+    def start_assembly_line(self, force: bool = False):
+        """Start the assembly line process (force: rerun quality gates even if nothing changed)"""
         print("=" * 70)
         print("🏭 SCOUTPULSE ASSEMBLY LINE")
         print("=" * 70)
@@ -280,8 +249,11 @@ class AssemblyLine:
         
         # Step 5: Run quality checks
         self.log("Running quality checks...")
-        build_ok = self.check_build()
-        lint_ok = self.check_linter()
+        gates = self.run_quality_gates(force=force)
+        build_ok = gates["build"]["ok"]
+        types_ok = gates["types"]["ok"]
+        tests_ok = gates["tests"]["ok"]
+        lint_ok = gates["lint"]["ok"]
         print()
         
         # Step 6: Display plan
@@ -315,7 +287,9 @@ class AssemblyLine:
         print("📊 Status:")
         print(f"  • Codebase: {analysis['routes']} routes, {analysis['components']} components")
         print(f"  • Build: {'✅' if build_ok else '❌'}")
-        print(f"  • Linter: {'✅' if lint_ok else '⚠️'}")
+        print(f"  • Types: {'⏭️' if types_ok is None else '✅' if types_ok else '❌'}")
+        print(f"  • Tests: {'⏭️' if tests_ok is None else '✅' if tests_ok else '⚠️'}")
+        print(f"  • Linter: {'⏭️' if lint_ok is None else '✅' if lint_ok else '⚠️'}")
         print(f"  • Features Queued: {len(features)}")
         print(f"  • Estimated Time: {plan['estimated_total_hours']} hours")
         print()
@@ -350,7 +324,10 @@ class AssemblyLine:
             },
             "status": {
                 "build_ok": build_ok,
-                "lint_ok": lint_ok
+                "types_ok": types_ok,
+                "tests_ok": tests_ok,
+                "lint_ok": lint_ok,
+                "gate_seconds": {name: result["seconds"] for name, result in gates.items()}
             }
         }
         plan_file.write_text(json.dumps(plan_data, indent=2))
@@ -383,16 +360,17 @@ def main():
     import sys
     
     assembly_line = AssemblyLine()
+    args = [arg for arg in sys.argv[1:] if arg != "--force"]
     
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
-        if command == "build" and len(sys.argv) > 2:
-            feature_id = sys.argv[2]
+    if args:
+        command = args[0]
+        if command == "build" and len(args) > 1:
+            feature_id = args[1]
             assembly_line.build_feature(feature_id)
         else:
-            print("Usage: python3 assembly_line.py [build <feature-id>]")
+            print("Usage: python3 assembly_line.py [--force] [build <feature-id>]")
     else:
-        assembly_line.start_assembly_line()
+        assembly_line.start_assembly_line(force="--force" in sys.argv)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,118 @@
+"""
+ScoutPulse Audit Engine
+Sends every audit category to Claude at once instead of one at a time
+"""
+
+import asyncio
+import time
+
+import anthropic
+
+from audit_prompts import PromptCacheStats
+from rate_limiter import get_rate_limiter
+from task_extraction import MAX_REPORT_TOKENS, REPORT_ISSUES_TOOL, TOOL_CHOICE, is_truncated, response_text
+
+
+class AuditEngine:
+    def __init__(self, api_key, model="claude-sonnet-4-20250514", max_tokens=4000,
+                 concurrency=5, max_retries=3, cache=None, rate_limiter=None):
+        self.api_key = api_key
+        self.cache = cache
+        self.model = model
+        self.max_tokens = max_tokens
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.failed = []
+        self.cache_stats = PromptCacheStats()
+
+    async def audit_category(self, client, semaphore, index, total, category, prompt, tree_hash, system):
+        """Run one audit category, retrying it on its own if it fails"""
+        request = dict(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            tools=[REPORT_ISSUES_TOOL],
+            tool_choice=TOOL_CHOICE,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        if system:
+            request['system'] = system
+
+        cache_key = None
+        if self.cache and tree_hash:
+            cache_key = self.cache.key(request, tree_hash)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"⚡ {index}/{total} - {category} (cached)")
+                return cached
+
+        for attempt in range(1, self.max_retries + 1):
+            async with semaphore:
+                try:
+                    start = time.monotonic()
+                    response = await self.rate_limiter.create_async(client, **request)
+                    self.cache_stats.record(category, response.usage, time.monotonic() - start)
+                    if is_truncated(response):
+                        if request['max_tokens'] < MAX_REPORT_TOKENS and attempt < self.max_retries:
+                            request['max_tokens'] = min(request['max_tokens'] * 2, MAX_REPORT_TOKENS)
+                            print(f"⚠️  {category} report hit max_tokens - retrying with {request['max_tokens']}")
+                            continue
+                        print(f"❌ {category} report was truncated at max_tokens - dropping the partial issue list")
+                        return None
+                    print(f"✅ {index}/{total} - {category} audited")
+                    text = response_text(response)
+                    if cache_key:
+                        self.cache.put(cache_key, text, response.stop_reason)
+                    return text
+                except anthropic.APIError as e:
+                    print(f"⚠️  {category} failed (attempt {attempt}/{self.max_retries}): {e}")
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self.rate_limiter.backoff_delay(attempt))
+
+        return None
+
+    async def run_async(self, audit_prompts, tree_hash=None, system=None):
+        """Audit all categories concurrently, keeping results in category order
+
+        With a cached system prefix, the first category runs alone so it writes
+        the prompt cache, and the remaining categories all read from it.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        total = len(audit_prompts)
+        self.cache_stats = PromptCacheStats()
+
+        print(f"🚀 Auditing {total} categories ({self.concurrency} at a time)...")
+
+        jobs = [
+            (i, category, prompt)
+            for i, (category, prompt) in enumerate(audit_prompts, 1)
+        ]
+
+        # The async client is bound to the running event loop, so open it per run
+        async with anthropic.AsyncAnthropic(api_key=self.api_key) as client:
+            results = []
+            if system and jobs:
+                i, category, prompt = jobs.pop(0)
+                results.append(await self.audit_category(
+                    client, semaphore, i, total, category, prompt, tree_hash, system
+                ))
+
+            results += await asyncio.gather(*[
+                self.audit_category(client, semaphore, i, total, category, prompt, tree_hash, system)
+                for i, category, prompt in jobs
+            ])
+
+        audits = []
+        self.failed = []
+        for (category, _), text in zip(audit_prompts, results):
+            if text is None:
+                self.failed.append(category)
+            else:
+                audits.append((category, text))
+
+        return audits
+
+    def run(self, audit_prompts, tree_hash=None, system=None):
+        """Blocking wrapper around run_async"""
+        return asyncio.run(self.run_async(audit_prompts, tree_hash, system))
@@ -0,0 +1,144 @@
+"""
+ScoutPulse Audit Prompts
+Shared, cacheable project context for the audit categories plus per-run
+prompt-cache reporting. Each audit sends this prefix as a cached system
+block and only its own category checklist as the user message. The prefix
+is padded with the project tree when it would be too short to cache
+"""
+
+import json
+import time
+
+from rate_limiter import estimate_tokens
+from repo_index import get_repo_index
+
+# Shorter prefixes are silently not cached by the API (Sonnet's minimum)
+MIN_CACHEABLE_TOKENS = 1024
+PREFIX_HEADROOM = 256  # estimate_tokens is approximate
+
+AUDIT_CONTEXT = """You are auditing ScoutPulse, a baseball recruiting platform, for production readiness.
+
+PROJECT ROOT: {project_path}
+All file paths you report must be relative to the project root (e.g. app/(dashboard)/player/page.tsx).
+
+# STACK
+- Next.js (App Router) with React 18 and TypeScript in strict mode
+- Tailwind CSS, Radix UI primitives, class-variance-authority variants
+- Framer Motion for animation, lucide-react (primary) and @heroicons/react for icons
+- Supabase for Postgres, Auth, Storage and Realtime (@supabase/ssr, @supabase/supabase-js)
+- Vitest for unit tests (tests/), Playwright for e2e (e2e/)
+
+# LAYOUT
+- app/(auth)/ and app/auth/ - login, signup, forgot/reset password, email verification
+- app/(onboarding)/ - multi-step onboarding for players and coaches
+- app/(dashboard)/player/ - player dashboard, profile, team, journey, discover, camps, messages, notifications
+- app/(dashboard)/coach/college/ - college coach dashboard, discover, watchlist, recruiting-planner,
+  calendar, camps, program, teams/[teamId], messages, notifications, settings
+- app/(dashboard)/coach/high-school/, coach/juco/, coach/showcase/ - team, roster, transfer portal, messages
+- app/(public)/profile/[id] - public player profile; app/join/[code] - team invites
+- app/api/ - route handlers
+- components/ui/ - shared Glass* components (GlassCard, GlassButton, GlassInput, GlassModal,
+  GlassDropdown, GlassToast, GlassSkeleton, GlassTooltip, ...), EmptyState, LoadingStates, PageTransition
+- components/<feature>/ - feature components (player, coach, recruiting, messaging, notifications, ...)
+- lib/ - glassmorphism.ts and glassmorphism-enhanced.ts (style tokens), animations.ts, routes.ts,
+  supabase/ clients, queries/, schemas/, hooks/, errors/, utils
+- supabase/migrations/ - SQL schema
+
+# USER ROLES
+- Player: dashboard with stats, editable + public profile, Team Hub, College Journey timeline,
+  video uploads, stats tracking, notifications
+- College coach: analytics dashboard, Discover with map, Watchlist/Pipeline, Recruiting Planner
+  (diamond view), calendar, player profiles, messaging, program page
+- High school / showcase coach: roster management, player tracking, college engagement
+- JUCO coach: transfer portal, player database
+Players must only see player views and coaches only coach views; protected routes redirect to login.
+
+# DESIGN SYSTEM
+- Glassmorphism everywhere: backdrop-blur-2xl (blur 24px), bg-white/5 to bg-white/15 backgrounds,
+  border-white/15 borders, soft tinted shadows, rounded-xl cards
+- Use the shared tokens from lib/glassmorphism.ts / lib/glassmorphism-enhanced.ts and the Glass*
+  components instead of ad-hoc classes
+- Colours: emerald #10B981 (primary), blue #0EA5E9, purple #A855F7, amber #F59E0B,
+  cyan #06B6D4 (JUCO), violet #8B5CF6 (showcase), over dark green gradients
+- Motion: hover lift (-translate-y-1 + stronger shadow), smooth page transitions, count-up numbers,
+  skeleton loaders instead of spinners, spring physics; respect prefers-reduced-motion
+- Every data view needs loading, empty, error and success states
+
+# PRIORITY SCALE
+- CRITICAL: broken build, crash, data loss, security or auth hole, core flow unusable
+- HIGH: a main feature is missing or broken, or a page is visibly unfinished
+- MEDIUM: inconsistent styling, missing states, accessibility or performance problems with workarounds
+- LOW: polish, naming, minor refactors
+
+# RULES
+- Report concrete, verifiable problems tied to a specific file; never invent files you cannot justify
+- One issue per finding; do not repeat the same problem under different wording
+- Prefer the smallest fix that resolves the issue and matches existing patterns
+- Be specific about what to change so a developer (or another model) can act without follow-up questions
+"""
+
+def build_audit_system(project_path, output_format="", shared_files="", tools=()):
+    """Cached system prefix shared by every audit category
+
+    The cached prefix is the tool definitions plus this system block. If that
+    is not comfortably over MIN_CACHEABLE_TOKENS, the project's directory tree is added so the
+    breakpoint actually produces cache writes and reads.
+    """
+    text = AUDIT_CONTEXT.format(project_path=project_path) + output_format + shared_files
+    tool_tokens = estimate_tokens(json.dumps(list(tools)))
+    if tool_tokens + estimate_tokens(text) < MIN_CACHEABLE_TOKENS + PREFIX_HEADROOM:
+        text += "\n# PROJECT TREE\n" + get_repo_index(project_path).tree(2) + "\n"
+
+    block = {"type": "text", "text": text}
+    prefix_tokens = tool_tokens + estimate_tokens(text)
+    if prefix_tokens >= MIN_CACHEABLE_TOKENS:
+        block["cache_control"] = {"type": "ephemeral"}
+    else:
+        print(f"⚠️  Audit prefix is ~{prefix_tokens} tokens, below the {MIN_CACHEABLE_TOKENS}-token "
+              f"caching minimum - sending it uncached")
+    return [block]
+
+
+class PromptCacheStats:
+    """Collects per-category prompt cache usage and latency for one run"""
+
+    def __init__(self):
+        self.rows = []
+
+    def record(self, category, usage, seconds):
+        self.rows.append({
+            'category': category,
+            'seconds': seconds,
+            'input': getattr(usage, 'input_tokens', 0) or 0,
+            'cache_write': getattr(usage, 'cache_creation_input_tokens', 0) or 0,
+            'cache_read': getattr(usage, 'cache_read_input_tokens', 0) or 0,
+        })
+
+    def timed_call(self, category, create):
+        """Run create(), record its usage and latency, and return the response"""
+        start = time.monotonic()
+        response = create()
+        self.record(category, getattr(response, 'usage', None), time.monotonic() - start)
+        return response
+
+    def report(self):
+        if not self.rows:
+            return
+
+        print("\n📦 PROMPT CACHE")
+        print(f"  {'CATEGORY':<15} {'RESULT':<7} {'READ':>8} {'WRITE':>8} {'UNCACHED':>9} {'TIME':>7}")
+        for row in self.rows:
+            result = 'hit' if row['cache_read'] else ('write' if row['cache_write'] else 'miss')
+            print(f"  {row['category']:<15} {result:<7} {row['cache_read']:>8} {row['cache_write']:>8} "
+                  f"{row['input']:>9} {row['seconds']:>6.1f}s")
+
+        hits = sum(1 for row in self.rows if row['cache_read'])
+        read = sum(row['cache_read'] for row in self.rows)
+        written = sum(row['cache_write'] for row in self.rows)
+        # Cache reads bill at 10% of the base input price, cache writes at 125%
+        saved = int(read * 0.9 - written * 0.25)
+        print(f"  {hits}/{len(self.rows)} cache hits, {read} tokens served from cache "
+              f"(~{saved} input tokens saved)")
+        if not written and not read:
+            print(f"  ⚠️  No request wrote or read the prompt cache - the cached prefix is probably "
+                  f"below the {MIN_CACHEABLE_TOKENS}-token minimum or changes between requests")
@@ -14,7 +14,7 @@ Usage:
 import argparse
 import json
 import os
-import subprocess
+import sys
 import time
 from pathlib import Path
 from datetime import datetime
@@ -27,10 +27,18 @@ PROJECT_ROOT = Path(__file__).parent.parent
 AGENT_DIR = PROJECT_ROOT / "autonomous-agent"
 DELAY_BETWEEN_SESSIONS = 10  # seconds
 
+# The IDE transport is shared with the ScoutPulse tooling at the repo root
+sys.path.insert(0, str(PROJECT_ROOT))
+from ide_transport import get_transport  # noqa: E402
+
 
 def send_to_cursor(prompt: str) -> bool:
     """
-    Send a prompt to Cursor using AppleScript.
+    Send a prompt to Cursor through the shared IDE transport.
+    
+    The default transport pastes the whole prompt through a long-lived
+    osascript driver; set IDE_TRANSPORT=queue to drop prompts into a
+    file queue instead (headless hosts, tests).
     
     Args:
         prompt: The prompt to send
@@ -38,46 +46,7 @@ def send_to_cursor(prompt: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    # Escape special characters for AppleScript
-    escaped_prompt = prompt.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
-    
-    apple_script = f'''
-    tell application "Cursor"
-        activate
-        delay 1
-    end tell
-    
-    tell application "System Events"
-        tell process "Cursor"
-            -- Open chat (Cmd+L)
-            keystroke "l" using {{command down}}
-            delay 0.5
-            
-            -- Clear any existing text
-            keystroke "a" using {{command down}}
-            delay 0.2
-            
-            -- Type the prompt
-            keystroke "{escaped_prompt}"
-            delay 0.5
-            
-            -- Send (Enter)
-            keystroke return
-        end tell
-    end tell
-    '''
-    
-    try:
-        subprocess.run(
-            ["osascript", "-e", apple_script],
-            check=True,
-            capture_output=True,
-            text=True
-        )
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"AppleScript error: {e.stderr}")
-        return False
+    return get_transport(PROJECT_ROOT).send(prompt)
 
 
 def build_improvement_prompt(improvement: dict) -> str:
@@ -5,65 +5,36 @@ Uses Anthropic API + AppleScript to control Cursor IDE directly
 """
 
 import anthropic
-import subprocess
 import time
 import os
 import sys
 
+from completion_watcher import CompletionWatcher, paths_in
+from ide_transport import get_transport
+
 class ScoutPulseAutonomousBuilder:
     def __init__(self, api_key, scoutpulse_path):
         self.client = anthropic.Anthropic(api_key=api_key)
         self.scoutpulse_path = scoutpulse_path
         self.conversation_history = []
+        self.watcher = CompletionWatcher(scoutpulse_path)
+        self.transport = get_transport(scoutpulse_path)
         
     def open_cursor(self):
         """Open Cursor and load ScoutPulse project"""
         print("🚀 Opening Cursor...")
         
-        applescript = f'''
-        tell application "Cursor"
-            activate
-        end tell
-        
-        delay 2
-        
-        tell application "System Events"
-            keystroke "o" using {{command down}}
-            delay 1
-            keystroke "{self.scoutpulse_path}"
-            delay 0.5
-            keystroke return
-        end tell
-        '''
-        
-        subprocess.run(['osascript', '-e', applescript])
+        self.transport.open_project(self.scoutpulse_path)
         time.sleep(3)
         
     def send_to_cursor_ai(self, prompt):
-        """Send prompt to Cursor AI using keyboard automation"""
+        """Send prompt to Cursor AI (pasted in one go, however long it is)"""
         print(f"💬 Sending to Cursor AI: {prompt[:80]}...")
         
-        applescript = f'''
-        tell application "Cursor"
-            activate
-        end tell
-        
-        tell application "System Events"
-            keystroke "l" using {{command down}}
-            delay 1
-            keystroke "{prompt.replace('"', '\\"').replace("'", "'")}"
-            delay 0.5
-            keystroke return
-        end tell
-        '''
-        
-        try:
-            subprocess.run(['osascript', '-e', applescript], check=True)
+        if self.transport.send(prompt):
             print("✓ Sent to Cursor")
             return True
-        except Exception as e:
-            print(f"✗ Error: {e}")
-            return False
+        return False
     
     def get_claude_next_action(self, phase, completed_tasks):
         """Ask Claude what to do next"""
@@ -111,13 +82,11 @@ What should I build next? Give me the exact Cursor AI prompt."""
         for i, task in enumerate(tasks, 1):
             print(f"\n[{i}/{len(tasks)}] 🎯 {task['name']}")
             
-            # Send prompt to Cursor
+            # Send prompt to Cursor and wait for the files it names to settle
+            targets = paths_in(task['prompt'])
+            self.watcher.start(targets)
             self.send_to_cursor_ai(task['prompt'])
-            
-            # Wait for Cursor to generate
-            wait_time = task.get('wait', 10)
-            print(f"⏳ Waiting {wait_time}s for Cursor to generate...")
-            time.sleep(wait_time)
+            self.watcher.wait(targets)
             
             # Ask user to verify
             response = input("✓ Did Cursor generate this correctly? (y/n/retry): ")
@@ -175,8 +144,7 @@ export const glassButton = {
 
 export const glassInput = "backdrop-blur-xl bg-white/5 border border-white/15 rounded-lg px-4 py-2 focus:border-emerald-500/50 focus:ring-2 focus:ring-emerald-500/20 transition-all duration-300"
 
-TypeScript. Export default.""",
-            "wait": 5
+TypeScript. Export default."""
         },
         {
             "name": "GlassCard component",
@@ -193,8 +161,7 @@ Use the glassCard and glassCardHover classes from /lib/glassmorphism.ts
 
 Add smooth hover animation when hover=true.
 
-TypeScript, React, export default.""",
-            "wait": 8
+TypeScript, React, export default."""
         },
         {
             "name": "GlassButton component",
@@ -212,8 +179,7 @@ Use glassButton variants from /lib/glassmorphism.ts
 
 Add hover lift animation.
 
-TypeScript, React, export default.""",
-            "wait": 8
+TypeScript, React, export default."""
         },
         {
             "name": "AnimatedNumber component",
@@ -228,8 +194,7 @@ Props:
 
 Use react-spring or custom hook to animate from 0 to value.
 
-TypeScript, React, export default.""",
-            "wait": 10
+TypeScript, React, export default."""
         }
     ]
     
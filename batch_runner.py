@@ -0,0 +1,118 @@
+"""
+ScoutPulse Batch Runner
+Submits many Claude requests as one Message Batches job, polls it until it ends,
+and resumes from the saved batch ID if the process is restarted. To exercise it
+without the real API, run batch_stub_server.py and point ANTHROPIC_BASE_URL at it
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import anthropic
+
+
+class BatchRunner:
+    def __init__(self, client, project_path, poll_interval=None):
+        self.client = client
+        self.state_file = os.path.join(project_path, '.scoutpulse_cache', 'batches.json')
+        if poll_interval is None:
+            poll_interval = int(os.getenv('BATCH_POLL_SECONDS', '30'))
+        self.poll_interval = poll_interval
+
+    def load_state(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self, state):
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    def forget(self, name):
+        state = self.load_state()
+        if state.pop(name, None) is not None:
+            self.save_state(state)
+
+    def fingerprint(self, requests):
+        """Hash of the exact requests, so a saved batch is only resumed for the same job"""
+        payload = json.dumps(requests, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def submit(self, name, requests):
+        """Create a batch for (custom_id, params) requests, or resume the saved one for this job"""
+        fingerprint = self.fingerprint(requests)
+        saved = self.load_state().get(name)
+
+        if saved and saved.get('fingerprint') == fingerprint:
+            try:
+                batch = self.client.messages.batches.retrieve(saved['batch_id'])
+                print(f"🔁 Resuming batch {batch.id} ({batch.processing_status})")
+                return batch.id
+            except anthropic.NotFoundError:
+                print(f"⚠️  Saved batch {saved['batch_id']} no longer exists, submitting a new one")
+
+        batch = self.client.messages.batches.create(requests=[
+            {"custom_id": custom_id, "params": params}
+            for custom_id, params in requests
+        ])
+
+        state = self.load_state()
+        state[name] = {
+            'batch_id': batch.id,
+            'fingerprint': fingerprint,
+            'requests': len(requests),
+            'submitted': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        self.save_state(state)
+
+        print(f"📦 Submitted batch {batch.id} with {len(requests)} requests")
+        return batch.id
+
+    def wait(self, batch_id):
+        """Poll until the batch has ended"""
+        while True:
+            batch = self.client.messages.batches.retrieve(batch_id)
+            if batch.processing_status == 'ended':
+                return batch
+
+            counts = batch.request_counts
+            print(f"⏳ Batch {batch_id}: {counts.processing} processing, "
+                  f"{counts.succeeded} succeeded, {counts.errored} errored")
+            time.sleep(self.poll_interval)
+
+    def results(self, batch_id):
+        """Map custom_id -> Message for succeeded requests; the rest are reported and left out"""
+        messages = {}
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type == 'succeeded':
+                messages[entry.custom_id] = entry.result.message
+                continue
+
+            error = getattr(getattr(entry.result, 'error', None), 'error', None)
+            detail = f": {error.message}" if error is not None else ""
+            print(f"⚠️  {entry.custom_id} {entry.result.type}{detail}")
+
+        return messages
+
+    def run(self, name, requests):
+        """Submit (or resume) the batch, wait for it and return its results"""
+        if not requests:
+            return {}
+
+        batch_id = self.submit(name, requests)
+        try:
+            self.wait(batch_id)
+        except KeyboardInterrupt:
+            print(f"\n💾 Batch {batch_id} keeps running; re-run with --batch to pick it up")
+            raise
+
+        messages = self.results(batch_id)
+        self.forget(name)
+        return messages
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+ScoutPulse Batch Stub Server
+Local stand-in for the Message Batches endpoints (create, retrieve, results)
+so --batch runs can be exercised without the real API:
+
+    python3 batch_stub_server.py 8765
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 python3 direct_api_polisher.py --batch
+
+Batches end after `polls_until_end` retrieves. Requests whose custom_id
+contains "errored" or "expired" get that result; the rest succeed
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BATCH_PATH = re.compile(r'^/v1/messages/batches/([\w-]+)(/results)?$')
+
+
+def timestamp(offset_hours=0):
+    return (datetime.now(timezone.utc) + timedelta(hours=offset_hours)).isoformat()
+
+
+def stub_message(custom_id, params):
+    """A succeeded result: forced tool calls get an empty tool input, everything else a short text"""
+    tool_choice = params.get('tool_choice') or {}
+    if tool_choice.get('type') == 'tool':
+        content = [{"type": "tool_use", "id": f"toolu_{custom_id}", "name": tool_choice['name'], "input": {"issues": []}}]
+        stop_reason = "tool_use"
+    else:
+        content = [{"type": "text", "text": f"stub response to {custom_id}"}]
+        stop_reason = "end_turn"
+    return {
+        "id": f"msg_{custom_id}",
+        "type": "message",
+        "role": "assistant",
+        "model": params.get('model', 'stub'),
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    }
+
+
+def stub_result(custom_id, params):
+    if 'errored' in custom_id:
+        return {"type": "errored", "error": {"type": "error", "error": {
+            "type": "invalid_request_error", "message": f"stub error for {custom_id}"}}}
+    if 'expired' in custom_id:
+        return {"type": "expired"}
+    return {"type": "succeeded", "message": stub_message(custom_id, params)}
+
+
+class BatchStubServer:
+    def __init__(self, port=0, polls_until_end=1):
+        self.polls_until_end = polls_until_end
+        self.batches = {}  # id -> {'requests': [...], 'polls': int, 'created_at': str}
+        self.created = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), self.handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def batch_json(self, batch_id):
+        batch = self.batches[batch_id]
+        ended = batch['polls'] >= self.polls_until_end
+        results = [stub_result(r['custom_id'], r['params'])['type'] for r in batch['requests']]
+        counts = {
+            "processing": 0 if ended else len(results),
+            "succeeded": results.count('succeeded') if ended else 0,
+            "errored": results.count('errored') if ended else 0,
+            "canceled": 0,
+            "expired": results.count('expired') if ended else 0,
+        }
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": counts,
+            "created_at": batch['created_at'],
+            "expires_at": timestamp(24),
+            "ended_at": timestamp() if ended else None,
+            "cancel_initiated_at": None,
+            "archived_at": None,
+            "results_url": f"{self.url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, status, payload, content_type='application/json'):
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def not_found(self, batch_id):
+                self.send_json(404, {"type": "error", "error": {
+                    "type": "not_found_error", "message": f"No batch {batch_id}"}})
+
+            def do_POST(self):
+                if self.path.split('?')[0] != '/v1/messages/batches':
+                    return self.not_found(self.path)
+                length = int(self.headers.get('Content-Length', 0))
+                requests = json.loads(self.rfile.read(length) or b'{}').get('requests', [])
+                with server.lock:
+                    server.created += 1
+                    batch_id = f"msgbatch_stub_{server.created:04d}"
+                    server.batches[batch_id] = {'requests': requests, 'polls': 0, 'created_at': timestamp()}
+                    payload = server.batch_json(batch_id)
+                self.send_json(200, payload)
+
+            def do_GET(self):
+                match = BATCH_PATH.match(self.path.split('?')[0])
+                if not match:
+                    return self.not_found(self.path)
+                batch_id, results = match.groups()
+                with server.lock:
+                    batch = server.batches.get(batch_id)
+                    if batch is None:
+                        return self.not_found(batch_id)
+                    if results:
+                        lines = [
+                            json.dumps({"custom_id": r['custom_id'], "result": stub_result(r['custom_id'], r['params'])})
+                            for r in batch['requests']
+                        ]
+                        return self.send_json(200, "\n".join(lines).encode(), 'application/binary')
+                    batch['polls'] += 1
+                    payload = server.batch_json(batch_id)
+                self.send_json(200, payload)
+
+        return Handler
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server = BatchStubServer(port, polls_until_end=2).start()
+    print(f"📦 Batch stub listening on {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+ScoutPulse Change Tracker
+Works out which source files changed since the last improvement scan, so an
+incremental scan only sends those files and their diffs. git narrows the
+candidates; a persisted content hash per file drops the ones whose content
+is the same as when they were last scanned
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+
+from repo_index import SKIP_DIRS
+from response_cache import SOURCE_DIRS, SOURCE_EXTENSIONS, SOURCE_FILES, iter_source_files
+from stream_writer import write_atomic
+
+
+class ChangeTracker:
+    def __init__(self, project_path, since='HEAD@{24.hours.ago}', max_file_chars=16000):
+        self.project_path = project_path
+        self.since = since  # base for the first incremental scan, before any scan is recorded
+        self.max_file_chars = max_file_chars
+        self.state_file = os.path.join(project_path, '.scoutpulse_cache', 'scan_digests.json')
+        self.state = self.load_state()
+
+    def load_state(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault('head', None)
+        state.setdefault('files', {})
+        return state
+
+    def save_state(self):
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        write_atomic(self.state_file, json.dumps(self.state, indent=2))
+
+    def git(self, *args):
+        """stdout of a git command in the project, or None if git is unavailable or it failed"""
+        try:
+            result = subprocess.run(
+                ['git', '-C', self.project_path, *args],
+                capture_output=True,
+                text=True,
+                timeout=30
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        return result.stdout if result.returncode == 0 else None
+
+    def base(self):
+        """Commit to diff against: HEAD at the last scan, else `since`, else HEAD"""
+        for ref in (self.state['head'], self.since, 'HEAD'):
+            if ref and self.git('rev-parse', '--verify', '--quiet', f'{ref}^{{commit}}') is not None:
+                return ref
+        return None
+
+    def is_source(self, rel_path):
+        """Same scope as iter_source_files"""
+        if rel_path in SOURCE_FILES:
+            return True
+        in_tree = any(rel_path.startswith(top + '/') for top in SOURCE_DIRS)
+        return in_tree and rel_path.endswith(SOURCE_EXTENSIONS) and not SKIP_DIRS & set(rel_path.split('/'))
+
+    def candidates(self, base):
+        """Files git says differ from `base` (committed, staged, unstaged or untracked)"""
+        if base is None:
+            return None
+        changed = self.git('diff', '--name-only', base, '--')
+        untracked = self.git('ls-files', '--others', '--exclude-standard')
+        if changed is None or untracked is None:
+            return None
+        paths = set(changed.split('\n')) | set(untracked.split('\n'))
+        return sorted(p for p in paths if p and self.is_source(p))
+
+    def digest(self, rel_path):
+        try:
+            with open(os.path.join(self.project_path, rel_path), 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None  # deleted
+
+    def changed_files(self):
+        """Source files whose content differs from the last scan; returns (base, [(path, digest)])"""
+        base = self.base()
+        paths = self.candidates(base)
+        if paths is None:
+            print("⚠️  git unavailable - comparing every source file against the last scan")
+            paths = list(iter_source_files(self.project_path))
+
+        known = self.state['files']
+        changed = []
+        for rel_path in paths:
+            digest = self.digest(rel_path)
+            if digest is None and rel_path not in known:
+                continue  # created and removed between scans
+            if digest != known.get(rel_path):
+                changed.append((rel_path, digest))
+        return base, changed
+
+    def diff(self, base, rel_path):
+        """Unified diff of one file against `base`, or None if git has nothing to compare with"""
+        if base is None:
+            return None
+        return self.git('diff', '--no-color', base, '--', rel_path) or None
+
+    def render(self, base, changes):
+        """Prompt section with the diff and current content of each changed file"""
+        parts = []
+        for rel_path, digest in changes:
+            if digest is None:
+                parts.append(f"FILE: {rel_path} (deleted)\n")
+                continue
+
+            diff = self.diff(base, rel_path)
+            try:
+                with open(os.path.join(self.project_path, rel_path), 'r', errors='replace') as f:
+                    content = f.read()
+            except OSError:
+                continue
+            if len(content) > self.max_file_chars:
+                content = content[:self.max_file_chars] + \
+                    f"\n... (truncated, {len(content) - self.max_file_chars} more characters)"
+
+            section = f"FILE: {rel_path}\n"
+            if diff:
+                section += f"DIFF:\n```diff\n{diff}```\n"
+            else:
+                section += "(new or untracked file)\n"
+            section += f"CURRENT CONTENT:\n```\n{content}\n```\n"
+            parts.append(section)
+        return "\n".join(parts)
+
+    def mark_scanned(self, changes):
+        """Record the content that was just scanned, so it is skipped until it changes again"""
+        for rel_path, digest in changes:
+            if digest is None:
+                self.state['files'].pop(rel_path, None)
+            else:
+                self.state['files'][rel_path] = digest
+        head = self.git('rev-parse', 'HEAD')
+        if head:
+            self.state['head'] = head.strip()
+        self.save_state()
+
+    def mark_all_scanned(self):
+        """After a full scan: every current source file counts as scanned"""
+        self.state['files'] = {}
+        self.mark_scanned([(path, self.digest(path)) for path in iter_source_files(self.project_path)])
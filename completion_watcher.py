@@ -0,0 +1,160 @@
+"""
+ScoutPulse Completion Watcher
+Detects when Cursor has finished a task by watching the files it should touch:
+done once writes have been quiet for a short window, with an upper timeout.
+Uses watchdog (inotify / FSEvents) when installed, otherwise polls mtimes
+"""
+
+import os
+import re
+import threading
+import time
+
+from repo_index import SKIP_DIRS
+from response_cache import SOURCE_EXTENSIONS, iter_source_files
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+PATH_PATTERN = re.compile(r'(?:^|[\s`\'"(])/?((?:[\w@.()\[\]-]+/)*[\w@.()\[\]-]+\.(?:tsx|ts|jsx|js|css|json|sql))\b')
+
+
+def paths_in(text):
+    """Project-relative file paths mentioned in a prompt or task description"""
+    return sorted({match.lstrip('/') for match in PATH_PATTERN.findall(text or '')})
+
+
+class PollingSource:
+    """Change source that compares (mtime, size) snapshots"""
+
+    def __init__(self, project_path, targets):
+        self.project_path = project_path
+        self.targets = targets
+        self.snapshot = self.scan()
+
+    def scan(self):
+        paths = self.targets or iter_source_files(self.project_path)
+        snapshot = {}
+        for rel_path in paths:
+            try:
+                stat = os.stat(os.path.join(self.project_path, rel_path))
+            except OSError:
+                continue
+            snapshot[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def changes(self):
+        current = self.scan()
+        changed = {p for p in current.keys() | self.snapshot.keys() if current.get(p) != self.snapshot.get(p)}
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class WatchdogSource:
+    """Change source fed by filesystem events"""
+
+    def __init__(self, project_path, targets):
+        self.project_path = os.path.abspath(project_path)
+        self.targets = set(targets)
+        self.changed = set()
+        self.lock = threading.Lock()
+
+        source = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if not event.is_directory:
+                    for path in (event.src_path, getattr(event, 'dest_path', '')):
+                        source.record(path)
+
+        self.observer = Observer()
+        self.observer.schedule(Handler(), self.project_path, recursive=True)
+        self.observer.start()
+
+    def record(self, path):
+        if not path:
+            return
+        rel_path = os.path.relpath(path, self.project_path)
+        if self.targets:
+            if rel_path not in self.targets:
+                return
+        elif not rel_path.endswith(SOURCE_EXTENSIONS) or SKIP_DIRS & set(rel_path.split(os.sep)):
+            return
+        with self.lock:
+            self.changed.add(rel_path)
+
+    def changes(self):
+        with self.lock:
+            changed, self.changed = self.changed, set()
+        return changed
+
+    def close(self):
+        self.observer.stop()
+        self.observer.join(timeout=2)
+
+
+class CompletionWatcher:
+    def __init__(self, project_path, quiet_seconds=None, timeout=None, poll_interval=0.5):
+        self.project_path = project_path
+        if quiet_seconds is None:
+            quiet_seconds = float(os.getenv('CURSOR_QUIET_SECONDS', '3'))
+        if timeout is None:
+            timeout = float(os.getenv('CURSOR_TIMEOUT', '300'))
+        self.quiet_seconds = quiet_seconds
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.source = None
+
+    def start(self, targets=None):
+        """Begin recording changes; call before sending the prompt so no early write is missed"""
+        self.stop()
+        targets = [os.path.normpath(t.lstrip('/')) for t in targets or []]
+        if Observer is not None:
+            self.source = WatchdogSource(self.project_path, targets)
+        else:
+            self.source = PollingSource(self.project_path, targets)
+
+    def stop(self):
+        if self.source:
+            self.source.close()
+            self.source = None
+
+    def wait(self, targets=None):
+        """Block until the watched files changed and then went quiet; returns (status, changed files)
+
+        status is 'done', or 'timeout' if writes never started or never settled.
+        """
+        if self.source is None:
+            self.start(targets)
+
+        scope = ', '.join(targets) if targets else 'the project'
+        print(f"👀 Watching {scope} (done after {self.quiet_seconds:g}s quiet, max {self.timeout:g}s)...")
+
+        start = time.monotonic()
+        last_change = None
+        changed = set()
+        try:
+            while time.monotonic() - start < self.timeout:
+                new = self.source.changes()
+                now = time.monotonic()
+                if new:
+                    changed |= new
+                    last_change = now
+                elif last_change is not None and now - last_change >= self.quiet_seconds:
+                    print(f"✅ {len(changed)} file(s) settled after {now - start:.1f}s")
+                    return 'done', sorted(changed)
+                time.sleep(self.poll_interval)
+        finally:
+            self.stop()
+
+        if changed:
+            print(f"⏰ Still writing after {self.timeout:g}s ({len(changed)} file(s) changed)")
+        else:
+            print(f"⏰ No changes after {self.timeout:g}s")
+        return 'timeout', sorted(changed)
@@ -0,0 +1,162 @@
+"""
+ScoutPulse Context Compactor
+Keeps long tool-use loops from resending their whole history every turn: the
+last few turns go verbatim, older ones are folded into a rolling summary that
+rides on the first user message, and only the newest screenshot is kept
+"""
+
+import json
+import os
+
+from rate_limiter import get_rate_limiter
+
+SUMMARY_PROMPT = """You maintain the running notes of an autonomous coding session.
+
+CURRENT NOTES:
+{summary}
+
+TURNS TO FOLD IN:
+{turns}
+
+Rewrite the notes so they include these turns. Keep: what has been done, files and
+commands touched, the current state of the screen/app, and open problems or next steps.
+Drop chatter and anything superseded. At most 300 words. Return only the notes.
+"""
+
+
+def block_field(block, name, default=None):
+    """Field of a content block, whether it is an SDK object or a plain dict"""
+    if isinstance(block, dict):
+        return block.get(name, default)
+    return getattr(block, name, default)
+
+
+def render_block(block, limit=1500):
+    kind = block_field(block, 'type')
+    if kind == 'text':
+        text = block_field(block, 'text', '')
+    elif kind == 'tool_use':
+        text = f"[{block_field(block, 'name')}] {json.dumps(block_field(block, 'input', {}), default=str)}"
+    elif kind == 'tool_result':
+        content = block_field(block, 'content', '')
+        if isinstance(content, list):
+            content = " ".join(
+                block_field(part, 'text', '') if block_field(part, 'type') == 'text' else '[screenshot]'
+                for part in content
+            )
+        text = f"[result] {content}"
+    elif kind == 'image':
+        text = '[screenshot]'
+    else:
+        text = f"[{kind}]"
+    return text if len(text) <= limit else text[:limit] + " ..."
+
+
+def render_message(message):
+    content = message['content']
+    if isinstance(content, str):
+        return f"{message['role'].upper()}: {content}"
+    return f"{message['role'].upper()}: " + "\n".join(render_block(block) for block in content)
+
+
+class ContextCompactor:
+    def __init__(self, client, keep_turns=None, fold_batch=4, summary_tokens=1024):
+        if keep_turns is None:
+            keep_turns = int(os.getenv('COMPACT_KEEP_TURNS', '8'))
+        self.client = client
+        self.keep_turns = keep_turns
+        self.fold_batch = fold_batch  # fold several turns at once so the prompt prefix stays stable
+        self.summary_tokens = summary_tokens
+        self.rate_limiter = get_rate_limiter()
+        self.summary = ""
+        self.folded = 0  # turns already in the summary
+        self.window = 0  # turns sent verbatim last time
+
+    def turns(self, messages):
+        """messages[1:] split into turns, each starting at an assistant message"""
+        turns = []
+        for message in messages[1:]:
+            if message['role'] == 'assistant' or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        return turns
+
+    def fold(self, turns):
+        """Merge turns into the rolling summary"""
+        rendered = "\n\n".join(render_message(m) for turn in turns for m in turn)
+        prompt = SUMMARY_PROMPT.format(summary=self.summary or "(none yet)", turns=rendered)
+        try:
+            response = self.rate_limiter.create(
+                self.client,
+                model="claude-sonnet-4-20250514",
+                max_tokens=self.summary_tokens,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            self.summary = "".join(block_field(b, 'text', '') for b in response.content).strip()
+        except Exception as e:
+            # Keep going with plain excerpts rather than resending everything
+            print(f"⚠️  Could not summarise earlier turns ({e}) - keeping short excerpts")
+            self.summary = (self.summary + "\n" + rendered[-2000:]).strip()
+        print(f"🗜️  Folded {len(turns)} turn(s) into the running summary")
+
+    def strip_images(self, content, keep):
+        """Copy of a message's content with images replaced, unless it holds the image to keep"""
+        stripped = []
+        for block in content:
+            if block_field(block, 'type') == 'tool_result' and isinstance(block_field(block, 'content'), list):
+                parts = []
+                for part in block_field(block, 'content'):
+                    if block_field(part, 'type') == 'image' and part is not keep:
+                        parts.append({"type": "text", "text": "[earlier screenshot removed]"})
+                    else:
+                        parts.append(part)
+                block = dict(block, content=parts)
+            elif block_field(block, 'type') == 'image' and block is not keep:
+                block = {"type": "text", "text": "[earlier screenshot removed]"}
+            stripped.append(block)
+        return stripped
+
+    def latest_image(self, messages):
+        for message in reversed(messages):
+            if message['role'] != 'user' or isinstance(message['content'], str):
+                continue
+            for block in reversed(message['content']):
+                if block_field(block, 'type') == 'image':
+                    return block
+                if block_field(block, 'type') == 'tool_result' and isinstance(block_field(block, 'content'), list):
+                    for part in reversed(block_field(block, 'content')):
+                        if block_field(part, 'type') == 'image':
+                            return part
+        return None
+
+    def build(self, messages):
+        """The messages to send this turn; `messages` itself is left untouched"""
+        turns = self.turns(messages)
+        pending = turns[self.folded:]
+        if len(pending) >= self.keep_turns + self.fold_batch:
+            stale = pending[:len(pending) - self.keep_turns]
+            self.fold(stale)
+            self.folded += len(stale)
+            pending = pending[len(stale):]
+        self.window = len(pending)
+
+        task = messages[0]
+        if self.summary:
+            note = f"\n\nPROGRESS SO FAR (summary of {self.folded} earlier turns):\n{self.summary}"
+            if isinstance(task['content'], str):
+                task = {"role": "user", "content": task['content'] + note}
+            else:
+                task = {"role": "user", "content": list(task['content']) + [{"type": "text", "text": note}]}
+
+        recent = [message for turn in pending for message in turn]
+        keep = self.latest_image(recent)
+        window = [task]
+        for message in recent:
+            if message['role'] == 'user' and not isinstance(message['content'], str):
+                message = {"role": "user", "content": self.strip_images(message['content'], keep)}
+            window.append(message)
+        return window
+
+    def describe(self):
+        summary = f" + summary of {self.folded}" if self.folded else ""
+        return f"{self.window} recent turn(s){summary}"
@@ -0,0 +1,148 @@
+"""
+ScoutPulse Context Packer
+Picks the source files each audit category should see and packs them under a
+token budget, so audits work from real code instead of just the project path.
+Rendered files are kept in memory and shared between categories
+"""
+
+import fnmatch
+import os
+
+from rate_limiter import estimate_tokens
+from response_cache import iter_source_files
+
+# Files every category sees; they go in the cached system prefix
+SHARED_PATTERNS = ['package.json', 'app/layout.tsx', 'lib/routes.ts', 'tailwind.config.ts']
+
+# Most relevant first; `*` also matches across directories
+CATEGORY_PATTERNS = {
+    'FEATURES': ['app/(dashboard)/*page.tsx', 'app/*page.tsx', 'lib/queries/*', 'components/player/*',
+                 'components/coach/*', 'components/recruiting/*'],
+    'UI_UX': ['app/(dashboard)/*page.tsx', 'app/*loading.tsx', 'components/ui/EmptyState.tsx',
+              'components/ui/LoadingStates.tsx', 'app/*page.tsx', 'components/*'],
+    'ROUTING': ['lib/routes.ts', 'app/*layout.tsx', 'app/*not-found.tsx', 'components/ui/GlassSidebar.tsx',
+                'components/*Nav*', 'components/*nav*', 'app/*page.tsx'],
+    'DESIGN': ['lib/glassmorphism*.ts', 'lib/animations.ts', 'app/globals.css', 'components/ui/Glass*',
+               'components/ui/*'],
+    'INTERACTIONS': ['components/*Form.tsx', 'components/*form*', 'components/ui/*Button*', 'components/ui/*Modal*',
+                     'app/*page.tsx', 'components/*'],
+    'ERRORS': ['app/*error.tsx', 'components/error/*', 'lib/errors/*', 'app/api/*', 'lib/supabase/*',
+               'lib/queries/*'],
+    'PERFORMANCE': ['next.config.js', 'lib/lazy.tsx', 'app/*layout.tsx', 'lib/queries/*', 'lib/hooks/*',
+                    'app/*page.tsx'],
+    'ACCESSIBILITY': ['components/ui/accessibility-controls.tsx', 'components/ui/*', 'app/*page.tsx'],
+    'MOBILE': ['components/ui/GlassSidebar.tsx', 'components/ui/bottom-sheet.tsx', 'components/*Nav*',
+               'app/*layout.tsx', 'app/*page.tsx', 'components/*'],
+    'QUALITY': ['tsconfig.json', 'lib/*.ts', 'lib/*', 'app/api/*', 'components/*'],
+}
+
+EXCLUDE_PATTERNS = ['*.test.*', '*.spec.*', '*.md', 'app/test-*', 'components/dev/*']
+
+
+class ContextPacker:
+    def __init__(self, project_path, budget_tokens=None, shared_tokens=4000, max_file_tokens=4000):
+        self.project_path = project_path
+        if budget_tokens is None:
+            budget_tokens = int(os.getenv('AUDIT_CONTEXT_TOKENS', '12000'))
+        self.budget_tokens = budget_tokens
+        self.shared_tokens = shared_tokens
+        self.max_file_tokens = max_file_tokens
+        self.files = None
+        self.chunks = {}  # rel_path -> (signature, chunk text, tokens)
+        self.shared_paths = set()
+        self.reused = 0
+
+    def source_files(self):
+        if self.files is None:
+            self.files = [
+                path for path in iter_source_files(self.project_path)
+                if not any(fnmatch.fnmatchcase(path, pattern) for pattern in EXCLUDE_PATTERNS)
+            ]
+        return self.files
+
+    def select(self, patterns):
+        """Files matching `patterns`, in pattern order, shallow paths first within a pattern"""
+        selected = []
+        seen = set()
+        for pattern in patterns:
+            matches = [
+                path for path in self.source_files()
+                if path not in seen and fnmatch.fnmatchcase(path, pattern)
+            ]
+            for path in sorted(matches, key=lambda p: (p.count(os.sep), p)):
+                seen.add(path)
+                selected.append(path)
+        return selected
+
+    def chunk(self, rel_path):
+        """Render one file as a prompt chunk (truncated to max_file_tokens); returns (text, tokens)"""
+        full_path = os.path.join(self.project_path, rel_path)
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return None, 0
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self.chunks.get(rel_path)
+        if cached and cached[0] == signature:
+            self.reused += 1
+            return cached[1], cached[2]
+
+        try:
+            with open(full_path, 'r', errors='replace') as f:
+                content = f.read()
+        except OSError:
+            return None, 0
+
+        max_chars = self.max_file_tokens * 4
+        if len(content) > max_chars:
+            content = content[:max_chars] + f"\n... (truncated, {len(content) - max_chars} more characters)"
+
+        text = f"FILE: {rel_path}\n```\n{content}\n```\n"
+        tokens = estimate_tokens(text)
+        self.chunks[rel_path] = (signature, text, tokens)
+        return text, tokens
+
+    def pack_files(self, paths, budget):
+        """Concatenate chunks in order until the budget is spent; returns (text, files, tokens)"""
+        parts = []
+        packed = []
+        used = 0
+        for path in paths:
+            if budget - used < 100:
+                break
+            try:
+                size = os.path.getsize(os.path.join(self.project_path, path))
+            except OSError:
+                continue
+            if used + min(size // 4, self.max_file_tokens) > budget:
+                continue  # a smaller file further down may still fit
+            text, tokens = self.chunk(path)
+            if text is None or used + tokens > budget:
+                continue
+            parts.append(text)
+            packed.append(path)
+            used += tokens
+        return "\n".join(parts), packed, used
+
+    def pack_shared(self):
+        """Source files for the shared, cached system prefix"""
+        self.files = None  # start of a new audit run: pick up added and removed files
+        text, packed, _ = self.pack_files(self.select(SHARED_PATTERNS), self.shared_tokens)
+        self.shared_paths = set(packed)
+        if not text:
+            return ""
+        return "\n# SHARED SOURCE FILES\n" + text
+
+    def pack(self, category):
+        """Source files for one category, skipping those already in the shared prefix"""
+        paths = [p for p in self.select(CATEGORY_PATTERNS.get(category, [])) if p not in self.shared_paths]
+        text, packed, used = self.pack_files(paths, self.budget_tokens)
+        print(f"📚 {category}: {len(packed)} files, ~{used} tokens of context")
+        if not text:
+            return ""
+        return f"RELEVANT SOURCE FILES:\n{text}\n"
+
+    def with_context(self, category, prompt):
+        """Prefix a category prompt with its packed source files"""
+        return self.pack(category) + prompt
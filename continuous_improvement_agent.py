@@ -6,33 +6,41 @@ Monitors your codebase and continuously suggests/implements improvements
 
 import anthropic
 import os
-import time
+import sys
 import json
+import re
 from datetime import datetime
 
+from change_tracker import ChangeTracker
+from diff_edits import EDIT_FORMAT_INSTRUCTIONS, EditError, apply_edits, parse_edits
+from improvement_history import ImprovementHistory
+from json_stream import stream_json_items
+from rate_limiter import get_rate_limiter
+from scan_trigger import ScanTrigger
+from response_cache import ResponseCache
+from stream_writer import write_atomic
+from ts_verifier import TypeCheckVerifier
+
 class ContinuousImprovementAgent:
-    def __init__(self, api_key, project_path):
+    def __init__(self, api_key, project_path, edit_mode='diff', use_cache=True, verify=True, incremental=False):
         self.client = anthropic.Anthropic(api_key=api_key)
+        self.rate_limiter = get_rate_limiter()
         self.project_path = project_path
-        self.history_file = os.path.join(project_path, '.improvement_history.json')
-        self.load_history()
+        self.edit_mode = edit_mode  # 'diff' = SEARCH/REPLACE blocks, 'full' = whole-file rewrite
+        self.cache = ResponseCache(project_path, enabled=use_cache)
+        self.verifier = TypeCheckVerifier(project_path, enabled=verify)
+        self.incremental = incremental  # scan only files changed since the last scan
+        self.tracker = ChangeTracker(project_path)
+        self.history = ImprovementHistory(project_path)
         
-    def load_history(self):
-        """Load improvement history"""
-        if os.path.exists(self.history_file):
-            with open(self.history_file, 'r') as f:
-                self.history = json.load(f)
-        else:
-            self.history = {
-                'improvements': [],
-                'last_scan': None,
-                'total_improvements': 0
-            }
-    
-    def save_history(self):
-        """Save improvement history"""
-        with open(self.history_file, 'w') as f:
-            json.dump(self.history, f, indent=2)
+    def record_improvement(self, improvement):
+        """Add an applied improvement to the shared history"""
+        self.history.add({
+            'timestamp': datetime.now().isoformat(),
+            'title': improvement['title'],
+            'file': improvement['file'],
+            'type': improvement['type']
+        }, agent='continuous')
     
     def get_recent_changes(self):
         """Get files modified in last 24 hours"""
@@ -50,12 +58,29 @@ class ContinuousImprovementAgent:
             pass
         return []
     
-    def scan_for_improvements(self):
-        """Scan codebase for potential improvements"""
-        print("\n🔍 SCANNING FOR IMPROVEMENTS")
+    def scan_for_improvements(self, incremental=None):
+        """Scan codebase for potential improvements; incremental scans only look at what changed"""
+        if incremental is None:
+            incremental = self.incremental
+        
+        print("\n🔍 SCANNING FOR IMPROVEMENTS" + (" (incremental)" if incremental else ""))
         print("=" * 70)
         
-        scan_prompt = f"""Analyze the ScoutPulse project at {self.project_path}.
+        if incremental:
+            base, changes = self.tracker.changed_files()
+            if not changes:
+                print("✅ No files changed since the last scan")
+                return []
+            print(f"📝 {len(changes)} changed file(s) since {base or 'the last scan'}")
+            scope = f"""Analyze ONLY these files of the ScoutPulse project at {self.project_path}, which changed since the last scan.
+Use the diffs to focus on the new and modified code; only report issues in these files.
+
+{self.tracker.render(base, changes)}"""
+        else:
+            changes = None
+            scope = f"Analyze the ScoutPulse project at {self.project_path}."
+        
+        scan_prompt = f"""{scope}
 
 Focus on finding:
 
@@ -95,32 +120,28 @@ For each improvement, provide:
 Return as JSON array of improvements, sorted by (PRIORITY * IMPACT / EFFORT).
 
 Previous improvements to avoid duplicating:
-{json.dumps([i['title'] for i in self.history['improvements'][-20:]], indent=2)}
+{json.dumps([i['title'] for i in self.history.recent(20)], indent=2)}
 """
         
         print("Analyzing codebase...")
         
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=8000,
-            messages=[{"role": "user", "content": scan_prompt}]
-        )
-        
-        content = response.content[0].text
+        # Improvements are listed as they stream in
+        improvements, complete = stream_json_items(self.client, self.cache, scan_prompt, max_tokens=8000)
         
-        # Extract JSON from response
-        try:
-            # Find JSON array in response
-            start = content.find('[')
-            end = content.rfind(']') + 1
-            if start >= 0 and end > start:
-                improvements = json.loads(content[start:end])
-                return improvements
-        except Exception as e:
-            print(f"❌ Error parsing improvements: {e}")
-            return []
+        # The prompt only lists recent titles; check the full history too
+        improvements = [
+            i for i in improvements
+            if not self.history.seen(i.get('title'), i.get('file') or '')
+        ]
         
-        return []
+        # A cut-off or malformed answer may not cover every file: leave them for the next scan
+        if not complete:
+            print("⚠️  Scan incomplete - files stay queued for the next incremental scan")
+        elif changes is None:
+            self.tracker.mark_all_scanned()
+        else:
+            self.tracker.mark_scanned(changes)
+        return improvements
     
     def present_improvements(self, improvements):
         """Present improvements to user for selection"""
@@ -157,6 +178,11 @@ Previous improvements to avoid duplicating:
             print(f"❌ File not found: {file_path}")
             return False
         
+        if self.edit_mode == 'diff':
+            output_instructions = EDIT_FORMAT_INSTRUCTIONS
+        else:
+            output_instructions = "Return ONLY the complete updated file content. No explanations, no markdown, just code."
+        
         # Ask Claude to implement the improvement
         implement_prompt = f"""Implement this improvement:
 
@@ -172,28 +198,41 @@ REQUIRED CHANGES:
 
 IMPACT: {improvement['impact']}
 
-Return ONLY the complete updated file content. No explanations, no markdown, just code.
+{output_instructions}
 """
         
         print("Generating improved code...")
         
-        response = self.client.messages.create(
+        response = self.rate_limiter.create(
+            self.client,
             model="claude-sonnet-4-20250514",
             max_tokens=8000,
             messages=[{"role": "user", "content": implement_prompt}]
         )
         
-        improved_content = response.content[0].text
+        if response.stop_reason == "max_tokens":
+            print("❌ Response was truncated at max_tokens - leaving file untouched")
+            return False
         
-        # Clean markdown if present
-        import re
-        improved_content = re.sub(r'^```[a-z]*\n', '', improved_content)
-        improved_content = re.sub(r'\n```$', '', improved_content)
+        if self.edit_mode == 'diff':
+            try:
+                edits = parse_edits(response.content[0].text)
+                improved_content = apply_edits(current_content, edits)
+            except EditError as e:
+                print(f"❌ Could not apply edits: {e}")
+                return False
+            print(f"✏️  Applying {len(edits)} edit(s)")
+        else:
+            improved_content = response.content[0].text
+            
+            # Clean markdown if present
+            improved_content = re.sub(r'^```[a-z]*\n', '', improved_content)
+            improved_content = re.sub(r'\n```$', '', improved_content)
         
         # Write improved file
         try:
-            with open(file_path, 'w') as f:
-                f.write(improved_content)
+            if not self.verifier.guarded_write(improvement['file'], lambda: write_atomic(file_path, improved_content)):
+                return False
             print(f"✅ Implemented successfully!")
             return True
         except Exception as e:
@@ -201,25 +240,36 @@ Return ONLY the complete updated file content. No explanations, no markdown, jus
             return False
     
     def run_continuous_mode(self, interval_hours=24, auto_apply_quick_wins=False):
-        """Run in continuous mode - scans periodically"""
+        """Run in continuous mode - scans after commits and bursts of edits, at least every interval_hours"""
         print("\n" + "=" * 70)
         print("CONTINUOUS IMPROVEMENT AGENT - RUNNING")
         print("=" * 70)
-        print(f"\n⏰ Scan interval: {interval_hours} hours")
+        print(f"\n⏰ Scans on commits and saves, at least every {interval_hours} hours")
         print(f"🤖 Auto-apply quick wins: {auto_apply_quick_wins}")
         print("\nPress Ctrl+C to stop\n")
         
         iteration = 0
+        trigger = ScanTrigger(self.project_path, max_interval=interval_hours * 3600)
+        trigger.start()
+        reason = 'startup'
         
         try:
             while True:
+                tree_hash = self.cache.tree_hash()
+                if tree_hash == self.history.get_meta('last_tree_hash'):
+                    print(f"\n⏭️  Source tree unchanged since the last scan ({reason}) - skipping")
+                    trigger.mark_scanned(scanned=False)
+                    reason = trigger.wait()
+                    continue
+                
                 iteration += 1
                 print(f"\n{'=' * 70}")
-                print(f"SCAN #{iteration} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                print(f"SCAN #{iteration} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ({reason})")
                 print(f"{'=' * 70}")
                 
-                # Scan for improvements
-                improvements = self.scan_for_improvements()
+                # Scan for improvements; after the first full pass only changed files are re-scanned
+                improvements = self.scan_for_improvements(incremental=self.incremental or iteration > 1)
+                applied = []
                 
                 if not improvements:
                     print("✅ No improvements needed right now!")
@@ -238,16 +288,8 @@ Return ONLY the complete updated file content. No explanations, no markdown, jus
                                 success = self.implement_improvement(improvement)
                                 
                                 if success:
-                                    self.history['improvements'].append({
-                                        'timestamp': datetime.now().isoformat(),
-                                        'title': improvement['title'],
-                                        'file': improvement['file'],
-                                        'type': improvement['type']
-                                    })
-                                    self.history['total_improvements'] += 1
-                                    self.save_history()
-                                
-                                time.sleep(2)
+                                    self.record_improvement(improvement)
+                                    applied.append(improvement['file'])
                     else:
                         # Manual selection
                         print("\nSelect improvements to apply (comma-separated, e.g. 1,3,5):")
@@ -263,28 +305,26 @@ Return ONLY the complete updated file content. No explanations, no markdown, jus
                                     success = self.implement_improvement(improvement)
                                     
                                     if success:
-                                        self.history['improvements'].append({
-                                            'timestamp': datetime.now().isoformat(),
-                                            'title': improvement['title'],
-                                            'file': improvement['file'],
-                                            'type': improvement['type']
-                                        })
-                                        self.history['total_improvements'] += 1
-                                        self.save_history()
-                                    
-                                    time.sleep(2)
+                                        self.record_improvement(improvement)
+                                        applied.append(improvement['file'])
                 
-                self.history['last_scan'] = datetime.now().isoformat()
-                self.save_history()
+                self.history.set_meta('last_scan', datetime.now().isoformat())
+                left_hash = self.cache.tree_hash()
+                pending = trigger.mark_scanned(own_paths=applied)
+                # Our own edits shouldn't force the next scan, but edits the user made meanwhile must:
+                # then keep the hash of the tree as it was scanned
+                self.history.set_meta('last_tree_hash', tree_hash if pending else left_hash)
+                if pending:
+                    print(f"📝 {' + '.join(sorted(pending))} during the scan - queued for the next one")
                 
-                # Wait for next scan
-                print(f"\n⏰ Next scan in {interval_hours} hours...")
-                print(f"💤 Sleeping... (Ctrl+C to stop)")
-                time.sleep(interval_hours * 3600)
+                # Wait for the next burst of activity
+                reason = trigger.wait()
                 
         except KeyboardInterrupt:
             print("\n\n⚠️  Continuous mode stopped by user")
             self.show_stats()
+        finally:
+            trigger.stop()
     
     def run_single_scan(self):
         """Run a single improvement scan"""
@@ -323,16 +363,7 @@ Return ONLY the complete updated file content. No explanations, no markdown, jus
                 success = self.implement_improvement(improvement)
                 
                 if success:
-                    self.history['improvements'].append({
-                        'timestamp': datetime.now().isoformat(),
-                        'title': improvement['title'],
-                        'file': improvement['file'],
-                        'type': improvement['type']
-                    })
-                    self.history['total_improvements'] += 1
-                    self.save_history()
-                
-                time.sleep(2)
+                    self.record_improvement(improvement)
         
         self.show_stats()
     
@@ -341,12 +372,13 @@ Return ONLY the complete updated file content. No explanations, no markdown, jus
         print("\n" + "=" * 70)
         print("IMPROVEMENT STATISTICS")
         print("=" * 70)
-        print(f"\n📊 Total improvements: {self.history['total_improvements']}")
-        print(f"📅 Last scan: {self.history.get('last_scan', 'Never')}")
+        print(f"\n📊 Total improvements: {self.history.count()}")
+        print(f"📅 Last scan: {self.history.get_meta('last_scan') or 'Never'}")
         
-        if self.history['improvements']:
+        recent = self.history.recent(5)
+        if recent:
             print(f"\n Recent improvements:")
-            for improvement in self.history['improvements'][-5:]:
+            for improvement in recent:
                 print(f"  ✓ {improvement['title']} ({improvement['timestamp'][:10]})")
 
 def main():
@@ -360,15 +392,19 @@ def main():
         API_KEY = input("Enter your Anthropic API key: ").strip()
         if not API_KEY:
             print("❌ API key required. Set ANTHROPIC_API_KEY environment variable or enter it when prompted.")
-            import sys
             sys.exit(1)
     PROJECT_PATH = input("📂 Enter ScoutPulse project path: ").strip()
+    EDIT_MODE = 'full' if '--full-rewrite' in sys.argv else 'diff'
+    USE_CACHE = '--no-cache' not in sys.argv
+    VERIFY = '--no-verify' not in sys.argv
+    INCREMENTAL = '--incremental' in sys.argv
     
-    agent = ContinuousImprovementAgent(API_KEY, PROJECT_PATH)
+    agent = ContinuousImprovementAgent(API_KEY, PROJECT_PATH, edit_mode=EDIT_MODE, use_cache=USE_CACHE,
+                                       verify=VERIFY, incremental=INCREMENTAL)
     
     print("\nMode:")
     print("  1. Single scan (find and apply improvements now)")
-    print("  2. Continuous mode (scan every 24 hours)")
+    print("  2. Continuous mode (scan after commits and edits, at least every 24 hours)")
     print("  3. Continuous with auto quick-wins (auto-apply small improvements)")
     
     mode = input("\nSelect mode (1/2/3): ").strip()
@@ -7,52 +7,56 @@ SECURITY: Uses environment variables for API key
 """
 
 import anthropic
-import subprocess
-import time
 import os
 import json
-from pathlib import Path
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from completion_watcher import CompletionWatcher, paths_in
+from ide_transport import get_transport
+from improvement_history import ImprovementHistory
+from json_stream import stream_json_items
+from rate_limiter import get_rate_limiter
+from response_cache import ResponseCache
+from stream_writer import write_atomic
 
 class CursorImprovementAgent:
-    def __init__(self, api_key=None, project_path=None):
+    def __init__(self, api_key=None, project_path=None, use_cache=True):
         # Get API key from environment or parameter
         self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable not set. Export it or pass as parameter.")
         
         self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.rate_limiter = get_rate_limiter()
         self.project_path = project_path or os.getenv('SCOUTPULSE_PROJECT_PATH', '/Users/ricknini/Downloads/scoutpulse')
         self.improvements_applied = 0
-        self.improvements_history = []
-        
-        # Load previous improvements to avoid duplicates
-        self.history_file = Path(self.project_path) / '.improvement_history.json'
-        self.load_history()
-        
-    def load_history(self):
-        """Load previous improvements to avoid duplicates"""
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r') as f:
-                    self.improvements_history = json.load(f)
-            except:
-                self.improvements_history = []
+        self.cache = ResponseCache(self.project_path, enabled=use_cache)
+        self.watcher = CompletionWatcher(self.project_path)
+        self.transport = get_transport(self.project_path)
+        
+        # Previous improvements (shared with the continuous agent) to avoid duplicates
+        self.history = ImprovementHistory(self.project_path)
+        
+        # Scanned-but-not-yet-reviewed categories of an interrupted continuous session
+        self.queue_file = os.path.join(self.project_path, '.scoutpulse_cache', 'category_queue.json')
+        self.queue_max_age = 24 * 3600
     
     def save_history(self, improvement):
         """Save improvement to history"""
-        self.improvements_history.append({
-            'title': improvement.get('title'),
+        self.history.add({
+            'title': improvement.get('title') or 'Untitled',
             'file': improvement.get('file'),
-            'timestamp': time.time()
-        })
-        try:
-            with open(self.history_file, 'w') as f:
-                json.dump(self.improvements_history[-50:], f, indent=2)  # Keep last 50
-        except:
-            pass
+            'type': improvement.get('type')
+        }, agent='cursor')
     
     def scan_for_improvements(self, category=None):
-        """Scan codebase for improvements in a specific category"""
+        """Scan codebase for improvements in a specific category
+
+        Returns (improvements, complete); improvements is None if the scan failed, and complete
+        is False if the response was cut off or had malformed items.
+        """
         
         categories = {
             'features': 'Feature completeness - buttons that work, forms that submit, complete user flows',
@@ -73,8 +77,8 @@ class CursorImprovementAgent:
         
         # Build history context
         history_context = ""
-        if self.improvements_history:
-            recent = self.improvements_history[-10:]
+        recent = self.history.recent(10)
+        if recent:
             history_context = "\n\nPrevious improvements to avoid duplicating:\n"
             for item in recent:
                 history_context += f"- {item.get('title')} in {item.get('file')}\n"
@@ -125,37 +129,20 @@ Return as JSON array like:
             print(f"   Focus: {categories.get(category, category)}")
         
         try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=8000,
-                messages=[{"role": "user", "content": scan_prompt}]
-            )
+            # Improvements are listed as they stream in; labelled because categories scan concurrently
+            improvements, complete = stream_json_items(self.client, self.cache, scan_prompt, max_tokens=8000,
+                                                       label=f"[{category or 'all'}] ")
             
-            content = response.content[0].text
+            # Filter out duplicates based on history
+            filtered = [
+                imp for imp in improvements
+                if not self.history.seen(imp.get('title'), imp.get('file') or '')
+            ]
             
-            # Extract JSON
-            start = content.find('[')
-            end = content.rfind(']') + 1
-            if start >= 0 and end > start:
-                improvements = json.loads(content[start:end])
-                
-                # Filter out duplicates based on history
-                filtered = []
-                for imp in improvements:
-                    is_duplicate = any(
-                        imp.get('title') == h.get('title') and 
-                        imp.get('file') == h.get('file')
-                        for h in self.improvements_history
-                    )
-                    if not is_duplicate:
-                        filtered.append(imp)
-                
-                return filtered
+            return filtered, complete
         except Exception as e:
             print(f"❌ Error scanning: {e}")
-            return []
-        
-        return []
+            return None, False  # not "nothing to improve": callers must not record the category as done
     
     def present_improvement(self, improvement, number, total):
         """Present a single improvement to user"""
@@ -178,40 +165,13 @@ Return as JSON array like:
             print(f"   ... ({len(improvement['cursor_prompt'])} chars total)")
     
     def send_to_cursor(self, prompt):
-        """Send prompt to Cursor AI via AppleScript"""
+        """Send prompt to Cursor AI through the configured IDE transport"""
         print("\n💬 Sending to Cursor AI...")
         
-        # Clean the prompt for AppleScript - handle special characters
-        clean_prompt = prompt.replace('\\', '\\\\').replace('"', '\\"').replace("'", "\\'")
-        # Replace newlines with spaces for AppleScript
-        clean_prompt = ' '.join(clean_prompt.split())
-        
-        applescript = f'''
-        tell application "Cursor"
-            activate
-        end tell
-        
-        delay 1
-        
-        tell application "System Events"
-            keystroke "l" using {{command down}}
-            delay 1
-            keystroke "{clean_prompt}"
-            delay 0.5
-            keystroke return
-        end tell
-        '''
-        
-        try:
-            subprocess.run(['osascript', '-e', applescript], check=True, timeout=10)
+        if self.transport.send(prompt):
             print("✅ Sent to Cursor AI!")
             return True
-        except subprocess.TimeoutExpired:
-            print("❌ Timeout sending to Cursor")
-            return False
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            return False
+        return False
     
     def run_improvement_session(self, category=None, auto_mode=False):
         """Run a session of improvements"""
@@ -228,66 +188,129 @@ Return as JSON array like:
         print(f"🤖 Mode: {'Automatic' if auto_mode else 'Ask permission'}")
         
         # Scan for improvements
-        improvements = self.scan_for_improvements(category)
-        
+        improvements, complete = self.scan_for_improvements(category)
+        if improvements is None:
+            return
+        if not complete:
+            print(f"⚠️  Partial scan: reviewing the {len(improvements)} improvement(s) that arrived intact")
+        self.review_improvements(improvements, auto_mode=auto_mode)
+    
+    def review_improvements(self, improvements, auto_mode=False, start=0, on_reviewed=None):
+        """Present each improvement from `start` on; on_reviewed(n) runs once the first n are done
+
+        Returns False if the user quit part-way through.
+        """
         if not improvements:
             print("\n✅ No new improvements found! Your code is looking good.")
-            return
+            return True
         
         print(f"\n📋 Found {len(improvements)} new improvements")
         
         # Process each improvement
-        for i, improvement in enumerate(improvements, 1):
-            # Present the improvement
-            self.present_improvement(improvement, i, len(improvements))
-            
-            # Ask for permission (unless auto mode)
-            if not auto_mode:
-                print("\n" + "-"*70)
-                response = input("\nApply this improvement? (y/n/skip/quit): ").lower().strip()
-                
-                if response == 'quit' or response == 'q':
-                    print("\n⚠️  Session ended by user")
-                    break
-                elif response == 'skip' or response == 's':
-                    print("⏭️  Skipped")
-                    continue
-                elif response != 'y' and response != 'yes':
-                    print("⏭️  Skipped")
-                    continue
-            
-            # Send to Cursor
-            success = self.send_to_cursor(improvement['cursor_prompt'])
-            
-            if success:
-                self.improvements_applied += 1
-                self.save_history(improvement)
-                
-                # Wait for Cursor to process
-                wait_time = 15
-                print(f"\n⏳ Waiting {wait_time}s for Cursor to generate...")
-                time.sleep(wait_time)
-                
-                # Verify with user
-                verify = input("\n✓ Did Cursor complete this successfully? (y/n): ").lower().strip()
-                
-                if verify == 'y' or verify == 'yes':
-                    print("✅ Improvement applied!")
-                else:
-                    print("⚠️  May need manual review")
-            
-            # Brief pause between improvements
-            if i < len(improvements):
-                time.sleep(2)
+        for i in range(start, len(improvements)):
+            if not self.review_improvement(improvements[i], i + 1, len(improvements), auto_mode):
+                print("\n⚠️  Session ended by user")
+                return False
+            if on_reviewed:
+                on_reviewed(i + 1)
         
         # Summary
         print("\n" + "="*70)
         print("SESSION COMPLETE")
         print("="*70)
         print(f"\n✅ Improvements applied: {self.improvements_applied}/{len(improvements)}")
+        return True
+    
+    def review_improvement(self, improvement, number, total, auto_mode=False):
+        """Present one improvement and send it to Cursor if approved; False if the user quit"""
+        # Present the improvement
+        self.present_improvement(improvement, number, total)
+        
+        # Ask for permission (unless auto mode)
+        if not auto_mode:
+            print("\n" + "-"*70)
+            response = input("\nApply this improvement? (y/n/skip/quit): ").lower().strip()
+            
+            if response == 'quit' or response == 'q':
+                return False
+            elif response == 'skip' or response == 's':
+                print("⏭️  Skipped")
+                return True
+            elif response != 'y' and response != 'yes':
+                print("⏭️  Skipped")
+                return True
+        
+        # Send to Cursor
+        targets = paths_in(improvement.get('file', ''))
+        self.watcher.start(targets)
+        success = self.send_to_cursor(improvement['cursor_prompt'])
+        
+        if success:
+            self.improvements_applied += 1
+            self.save_history(improvement)
+            
+            # Wait until Cursor's writes have gone quiet
+            self.watcher.wait(targets)
+            
+            # Verify with user
+            verify = input("\n✓ Did Cursor complete this successfully? (y/n): ").lower().strip()
+            
+            if verify == 'y' or verify == 'yes':
+                print("✅ Improvement applied!")
+            else:
+                print("⚠️  May need manual review")
+        else:
+            self.watcher.stop()
+        return True
+    
+    def pending_count(self, entry):
+        return entry['total'] - entry['reviewed']
+    
+    def category_reviewed(self, entry):
+        """A saved category whose improvements have all been reviewed"""
+        return entry is not None and entry['reviewed'] >= entry['total']
+    
+    def drop_applied(self, entry):
+        """Remove queued improvements applied since the scan (e.g. by another category or agent)"""
+        remaining = entry['improvements'][entry['reviewed']:]
+        if any(self.history.seen(imp.get('title'), imp.get('file') or '') for imp in remaining):
+            entry['improvements'] = entry['improvements'][:entry['reviewed']] + [
+                imp for imp in remaining
+                if not self.history.seen(imp.get('title'), imp.get('file') or '')
+            ]
+            entry['total'] = len(entry['improvements'])
+    
+    def load_queue(self):
+        """Persisted continuous-mode queue, or None if there is none or it is too old"""
+        try:
+            with open(self.queue_file, 'r') as f:
+                queue = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - queue.get('created', 0) > self.queue_max_age:
+            return None
+        return queue
+    
+    def save_queue(self, queue):
+        """Persist the queue; categories from partial scans are left out so they are scanned again"""
+        categories = {key: entry for key, entry in queue['categories'].items() if entry.get('complete', True)}
+        os.makedirs(os.path.dirname(self.queue_file), exist_ok=True)
+        write_atomic(self.queue_file, json.dumps(dict(queue, categories=categories), indent=2))
+    
+    def clear_queue(self):
+        try:
+            os.remove(self.queue_file)
+        except OSError:
+            pass
     
     def run_continuous_mode(self):
-        """Run continuous improvement sessions"""
+        """Run continuous improvement sessions
+        
+        Every category is scanned concurrently up front. Review always takes, among the
+        categories whose scans have finished, the one with the most improvements still
+        to review, so it only waits when no scan is ready yet. Scan results and review
+        progress are saved, so an interrupted session resumes without re-scanning.
+        """
         
         categories = [
             None,  # All categories first
@@ -308,25 +331,108 @@ Return as JSON array like:
         print("\nThis will run improvement sessions for each category:")
         for cat in categories:
             print(f"  • {cat or 'All categories'}")
-        print("\nYou'll review each improvement before it's sent to Cursor.")
+        print("\nCategories with the most findings are reviewed first, as their scans finish.")
+        print("You'll review each improvement before it's sent to Cursor.")
         print("Press Ctrl+C to stop at any time.\n")
         
+        # Queue entries are keyed by category name ('all' for None)
+        queue = self.load_queue()
+        if queue:
+            done = sum(1 for entry in queue['categories'].values() if entry.get('reviewed') == entry.get('total'))
+            print(f"♻️  Resuming saved session: {done}/{len(categories)} categories reviewed")
+        else:
+            queue = {'created': time.time(), 'categories': {}}
+        
         input("Press Enter to begin...")
         
+        workers = int(os.getenv('SCAN_CONCURRENCY', '4'))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        scans = {}
         for category in categories:
-            print(f"\n\n{'='*70}")
-            print(f"CATEGORY: {(category or 'ALL').upper()}")
-            print(f"{'='*70}\n")
-            
-            self.run_improvement_session(category=category, auto_mode=False)
-            
-            # Ask to continue
-            if category != categories[-1]:
-                cont = input(f"\n\nContinue to next category ({categories[categories.index(category)+1]})? (y/n): ").lower().strip()
-                if cont != 'y' and cont != 'yes':
-                    print("\n⚠️  Continuous mode stopped")
-                    break
+            key = category or 'all'
+            if key not in queue['categories']:
+                scans[key] = executor.submit(self.scan_for_improvements, category)
+        if scans:
+            print(f"🚀 Scanning {len(scans)} categories in the background ({workers} at a time)")
+        
+        order = [category or 'all' for category in categories]  # breaks ties between equal counts
+        remaining = [key for key in order if not self.category_reviewed(queue['categories'].get(key))]
+        failed = []  # scans that errored or were cut off: never saved, so the next session scans them again
+        
+        try:
+            while remaining:
+                ready = [key for key in remaining if key in queue['categories'] or scans[key].done()]
+                if not ready:
+                    print("\n⏳ Waiting for the next category scan to finish...")
+                    wait([scans[key] for key in remaining], return_when=FIRST_COMPLETED)
+                    continue
+                
+                for key in ready:
+                    if key not in queue['categories']:
+                        improvements, complete = scans[key].result()
+                        if improvements is None:
+                            print(f"\n❌ {key.upper()}: scan failed - it will be rescanned next session")
+                            failed.append(key)
+                            remaining.remove(key)
+                            continue
+                        if not complete:
+                            print(f"\n⚠️  {key.upper()}: partial scan - its {len(improvements)} item(s) can be "
+                                  f"reviewed now, and it will be rescanned next session")
+                            failed.append(key)
+                        queue['categories'][key] = {'improvements': improvements, 'total': len(improvements),
+                                                    'reviewed': 0, 'complete': complete}
+                    self.drop_applied(queue['categories'][key])
+                self.save_queue(queue)
+                ready = [key for key in ready if key in queue['categories']]
+                if not ready:
+                    continue
+                
+                key = max(ready, key=lambda k: (self.pending_count(queue['categories'][k]), -order.index(k)))
+                entry = queue['categories'][key]
+                remaining.remove(key)
+                
+                if not self.pending_count(entry):
+                    print(f"\n✅ {key.upper()}: no new improvements")
+                    continue
+                
+                print(f"\n\n{'='*70}")
+                print(f"CATEGORY: {key.upper()} ({self.pending_count(entry)} to review)")
+                print(f"{'='*70}\n")
+                
+                if entry['reviewed'] and entry['reviewed'] < entry['total']:
+                    print(f"♻️  Resuming at improvement {entry['reviewed'] + 1}/{entry['total']}")
+                
+                def reviewed(count, entry=entry):
+                    entry['reviewed'] = count
+                    self.save_queue(queue)
+                
+                if not self.review_improvements(entry['improvements'], auto_mode=False,
+                                                start=entry['reviewed'], on_reviewed=reviewed):
+                    print("💾 Progress saved - run continuous mode again to resume")
+                    return
+                
+                # Ask to continue
+                if remaining:
+                    cont = input(f"\n\nContinue to the next category ({len(remaining)} left)? (y/n): ").lower().strip()
+                    if cont != 'y' and cont != 'yes':
+                        print("\n⚠️  Continuous mode stopped")
+                        print("💾 Progress saved - run continuous mode again to resume")
+                        return
+        finally:
+            # Keep finished scans for the next session; unfinished ones are dropped
+            for key, scan in scans.items():
+                if key not in queue['categories'] and scan.done() and not scan.cancelled() and not scan.exception():
+                    improvements, complete = scan.result()
+                    if improvements is not None:
+                        queue['categories'][key] = {'improvements': improvements, 'total': len(improvements),
+                                                    'reviewed': 0, 'complete': complete}
+            self.save_queue(queue)
+            executor.shutdown(wait=False, cancel_futures=True)
         
+        if failed:
+            print(f"\n💾 Progress saved - run continuous mode again to rescan {', '.join(failed)}")
+        else:
+            self.clear_queue()
         print("\n" + "="*70)
         print("CONTINUOUS MODE COMPLETE")
         print("="*70)
@@ -353,7 +459,8 @@ def main():
     print(f"🤖 Cursor: Will be prompted automatically\n")
     
     try:
-        agent = CursorImprovementAgent(api_key=api_key, project_path=project_path)
+        agent = CursorImprovementAgent(api_key=api_key, project_path=project_path,
+                                       use_cache='--no-cache' not in sys.argv)
     except ValueError as e:
         print(f"❌ {e}")
         return
@@ -0,0 +1,128 @@
+"""
+ScoutPulse Diff Edits
+Lets Claude return targeted SEARCH/REPLACE blocks (or unified-diff hunks)
+instead of rewriting whole files, and applies them locally
+"""
+
+import re
+
+EDIT_FORMAT_INSTRUCTIONS = """Return ONLY the changes, as one or more SEARCH/REPLACE blocks:
+
+<<<<<<< SEARCH
+exact lines copied from the current file
+=======
+the lines that should replace them
+>>>>>>> REPLACE
+
+Rules:
+- SEARCH must match the current file exactly (including indentation) and only once
+- Include just enough surrounding lines to make each SEARCH unique
+- Use several small blocks rather than one large block
+- To create a new file, use a single block with an empty SEARCH section
+- No explanations, no markdown fences, no complete file"""
+
+BLOCK_PATTERN = re.compile(
+    r'^<{5,9} SEARCH[^\n]*\n(.*?)^={5,9}[ \t]*\n(.*?)^>{5,9} REPLACE[^\n]*$',
+    re.MULTILINE | re.DOTALL
+)
+
+
+class EditError(Exception):
+    """Raised when an edit can't be parsed or applied safely"""
+
+
+def parse_edits(text):
+    """Parse SEARCH/REPLACE blocks, falling back to unified-diff hunks"""
+    edits = [(search, replace) for search, replace in BLOCK_PATTERN.findall(text)]
+    if edits:
+        return edits
+
+    return parse_unified_diff(text)
+
+
+def parse_unified_diff(text):
+    """Turn each unified-diff hunk into a (search, replace) pair"""
+    edits = []
+    search, replace = [], []
+    in_hunk = False
+
+    def flush():
+        if search or replace:
+            edits.append((''.join(search), ''.join(replace)))
+        search.clear()
+        replace.clear()
+
+    for line in text.splitlines(keepends=True):
+        if line.startswith('@@'):
+            flush()
+            in_hunk = True
+            continue
+        if not in_hunk or line.startswith(('--- ', '+++ ')):
+            continue
+
+        if line.startswith('-'):
+            search.append(line[1:])
+        elif line.startswith('+'):
+            replace.append(line[1:])
+        elif line.startswith(' ') or line in ('\n', '\r\n'):
+            search.append(line[1:] if line.startswith(' ') else line)
+            replace.append(line[1:] if line.startswith(' ') else line)
+        elif line.startswith('\\'):
+            continue  # "\ No newline at end of file"
+        else:
+            flush()
+            in_hunk = False
+
+    flush()
+    return edits
+
+
+def find_loose_match(content, search):
+    """Find search in content ignoring trailing whitespace; returns (start, end) offsets"""
+    content_lines = content.splitlines(keepends=True)
+    search_lines = [l.rstrip() for l in search.splitlines()]
+    while search_lines and not search_lines[-1]:
+        search_lines.pop()
+    if not search_lines:
+        return []
+
+    matches = []
+    size = len(search_lines)
+    for i in range(len(content_lines) - size + 1):
+        if all(content_lines[i + j].rstrip() == search_lines[j] for j in range(size)):
+            start = sum(len(l) for l in content_lines[:i])
+            end = start + sum(len(l) for l in content_lines[i:i + size])
+            matches.append((start, end))
+    return matches
+
+
+def apply_edits(content, edits):
+    """Apply (search, replace) edits in order, refusing anything ambiguous"""
+    if not edits:
+        raise EditError("No SEARCH/REPLACE blocks or diff hunks found in response")
+
+    for n, (search, replace) in enumerate(edits, 1):
+        if not search.strip():
+            if content.strip():
+                raise EditError(f"Edit {n} has an empty SEARCH but the file is not empty")
+            content = replace
+            continue
+
+        count = content.count(search)
+        if count == 1:
+            content = content.replace(search, replace, 1)
+            continue
+        if count > 1:
+            raise EditError(f"Edit {n} matches {count} places; SEARCH must be unique")
+
+        matches = find_loose_match(content, search)
+        if len(matches) != 1:
+            reason = "was not found" if not matches else f"matches {len(matches)} places"
+            raise EditError(f"Edit {n} {reason}:\n{search[:200]}")
+
+        start, end = matches[0]
+        if not replace.endswith('\n') and content[start:end].endswith('\n'):
+            replace += '\n'
+        content = content[:start] + replace + content[end:]
+
+    return content
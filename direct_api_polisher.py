@@ -7,13 +7,36 @@ No Cursor needed - fully autonomous
 
 import anthropic
 import os
+import sys
 import time
 import re
 
+from audit_engine import AuditEngine
+from audit_prompts import build_audit_system
+from batch_runner import BatchRunner
+from context_packer import ContextPacker
+from diff_edits import EDIT_FORMAT_INSTRUCTIONS, EditError, apply_edits, parse_edits
+from fix_scheduler import FixScheduler, group_tasks
+from rate_limiter import get_rate_limiter
+from response_cache import ResponseCache
+from stream_writer import AtomicWriter, FenceStripper, StreamProgress, write_atomic
+from task_extraction import ISSUES_FORMAT, REPORT_ISSUES_TOOL, TOOL_CHOICE, is_truncated, response_text, tasks_from_audits
+from ts_verifier import TypeCheckVerifier
+
 class DirectAPIPolisher:
-    def __init__(self, api_key, scoutpulse_path):
+    def __init__(self, api_key, scoutpulse_path, audit_concurrency=5, edit_mode='diff', fix_workers=4,
+                 use_cache=True, batch_mode=False, verify=True):
         self.client = anthropic.Anthropic(api_key=api_key)
+        self.rate_limiter = get_rate_limiter()
         self.scoutpulse_path = scoutpulse_path
+        self.edit_mode = edit_mode  # 'diff' = SEARCH/REPLACE blocks, 'full' = whole-file rewrite
+        self.cache = ResponseCache(scoutpulse_path, enabled=use_cache)
+        self.context_packer = ContextPacker(scoutpulse_path)
+        self.audit_engine = AuditEngine(api_key, concurrency=audit_concurrency, cache=self.cache)
+        self.fix_scheduler = FixScheduler(self.fix_file, scoutpulse_path, workers=fix_workers)
+        self.batch_mode = batch_mode  # submit audits and fixes as Message Batches jobs
+        self.batch_runner = BatchRunner(self.client, scoutpulse_path)
+        self.verifier = TypeCheckVerifier(scoutpulse_path, enabled=verify)
         
     def comprehensive_audit(self):
         """Run full production audit"""
@@ -21,8 +44,6 @@ class DirectAPIPolisher:
         print("COMPREHENSIVE PRODUCTION AUDIT")
         print("="*70 + "\n")
         
-        audits = []
-        
         audit_prompts = [
             ("FEATURES", self.get_feature_audit_prompt()),
             ("UI_UX", self.get_ui_audit_prompt()),
@@ -36,151 +57,152 @@ class DirectAPIPolisher:
             ("QUALITY", self.get_quality_audit_prompt()),
         ]
         
-        for i, (category, prompt) in enumerate(audit_prompts, 1):
-            print(f"{i}/10 - Auditing {category}...")
-            
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=4000,
+        # Shared project context goes in one cached prefix; each category adds its own files and checklist
+        system = build_audit_system(self.scoutpulse_path, ISSUES_FORMAT, self.context_packer.pack_shared(),
+                                    tools=[REPORT_ISSUES_TOOL])
+        audit_prompts = [
+            (category, self.context_packer.with_context(category, prompt))
+            for category, prompt in audit_prompts
+        ]
+        tree_hash = self.cache.tree_hash() if self.cache.enabled else None
+        if self.batch_mode:
+            audits, failed = self.batch_audit(audit_prompts, tree_hash, system)
+        else:
+            audits = self.audit_engine.run(audit_prompts, tree_hash, system)
+            failed = self.audit_engine.failed
+            self.audit_engine.cache_stats.report()
+        print(f"💾 Audit {self.cache.summary()}")
+        
+        if failed:
+            print(f"\n⚠️  Failed audits: {', '.join(failed)}")
+        
+        return audits
+    
+    def batch_audit(self, audit_prompts, tree_hash, system):
+        """Submit every uncached audit category as one batch job; returns (audits, failed)"""
+        model = self.audit_engine.model
+        results = {}
+        keys = {}
+        requests = []
+        for category, prompt in audit_prompts:
+            request = dict(
+                model=model,
+                max_tokens=self.audit_engine.max_tokens,
+                system=system,
+                tools=[REPORT_ISSUES_TOOL],
+                tool_choice=TOOL_CHOICE,
                 messages=[{"role": "user", "content": prompt}]
             )
-            
-            audits.append((category, response.content[0].text))
-            time.sleep(2)
+            if tree_hash:
+                keys[category] = self.cache.key(request, tree_hash)
+                cached = self.cache.get(keys[category])
+                if cached is not None:
+                    results[category] = cached
+                    continue
+            requests.append((f"audit-{category.lower()}", request))
         
-        return audits
+        print(f"📦 {len(requests)} audit categories to batch ({len(results)} cached)")
+        messages = self.batch_runner.run('audits', requests)
+        
+        audits = []
+        failed = []
+        for category, _ in audit_prompts:
+            message = messages.get(f"audit-{category.lower()}")
+            if message is not None and is_truncated(message):
+                print(f"⚠️  {category} report was truncated at max_tokens - dropping it")
+            elif message is not None:
+                results[category] = response_text(message)
+                if category in keys:
+                    self.cache.put(keys[category], results[category], message.stop_reason)
+            if category in results:
+                audits.append((category, results[category]))
+            else:
+                failed.append(category)
+        
+        return audits, failed
     
     def get_feature_audit_prompt(self):
-        return f"""Audit {self.scoutpulse_path} for FEATURE COMPLETENESS.
+        return """AUDIT CATEGORY: FEATURE COMPLETENESS
 
 Check all features exist and work. List MISSING/INCOMPLETE features with:
 - Feature name
 - File path that needs work
 - What's missing
 - Priority (CRITICAL/HIGH/MEDIUM/LOW)
-
-Format each issue as:
-PRIORITY | FILE_PATH | ISSUE | WHAT_TO_DO
 """
     
     def get_ui_audit_prompt(self):
-        return f"""Audit {self.scoutpulse_path} for UI/UX COMPLETENESS.
+        return """AUDIT CATEGORY: UI/UX COMPLETENESS
 
 Check all screens for:
 - Missing glassmorphism effects
 - Inconsistent styling
 - Missing empty/loading states
 - Layout issues
-
-Format each issue as:
-PRIORITY | FILE_PATH | ISSUE | WHAT_TO_DO
 """
     
     def get_routing_audit_prompt(self):
-        return f"""Audit {self.scoutpulse_path} for NAVIGATION & ROUTING.
+        return """AUDIT CATEGORY: NAVIGATION & ROUTING
 
 Check:
 - All routes exist
 - Navigation works
 - Links go to correct places
 - 404 handling
-
-Format each issue as:
-PRIORITY | FILE_PATH | ISSUE | WHAT_TO_DO
 """
     
     def get_design_audit_prompt(self):
-        return f"""Audit {self.scoutpulse_path} for GLASSMORPHISM & ANIMATIONS.
+        return """AUDIT CATEGORY: GLASSMORPHISM & ANIMATIONS
 
 Every component should have:
 - backdrop-filter: blur(24px)
 - Glass borders
 - Smooth animations
 - Hover effects
-
-Format each issue as:
-PRIORITY | FILE_PATH | ISSUE | WHAT_TO_DO
 """
     
     def get_interactions_audit_prompt(self):
-        return f"""Audit {self.scoutpulse_path} for INTERACTIVITY.
+        return """AUDIT CATEGORY: INTERACTIVITY
 
 Check all buttons, forms, inputs work.
 Check all states (loading, error, success).
-
-Format each issue as:
-PRIORITY | FILE_PATH | ISSUE | WHAT_TO_DO
 """
     
     def get_error_handling_audit_prompt(self):
-        return f"""Audit {self.scoutpulse_path} for ERROR HANDLING.
+        return """AUDIT CATEGORY: ERROR HANDLING
 
 Check for error boundaries, try/catch, validation.
-
-Format each issue as:
-PRIORITY | FILE_PATH | ISSUE | WHAT_TO_DO
 """
     
     def get_performance_audit_prompt(self):
-        return f"""Audit {self.scoutpulse_path} for PERFORMANCE.
+        return """AUDIT CATEGORY: PERFORMANCE
 
 Check for lazy loading, code splitting, optimization.
-
-Format each issue as:
-PRIORITY | FILE_PATH | ISSUE | WHAT_TO_DO
 """
     
     def get_accessibility_audit_prompt(self):
-        return f"""Audit {self.scoutpulse_path} for ACCESSIBILITY.
+        return """AUDIT CATEGORY: ACCESSIBILITY
 
 Check ARIA labels, keyboard nav, contrast.
-
-Format each issue as:
-PRIORITY | FILE_PATH | ISSUE | WHAT_TO_DO
 """
     
     def get_mobile_audit_prompt(self):
-        return f"""Audit {self.scoutpulse_path} for MOBILE RESPONSIVENESS.
+        return """AUDIT CATEGORY: MOBILE RESPONSIVENESS
 
 Check responsive design at all breakpoints.
-
-Format each issue as:
-PRIORITY | FILE_PATH | ISSUE | WHAT_TO_DO
 """
     
     def get_quality_audit_prompt(self):
-        return f"""Audit {self.scoutpulse_path} for CODE QUALITY.
+        return """AUDIT CATEGORY: CODE QUALITY
 
 Check for TypeScript errors, console warnings, TODOs.
-
-Format each issue as:
-PRIORITY | FILE_PATH | ISSUE | WHAT_TO_DO
 """
     
     def parse_tasks(self, audits):
-        """Parse all audits into actionable tasks"""
+        """Turn the audits' reported issues into validated, de-duplicated tasks"""
         print("\n📋 Parsing tasks from audits...")
         
-        tasks = []
-        for category, audit_text in audits:
-            lines = audit_text.split('\n')
-            for line in lines:
-                if '|' in line:
-                    parts = [p.strip() for p in line.split('|')]
-                    if len(parts) >= 4 and any(p in parts[0].upper() for p in ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']):
-                        tasks.append({
-                            'priority': parts[0],
-                            'file': parts[1],
-                            'issue': parts[2],
-                            'action': parts[3],
-                            'category': category
-                        })
-        
-        # Sort by priority
-        priority_order = {'CRITICAL': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
-        tasks.sort(key=lambda x: priority_order.get(x['priority'], 4))
-        
-        return tasks
+        return tasks_from_audits(audits)
     
     def read_file(self, filepath):
         """Read a file"""
@@ -193,15 +215,12 @@ PRIORITY | FILE_PATH | ISSUE | WHAT_TO_DO
             return None
     
     def write_file(self, filepath, content):
-        """Write to a file"""
+        """Write to a file atomically; rolled back if it introduces new type errors"""
         full_path = os.path.join(self.scoutpulse_path, filepath.lstrip('/'))
         
-        # Create directory if needed
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
-        
         try:
-            with open(full_path, 'w') as f:
-                f.write(content)
+            if not self.verifier.guarded_write(filepath, lambda: write_atomic(full_path, content)):
+                return False
             print(f"✅ Wrote to {filepath}")
             return True
         except Exception as e:
@@ -216,14 +235,130 @@ PRIORITY | FILE_PATH | ISSUE | WHAT_TO_DO
         print(f"⚡ PRIORITY: {task['priority']}")
         print(f"{'='*70}\n")
         
-        # Read current file
+        current_content, use_edits, fix_prompt = self.prepare_fix(task)
+        
+        if not use_edits:
+            return self.stream_file_fix(task, fix_prompt)
+        
+        print("🤖 Asking Claude for targeted edits...")
+        
+        progress = StreamProgress(task['file'])
+        with self.rate_limiter.stream(
+            self.client,
+            model="claude-sonnet-4-20250514",
+            max_tokens=8000,
+            messages=[{"role": "user", "content": fix_prompt}]
+        ) as stream:
+            for text in stream.text_stream:
+                progress.update(text)
+            response = stream.get_final_message()
+        
+        return self.apply_fix(task, current_content, use_edits, response)
+    
+    def stream_file_fix(self, task, fix_prompt):
+        """Stream a whole-file fix straight into a temp file and swap it in when complete"""
+        print("🤖 Asking Claude to fix it...")
+        
+        full_path = os.path.join(self.scoutpulse_path, task['file'].lstrip('/'))
+        fences = FenceStripper()
+        progress = StreamProgress(task['file'])
+        
+        with AtomicWriter(full_path) as writer:
+            with self.rate_limiter.stream(
+                self.client,
+                model="claude-sonnet-4-20250514",
+                max_tokens=8000,
+                messages=[{"role": "user", "content": fix_prompt}]
+            ) as stream:
+                for text in stream.text_stream:
+                    writer.write(fences.feed(text))
+                    progress.update(text)
+                response = stream.get_final_message()
+            
+            if response.stop_reason == "max_tokens":
+                print(f"❌ Response for {task['file']} was truncated at max_tokens - not writing it")
+                return False
+            
+            writer.write(fences.finish())
+            if not self.verifier.guarded_write(task['file'], writer.commit):
+                return False
+        
+        progress.show()
+        print(f"✅ Wrote to {task['file']}")
+        return True
+    
+    def prepare_fix(self, task):
+        """Read the file and build its fix prompt; returns (current_content, use_edits, prompt)"""
         current_content = self.read_file(task['file'])
         if current_content is None:
             print("⚠️  File doesn't exist yet. Creating new file...")
             current_content = ""
         
-        # Ask Claude to fix it
-        fix_prompt = f"""Fix this file for ScoutPulse.
+        # New or empty files are always written whole; existing ones get SEARCH/REPLACE edits
+        use_edits = self.edit_mode == 'diff' and bool(current_content)
+        if use_edits:
+            output_instructions = EDIT_FORMAT_INSTRUCTIONS
+        else:
+            output_instructions = "Return ONLY the complete fixed file content. No explanations, no markdown, just the code."
+        
+        return current_content, use_edits, self.build_fix_prompt(task, current_content, output_instructions)
+    
+    def apply_fix(self, task, current_content, use_edits, response):
+        """Write Claude's fix to disk, either by applying its edits or as a whole file"""
+        if response.stop_reason == "max_tokens":
+            print(f"❌ Response for {task['file']} was truncated at max_tokens - not writing it")
+            return False
+        
+        text = response.content[0].text
+        
+        if use_edits:
+            try:
+                edits = parse_edits(text)
+                fixed_content = apply_edits(current_content, edits)
+            except EditError as e:
+                print(f"❌ Could not apply edits to {task['file']}: {e}")
+                return False
+            
+            print(f"✏️  Applying {len(edits)} edit(s)")
+            return self.write_file(task['file'], fixed_content)
+        
+        # Clean up markdown if Claude added it
+        fixed_content = re.sub(r'^```[a-z]*\n', '', text)
+        fixed_content = re.sub(r'\n```$', '', fixed_content)
+        
+        return self.write_file(task['file'], fixed_content)
+    
+    def batch_fix(self, tasks):
+        """Submit one fix request per file as a batch job and apply the results"""
+        prepared = {}
+        requests = []
+        for i, task in enumerate(group_tasks(tasks), 1):
+            current_content, use_edits, fix_prompt = self.prepare_fix(task)
+            custom_id = f"fix-{i}"
+            prepared[custom_id] = (task, current_content, use_edits)
+            requests.append((custom_id, dict(
+                model="claude-sonnet-4-20250514",
+                max_tokens=8000,
+                messages=[{"role": "user", "content": fix_prompt}]
+            )))
+        
+        print(f"📦 Batching fixes for {len(requests)} files")
+        messages = self.batch_runner.run('fixes', requests)
+        
+        completed = []
+        failed = []
+        for custom_id, (task, current_content, use_edits) in prepared.items():
+            message = messages.get(custom_id)
+            if message is not None and self.apply_fix(task, current_content, use_edits, message):
+                completed.extend(task['tasks'])
+            else:
+                failed.extend(task['tasks'])
+        
+        return completed, failed
+    
+    def build_fix_prompt(self, task, current_content, output_instructions):
+        """Build the fix prompt shared by full-file and edit modes"""
+        return f"""Fix this file for ScoutPulse.
 
 FILE: {task['file']}
 ISSUE: {task['issue']}
@@ -242,26 +377,7 @@ REQUIREMENTS:
 5. Ensure TypeScript types are correct
 6. Keep code clean and readable
 
-Return ONLY the complete fixed file content. No explanations, no markdown, just the code."""
-
-        print("🤖 Asking Claude to fix it...")
-        
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=8000,
-            messages=[{"role": "user", "content": fix_prompt}]
-        )
-        
-        fixed_content = response.content[0].text
-        
-        # Clean up markdown if Claude added it
-        fixed_content = re.sub(r'^```[a-z]*\n', '', fixed_content)
-        fixed_content = re.sub(r'\n```$', '', fixed_content)
-        
-        # Write to file
-        success = self.write_file(task['file'], fixed_content)
-        
-        return success
+{output_instructions}"""
     
     def save_audit_report(self, audits):
         """Save audit report"""
@@ -325,24 +441,15 @@ Return ONLY the complete fixed file content. No explanations, no markdown, just
             print("\n❌ Cancelled. Check the audit report for details.")
             return
         
-        # Fix each task
-        completed = []
-        failed = []
+        # Load the TypeScript project while the fixes are being generated
+        self.verifier.warm_up()
         
-        for i, task in enumerate(tasks, 1):
-            print(f"\n[{i}/{len(tasks)}]")
-            
-            success = self.fix_file(task)
-            
-            if success:
-                completed.append(task)
-                print("✅ Fixed!\n")
-            else:
-                failed.append(task)
-                print("❌ Failed\n")
-            
-            # Small delay to avoid rate limits
-            time.sleep(1)
+        # Fix all tasks for a file in one request, different files in parallel (or as one batch)
+        if self.batch_mode:
+            completed, failed = self.batch_fix(tasks)
+        else:
+            completed, failed = self.fix_scheduler.run(tasks)
+        self.verifier.stop()
         
         # Final report
         print("\n" + "="*70)
@@ -370,11 +477,18 @@ def main():
         API_KEY = input("Enter your Anthropic API key: ").strip()
         if not API_KEY:
             print("❌ API key required. Set ANTHROPIC_API_KEY environment variable or enter it when prompted.")
-            import sys
             sys.exit(1)
     SCOUTPULSE_PATH = input("📂 Enter ScoutPulse project path: ")
+    AUDIT_CONCURRENCY = int(os.getenv('AUDIT_CONCURRENCY', '5'))
+    FIX_WORKERS = int(os.getenv('FIX_WORKERS', '4'))
+    EDIT_MODE = 'full' if '--full-rewrite' in sys.argv else 'diff'
+    USE_CACHE = '--no-cache' not in sys.argv
+    BATCH_MODE = '--batch' in sys.argv
+    VERIFY = '--no-verify' not in sys.argv
     
-    polisher = DirectAPIPolisher(API_KEY, SCOUTPULSE_PATH)
+    polisher = DirectAPIPolisher(API_KEY, SCOUTPULSE_PATH, audit_concurrency=AUDIT_CONCURRENCY,
+                                 edit_mode=EDIT_MODE, fix_workers=FIX_WORKERS, use_cache=USE_CACHE,
+                                 batch_mode=BATCH_MODE, verify=VERIFY)
     polisher.run()
 
 if __name__ == "__main__":
@@ -5,10 +5,14 @@ Uses Claude + Cursor to systematically enhance your codebase
 """
 
 import anthropic
-import subprocess
 from pathlib import Path
 import json
 
+from context_compactor import ContextCompactor
+from relevance_ranker import RelevanceRanker
+from repo_index import get_repo_index
+from tool_executor import ToolExecutor
+
 class CodeEnhancementAgent:
     def __init__(self, api_key, project_path, enhancement_vision):
         self.client = anthropic.Anthropic(api_key=api_key)
@@ -18,26 +22,12 @@ class CodeEnhancementAgent:
     def analyze_current_codebase(self):
         """Use Claude to analyze what exists and what needs enhancement"""
         
-        # Get file structure
-        file_tree = subprocess.run(
-            ['tree', '-L', '3', '-I', 'node_modules'],
-            cwd=self.project_path,
-            capture_output=True,
-            text=True
-        ).stdout
-        
-        # Get key files
-        key_files = {}
-        patterns = ['*.tsx', '*.ts', '*.jsx', '*.js', 'package.json', 'README.md']
+        # Get file structure (one indexed walk, node_modules and .gitignore'd paths pruned)
+        index = get_repo_index(self.project_path)
+        file_tree = index.tree(max_depth=3)
         
-        for pattern in patterns:
-            files = list(self.project_path.glob(f'**/{pattern}'))[:20]  # Limit to 20 files
-            for file in files:
-                if 'node_modules' not in str(file):
-                    try:
-                        key_files[str(file.relative_to(self.project_path))] = file.read_text()[:2000]
-                    except:
-                        pass
+        # Get key files: ranked by imports, churn and the vision, whole files or whole declarations
+        key_files, _ = RelevanceRanker(str(self.project_path)).pack(self.enhancement_vision)
         
         # Analyze with Claude
         response = self.client.messages.create(
@@ -53,8 +43,8 @@ ENHANCEMENT VISION:
 CURRENT FILE STRUCTURE:
 {file_tree}
 
-KEY FILES (first 2000 chars each):
-{json.dumps(key_files, indent=2)}
+KEY FILES (most relevant first):
+{key_files}
 
 Create a detailed enhancement plan as JSON:
 {{
@@ -212,88 +202,98 @@ Begin!"""
         
         turn = 0
         max_turns = 150
+        compactor = ContextCompactor(self.client)
+        executor = ToolExecutor(str(self.project_path))
+        total_input = 0
         
-        while turn < max_turns:
-            turn += 1
-            print(f"\n[Turn {turn}] 🔧 Enhancing...")
+        try:
+            while turn < max_turns:
+                turn += 1
+                print(f"\n[Turn {turn}] 🔧 Enhancing...")
             
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=4096,
-                system=system_prompt,
-                tools=[
-                    {
-                        "type": "computer_20250124",
-                        "name": "computer",
-                        "display_width_px": 1920,
-                        "display_height_px": 1080,
-                        "display_number": 1
-                    },
-                    {
-                        "type": "bash_20250124",
-                        "name": "bash"
-                    },
-                    {
-                        "type": "text_editor_20250124",
-                        "name": "str_replace_editor"
-                    }
-                ],
-                messages=messages
-            )
+                response = self.client.messages.create(
+                    model="claude-sonnet-4-20250514",
+                    max_tokens=4096,
+                    system=system_prompt,
+                    tools=[
+                        {
+                            "type": "computer_20250124",
+                            "name": "computer",
+                            "display_width_px": 1920,
+                            "display_height_px": 1080,
+                            "display_number": 1
+                        },
+                        {
+                            "type": "bash_20250124",
+                            "name": "bash"
+                        },
+                        {
+                            "type": "text_editor_20250124",
+                            "name": "str_replace_editor"
+                        }
+                    ],
+                    messages=compactor.build(messages)
+                )
             
-            messages.append({
-                "role": "assistant",
-                "content": response.content
-            })
+                usage = response.usage
+                total_input += usage.input_tokens
+                print(f"📏 {usage.input_tokens} input / {usage.output_tokens} output tokens ({compactor.describe()})")
+            
+                messages.append({
+                    "role": "assistant",
+                    "content": response.content
+                })
             
-            # Process response
-            has_tool_use = any(block.type == "tool_use" for block in response.content)
+                # Process response
+                has_tool_use = any(block.type == "tool_use" for block in response.content)
             
-            if not has_tool_use:
-                for block in response.content:
-                    if block.type == "text":
-                        print(f"\n💬 Claude: {block.text[:300]}...")
+                if not has_tool_use:
+                    for block in response.content:
+                        if block.type == "text":
+                            print(f"\n💬 Claude: {block.text[:300]}...")
                         
-                        if any(phrase in block.text.lower() for phrase in [
-                            "all enhancements complete",
-                            "enhancement process finished",
-                            "successfully enhanced",
-                            "all improvements done"
-                        ]):
-                            print("\n🎉 ENHANCEMENTS COMPLETE!")
-                            return True
+                            if any(phrase in block.text.lower() for phrase in [
+                                "all enhancements complete",
+                                "enhancement process finished",
+                                "successfully enhanced",
+                                "all improvements done"
+                            ]):
+                                print("\n🎉 ENHANCEMENTS COMPLETE!")
+                                print(f"📏 {total_input} input tokens over {turn} turns")
+                                print(f"⏱️  {executor.summary()}")
+                                return True
                 
-                messages.append({
-                    "role": "user",
-                    "content": "Continue with the next enhancement."
-                })
-                continue
+                    messages.append({
+                        "role": "user",
+                        "content": "Continue with the next enhancement."
+                    })
+                    continue
             
-            # Execute tools and continue
-            tool_results = []
-            for block in response.content:
-                if block.type == "text":
-                    print(f"\n💭 {block.text[:150]}...")
-                    
-                elif block.type == "tool_use":
-                    print(f"\n🔧 Tool: {block.name}")
+                # Execute tools and continue
+                tool_uses = []
+                for block in response.content:
+                    if block.type == "text":
+                        print(f"\n💭 {block.text[:150]}...")
                     
-                    # In real implementation, tools would execute here
-                    result = {
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": "Executed successfully"
-                    }
-                    tool_results.append(result)
+                    elif block.type == "tool_use":
+                        print(f"\n🔧 Tool: {block.name}")
+                        tool_uses.append(block)
             
-            if tool_results:
-                messages.append({
-                    "role": "user",
-                    "content": tool_results
-                })
+                # Independent calls run side by side; calls on the same file keep their order
+                tool_results = executor.run(tool_uses)
+            
+                if tool_results:
+                    messages.append({
+                        "role": "user",
+                        "content": tool_results
+                    })
         
-        print("\n⚠️ Reached maximum turns")
-        return False
+            print("\n⚠️ Reached maximum turns")
+            print(f"📏 {total_input} input tokens over {turn} turns")
+            print(f"⏱️  {executor.summary()}")
+            return False
+        finally:
+            executor.close()
 
 
 def main():
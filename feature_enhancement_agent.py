@@ -7,16 +7,20 @@ that make ScoutPulse more competitive and valuable
 
 import anthropic
 import time
-import json
 import os
 import sys
 from pathlib import Path
 
+from json_stream import stream_json_items
+from plan_prefetcher import PlanPrefetcher
+from response_cache import ResponseCache
+
 class FeatureEnhancementAgent:
-    def __init__(self, api_key, project_path):
+    def __init__(self, api_key, project_path, use_cache=True):
         self.client = anthropic.Anthropic(api_key=api_key)
         self.project_path = project_path
         self.features_added = 0
+        self.cache = ResponseCache(project_path, enabled=use_cache)
         
     def scan_for_enhancements(self, focus_area=None):
         """Scan for feature enhancement opportunities"""
@@ -141,26 +145,11 @@ Return as JSON array with these exact fields:
         if focus_area:
             print(f"   Focus: {focus_areas.get(focus_area, focus_area)}")
         
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=8000,
-            messages=[{"role": "user", "content": enhancement_prompt}]
-        )
-        
-        content = response.content[0].text
-        
-        # Extract JSON
-        try:
-            start = content.find('[')
-            end = content.rfind(']') + 1
-            if start >= 0 and end > start:
-                enhancements = json.loads(content[start:end])
-                return enhancements
-        except Exception as e:
-            print(f"❌ Error parsing: {e}")
-            return []
-        
-        return []
+        # Enhancements are listed as they stream in
+        enhancements, complete = stream_json_items(self.client, self.cache, enhancement_prompt, max_tokens=8000)
+        if not complete:
+            print(f"⚠️  Partial list: only the {len(enhancements)} enhancement(s) that arrived intact - run again for the rest")
+        return enhancements
     
     def present_enhancement(self, enhancement, number, total):
         """Present a single enhancement to user"""
@@ -246,64 +235,82 @@ Return as JSON array with these exact fields:
                     print("\n")
             return
         
-        # Process each enhancement
-        for i, enhancement in enumerate(enhancements, 1):
-            # Present the enhancement
-            self.present_enhancement(enhancement, i, len(enhancements))
-            
-            # Ask for permission
-            print("\n" + "-"*70)
-            try:
-                response = input("\nAdd this feature? (y/n/skip/quit): ").lower().strip()
-            except (EOFError, KeyboardInterrupt):
-                print("\n⚠️  Session ended")
-                break
-            
-            if response == 'quit' or response == 'q':
-                print("\n⚠️  Session ended by user")
-                break
-            elif response == 'skip' or response == 's':
-                print("⏭️  Skipped")
-                continue
-            elif response != 'y' and response != 'yes':
-                print("⏭️  Skipped")
-                continue
-            
-            # Instructions to implement
-            print("\n✅ Great choice! This will add real value.")
-            print("\n📋 To implement:")
-            print("   1. Open Cursor (Cmd+L)")
-            print("   2. Copy the IMPLEMENTATION PROMPT above")
-            print("   3. Paste into Cursor")
-            print("   4. Let Cursor build it")
-            print("   5. Test the new feature")
-            print("   6. Come back here")
-            
-            try:
-                input("\nPress Enter when feature is implemented and tested...")
-                verify = input("\n✓ Does the new feature work well? (y/n): ").lower().strip()
-            except (EOFError, KeyboardInterrupt):
-                print("\n⚠️  Skipping verification")
-                continue
-            
-            if verify == 'y' or verify == 'yes':
-                print("✅ Feature added!")
-                self.features_added += 1
+        # Plans for this and the next few enhancements are generated while you read
+        plans = PlanPrefetcher(self.client, self.cache, self.project_path)
+        
+        try:
+            # Process each enhancement
+            for i, enhancement in enumerate(enhancements, 1):
+                plans.schedule(enhancements, i - 1)
+                
+                # Present the enhancement
+                self.present_enhancement(enhancement, i, len(enhancements))
                 
-                # Ask for feedback
+                # Ask for permission
+                print("\n" + "-"*70)
                 try:
-                    feedback = input("\n💭 Any issues or tweaks needed? (or press Enter to continue): ").strip()
-                    if feedback:
-                        print(f"\n📝 Noted: {feedback}")
-                        print("   You can refine this later or ask Cursor to adjust it.")
+                    response = input("\nAdd this feature? (y/n/skip/quit): ").lower().strip()
                 except (EOFError, KeyboardInterrupt):
-                    pass
-            else:
-                print("⚠️  Feature may need refinement")
-            
-            # Brief pause
-            if i < len(enhancements):
-                time.sleep(1)
+                    print("\n⚠️  Session ended")
+                    break
+                
+                if response == 'quit' or response == 'q':
+                    print("\n⚠️  Session ended by user")
+                    break
+                elif response == 'skip' or response == 's':
+                    print("⏭️  Skipped")
+                    plans.cancel(i - 1)
+                    continue
+                elif response != 'y' and response != 'yes':
+                    print("⏭️  Skipped")
+                    plans.cancel(i - 1)
+                    continue
+                
+                # Instructions to implement
+                print("\n✅ Great choice! This will add real value.")
+                
+                plan = plans.get(enhancements, i - 1)
+                if plan:
+                    print("\n" + "="*70)
+                    print("📐 IMPLEMENTATION PLAN (Copy to Cursor):")
+                    print("="*70)
+                    print(plan)
+                    print("="*70)
+                print("\n📋 To implement:")
+                print("   1. Open Cursor (Cmd+L)")
+                print("   2. Copy the IMPLEMENTATION PLAN above (or the prompt, if no plan)")
+                print("   3. Paste into Cursor")
+                print("   4. Let Cursor build it")
+                print("   5. Test the new feature")
+                print("   6. Come back here")
+                
+                try:
+                    input("\nPress Enter when feature is implemented and tested...")
+                    verify = input("\n✓ Does the new feature work well? (y/n): ").lower().strip()
+                except (EOFError, KeyboardInterrupt):
+                    print("\n⚠️  Skipping verification")
+                    continue
+                
+                if verify == 'y' or verify == 'yes':
+                    print("✅ Feature added!")
+                    self.features_added += 1
+                    
+                    # Ask for feedback
+                    try:
+                        feedback = input("\n💭 Any issues or tweaks needed? (or press Enter to continue): ").strip()
+                        if feedback:
+                            print(f"\n📝 Noted: {feedback}")
+                            print("   You can refine this later or ask Cursor to adjust it.")
+                    except (EOFError, KeyboardInterrupt):
+                        pass
+                else:
+                    print("⚠️  Feature may need refinement")
+                
+                # Brief pause
+                if i < len(enhancements):
+                    time.sleep(1)
+        finally:
+            plans.close()
         
         # Summary
         print("\n" + "="*70)
@@ -401,7 +408,7 @@ def main():
     print(f"📂 Project: {PROJECT_PATH}")
     print(f"🎯 Mission: Add valuable features users will love\n")
     
-    agent = FeatureEnhancementAgent(API_KEY, PROJECT_PATH)
+    agent = FeatureEnhancementAgent(API_KEY, PROJECT_PATH, use_cache='--no-cache' not in sys.argv)
     
     # Check for command-line arguments
     non_interactive = '--list' in sys.argv or '--non-interactive' in sys.argv
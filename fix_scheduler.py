@@ -0,0 +1,91 @@
+"""
+ScoutPulse Fix Scheduler
+Merges audit tasks per file and fixes different files in parallel
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+PRIORITY_ORDER = {'CRITICAL': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
+
+
+def priority_rank(priority):
+    return PRIORITY_ORDER.get(str(priority).strip().upper(), 4)
+
+
+def normalize_path(filepath):
+    """Collapse './app/x', '/app/x' and 'app//x' to the same key"""
+    return os.path.normpath(filepath.strip().lstrip('/'))
+
+
+def group_tasks(tasks):
+    """Merge all tasks for the same file into one task, most urgent files first"""
+    groups = {}
+    for task in tasks:
+        groups.setdefault(normalize_path(task['file']), []).append(task)
+
+    merged = []
+    for path, file_tasks in groups.items():
+        file_tasks = sorted(file_tasks, key=lambda t: priority_rank(t['priority']))
+
+        if len(file_tasks) == 1:
+            merged_task = dict(file_tasks[0], file=path)
+        else:
+            merged_task = {
+                'priority': file_tasks[0]['priority'],
+                'file': path,
+                'issue': "\n".join(f"{i}. {t['issue']}" for i, t in enumerate(file_tasks, 1)),
+                'action': "\n".join(f"{i}. {t['action']}" for i, t in enumerate(file_tasks, 1)),
+                'category': ", ".join(sorted({t.get('category', '') for t in file_tasks} - {''})),
+            }
+        merged_task['tasks'] = file_tasks
+        merged.append(merged_task)
+
+    merged.sort(key=lambda t: priority_rank(t['priority']))
+    return merged
+
+
+class FixScheduler:
+    def __init__(self, fix_fn, base_path, workers=4):
+        self.fix_fn = fix_fn
+        self.base_path = base_path
+        self.workers = max(1, workers)
+        self.locks = {}
+        self.locks_guard = threading.Lock()
+
+    def lock_for(self, filepath):
+        """One lock per resolved path, so two writers never race on a file"""
+        key = os.path.realpath(os.path.join(self.base_path, normalize_path(filepath)))
+        with self.locks_guard:
+            return self.locks.setdefault(key, threading.Lock())
+
+    def fix_one(self, task):
+        with self.lock_for(task['file']):
+            try:
+                return self.fix_fn(task)
+            except Exception as e:
+                print(f"❌ Error fixing {task['file']}: {e}")
+                return False
+
+    def run(self, tasks):
+        """Fix all tasks; returns (completed, failed) lists of the original tasks"""
+        file_tasks = group_tasks(tasks)
+        print(f"🗂️  {len(tasks)} tasks across {len(file_tasks)} files ({self.workers} workers)")
+
+        completed = []
+        failed = []
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.fix_one, task): task for task in file_tasks}
+
+            for done, future in enumerate(as_completed(futures), 1):
+                task = futures[future]
+                if future.result():
+                    completed.extend(task['tasks'])
+                    print(f"[{done}/{len(file_tasks)}] ✅ Fixed {task['file']} ({len(task['tasks'])} tasks)")
+                else:
+                    failed.extend(task['tasks'])
+                    print(f"[{done}/{len(file_tasks)}] ❌ Failed {task['file']}")
+
+        return completed, failed
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+ScoutPulse IDE Queue Consumer
+The other end of the queue transport: claims queued prompts oldest first and
+hands each one to IDE_QUEUE_COMMAND (a headless coding agent or script that
+reads the prompt on stdin, run in the project directory), then records the
+outcome in done/. Without a command, prompts are printed for a person to paste
+
+    IDE_QUEUE_COMMAND="my-agent --stdin" python3 ide_queue_consumer.py [--once] /path/to/project
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+from ide_transport import QueueTransport
+
+
+class QueueConsumer:
+    def __init__(self, transport, command=None, handler=None, timeout=None):
+        if timeout is None:
+            timeout = float(os.getenv('IDE_QUEUE_TIMEOUT', '900'))
+        self.transport = transport
+        self.command = command if command is not None else os.getenv('IDE_QUEUE_COMMAND')
+        self.handler = handler or self.run_command  # handler(message) -> (ok, output)
+        self.timeout = timeout
+        self.handled = 0
+
+    def run_command(self, message):
+        if message['action'] == 'open':
+            return True, f"Project {message['path']}"
+
+        if not self.command:
+            print("\n" + "=" * 70)
+            print(f"📋 PROMPT {message['id']} - paste into your IDE:")
+            print("=" * 70)
+            print(message['text'])
+            return True, "printed"
+
+        try:
+            result = subprocess.run(
+                self.command,
+                shell=True,
+                input=message['text'],
+                cwd=message.get('project') or self.transport.project_path,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            return False, f"timed out after {self.timeout:g}s"
+        output = (result.stdout + result.stderr).strip()
+        return result.returncode == 0, output
+
+    def process_one(self):
+        """Handle the oldest pending message; returns it, or None if the queue is empty"""
+        message = self.transport.claim()
+        if message is None:
+            return None
+        try:
+            ok, output = self.handler(message)
+        except Exception as e:
+            ok, output = False, f"{type(e).__name__}: {e}"
+        self.transport.complete(message, ok, output)
+        self.handled += 1
+        print(f"{'✅' if ok else '❌'} {message['action']} {message['id']}")
+        return message
+
+    def run(self, poll_interval=1, once=False):
+        """Drain the queue; keep polling for new messages unless `once`"""
+        print(f"📭 Consuming {self.transport.pending_dir}")
+        while True:
+            while self.process_one() is not None:
+                pass
+            if once:
+                return self.handled
+            time.sleep(poll_interval)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    project_path = args[0] if args else os.getcwd()
+    consumer = QueueConsumer(QueueTransport(project_path))
+    try:
+        consumer.run(once='--once' in sys.argv)
+    except KeyboardInterrupt:
+        print(f"\n⚠️  Stopped after {consumer.handled} message(s)")
+
+
+if __name__ == "__main__":
+    main()
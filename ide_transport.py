@@ -0,0 +1,245 @@
+"""
+ScoutPulse IDE Transport
+How prompts get into the IDE. The paste backend keeps one osascript (JXA)
+driver running and pastes each prompt from the clipboard, so delivery takes
+the same time however long the prompt is. The queue backend drops prompts
+as JSON files for a headless consumer (ide_queue_consumer.py), which works on
+Linux and in tests. Pick one with IDE_TRANSPORT=paste|queue
+"""
+
+import atexit
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+from stream_writer import write_atomic
+
+# Reads one JSON command per line on stdin and answers "ok" or "error <reason>"
+JXA_DRIVER = r"""
+ObjC.import('Foundation');
+ObjC.import('AppKit');
+
+const events = Application('System Events');
+const stdin = $.NSFileHandle.fileHandleWithStandardInput;
+const stdout = $.NSFileHandle.fileHandleWithStandardOutput;
+
+function reply(text) {
+    stdout.writeData($(text + '\n').dataUsingEncoding($.NSUTF8StringEncoding));
+}
+
+function paste(text) {
+    const board = $.NSPasteboard.generalPasteboard;
+    const previous = board.stringForType($.NSPasteboardTypeString);
+    board.clearContents;
+    board.setStringForType($(text), $.NSPasteboardTypeString);
+    events.keystroke('v', {using: 'command down'});
+    delay(0.3);
+    if (!previous.isNil()) {
+        board.clearContents;
+        board.setStringForType(previous, $.NSPasteboardTypeString);
+    }
+}
+
+function handle(command) {
+    const app = Application(command.app);
+    app.activate();
+    delay(0.3);
+    if (command.action === 'open') {
+        app.open(Path(command.path));
+    } else if (command.action === 'send') {
+        events.keystroke('l', {using: 'command down'});
+        delay(0.5);
+        events.keystroke('a', {using: 'command down'});
+        paste(command.text);
+        events.keyCode(36);
+    }
+}
+
+let buffer = '';
+while (true) {
+    const data = stdin.availableData;
+    if (data.length === 0) break;
+    buffer += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;
+    let newline;
+    while ((newline = buffer.indexOf('\n')) >= 0) {
+        const line = buffer.slice(0, newline);
+        buffer = buffer.slice(newline + 1);
+        try {
+            handle(JSON.parse(line));
+            reply('ok');
+        } catch (e) {
+            reply('error ' + String(e).replace(/\n/g, ' '));
+        }
+    }
+}
+"""
+
+
+class PasteTransport:
+    """Long-lived osascript driver that pastes prompts into the IDE chat"""
+
+    name = 'paste'
+
+    def __init__(self, app='Cursor', timeout=30):
+        self.app = app
+        self.timeout = timeout
+        self.process = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.process and self.process.poll() is None:
+            return
+        self.process = subprocess.Popen(
+            ['osascript', '-l', 'JavaScript', '-e', JXA_DRIVER],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        atexit.register(self.close)
+
+    def command(self, **command):
+        with self.lock:
+            try:
+                self.start()
+                self.process.stdin.write(json.dumps(dict(command, app=self.app)) + '\n')
+                self.process.stdin.flush()
+            except OSError as e:
+                print(f"✗ IDE driver error: {e}")
+                self.close()
+                return False
+
+            reply = self.read_reply()
+            if reply == 'ok':
+                return True
+
+            print(f"✗ IDE driver error: {reply or 'no reply'}")
+            if not reply:
+                self.close()  # hung or dead; the next command starts a fresh driver
+            return False
+
+    def read_reply(self):
+        result = []
+        reader = threading.Thread(target=lambda: result.append(self.process.stdout.readline().strip()))
+        reader.daemon = True
+        reader.start()
+        reader.join(self.timeout)
+        return result[0] if result else None
+
+    def open_project(self, path):
+        return self.command(action='open', path=os.path.abspath(path))
+
+    def send(self, prompt):
+        return self.command(action='send', text=prompt)
+
+    def close(self):
+        if self.process and self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+        self.process = None
+
+
+class QueueTransport:
+    """Drops each prompt as a JSON file in a queue directory for a headless consumer"""
+
+    name = 'queue'
+
+    def __init__(self, project_path, queue_dir=None):
+        self.project_path = os.path.abspath(project_path)
+        self.queue_dir = queue_dir or os.getenv('IDE_QUEUE_DIR') or \
+            os.path.join(project_path, '.scoutpulse_cache', 'ide_queue')
+        self.pending_dir = os.path.join(self.queue_dir, 'pending')
+        self.done_dir = os.path.join(self.queue_dir, 'done')
+        self.last_id = None
+
+    def put(self, message):
+        os.makedirs(self.pending_dir, exist_ok=True)
+        message_id = f"{time.time_ns()}-{uuid.uuid4().hex[:6]}"
+        message = dict(message, id=message_id, project=self.project_path,
+                       created=time.strftime('%Y-%m-%d %H:%M:%S'))
+        write_atomic(os.path.join(self.pending_dir, f"{message_id}.json"), json.dumps(message, indent=2))
+        self.last_id = message_id
+        return message_id
+
+    def open_project(self, path):
+        self.put({'action': 'open', 'path': os.path.abspath(path)})
+        return True
+
+    def send(self, prompt):
+        message_id = self.put({'action': 'send', 'text': prompt})
+        print(f"📥 Queued prompt {message_id} in {self.pending_dir}")
+        return True
+
+    def claim(self):
+        """Consumer side: take the oldest pending message (moved to done/), or None"""
+        os.makedirs(self.done_dir, exist_ok=True)
+        try:
+            names = sorted(n for n in os.listdir(self.pending_dir) if n.endswith('.json'))
+        except OSError:
+            return None
+
+        for name in names:
+            done_path = os.path.join(self.done_dir, name)
+            try:
+                os.replace(os.path.join(self.pending_dir, name), done_path)
+            except OSError:
+                continue  # another consumer got it first
+            with open(done_path, 'r') as f:
+                return json.load(f)
+        return None
+
+    def complete(self, message, ok, output=''):
+        """Consumer side: record how a claimed message was handled"""
+        record = dict(message, status='ok' if ok else 'error', output=output[-4000:],
+                      finished=time.strftime('%Y-%m-%d %H:%M:%S'))
+        write_atomic(os.path.join(self.done_dir, f"{message['id']}.json"), json.dumps(record, indent=2))
+
+    def status(self, message_id):
+        """'pending', 'claimed', 'ok' or 'error'"""
+        if os.path.exists(os.path.join(self.pending_dir, f"{message_id}.json")):
+            return 'pending'
+        try:
+            with open(os.path.join(self.done_dir, f"{message_id}.json"), 'r') as f:
+                return json.load(f).get('status', 'claimed')
+        except (OSError, ValueError):
+            return 'pending'  # between the claim's rename and its first read
+
+    def wait(self, message_id, timeout=300, poll_interval=0.5):
+        """Block until a consumer has handled the message; its final status, or the current one on timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            status = self.status(message_id)
+            if status in ('ok', 'error') or time.monotonic() >= deadline:
+                return status
+            time.sleep(poll_interval)
+
+    def close(self):
+        pass
+
+
+_shared_transport = None
+_shared_lock = threading.Lock()
+
+
+def get_transport(project_path):
+    """Process-wide IDE transport; IDE_TRANSPORT picks the backend (paste on macOS, queue elsewhere)"""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            default = 'paste' if sys.platform == 'darwin' else 'queue'
+            backend = os.getenv('IDE_TRANSPORT', default).lower()
+            if backend == 'paste':
+                _shared_transport = PasteTransport(app=os.getenv('IDE_APP', 'Cursor'))
+            elif backend == 'queue':
+                _shared_transport = QueueTransport(project_path)
+            else:
+                raise ValueError(f"Unknown IDE_TRANSPORT '{backend}' (use paste or queue)")
+        return _shared_transport
@@ -0,0 +1,158 @@
+"""
+ScoutPulse Improvement History
+One SQLite store of applied improvements shared by the continuous and Cursor
+agents. Indexed title/file lookups, no retention limit, and WAL mode so both
+agents can write at the same time. The old .improvement_history.json is
+imported the first time the store is opened
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS improvements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    title TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    file TEXT NOT NULL DEFAULT '',
+    type TEXT,
+    agent TEXT
+);
+CREATE INDEX IF NOT EXISTS improvements_title ON improvements (title_key, file);
+CREATE INDEX IF NOT EXISTS improvements_file ON improvements (file);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def title_key(title):
+    """Case- and whitespace-insensitive form of a title, used for lookups"""
+    return re.sub(r'\s+', ' ', str(title or '')).strip().lower()
+
+
+def as_timestamp(value):
+    """ISO timestamp from an ISO string, epoch seconds or None"""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value).isoformat()
+    return value or datetime.now().isoformat()
+
+
+class ImprovementHistory:
+    def __init__(self, project_path, db_path=None):
+        self.project_path = project_path
+        self.db_path = db_path or os.path.join(project_path, '.scoutpulse_cache', 'history.db')
+        self.legacy_file = os.path.join(project_path, '.improvement_history.json')
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.db = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+        self.migrate()
+
+    def migrate(self):
+        """Import the legacy JSON history (either agent's schema) once, then set it aside"""
+        if not os.path.exists(self.legacy_file):
+            return
+        try:
+            with open(self.legacy_file, 'r') as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not import {self.legacy_file}: {e}")
+            return
+
+        if isinstance(legacy, dict):
+            # ContinuousImprovementAgent: {'improvements': [...], 'last_scan': ..., 'total_improvements': n}
+            entries, agent, last_scan = legacy.get('improvements', []), 'continuous', legacy.get('last_scan')
+        else:
+            # CursorImprovementAgent: [{'title', 'file', 'timestamp': epoch}, ...]
+            entries, agent, last_scan = legacy, 'cursor', None
+
+        with self.lock, self.db:
+            # BEGIN IMMEDIATE so two agents starting together can't both import it
+            self.db.execute('BEGIN IMMEDIATE')
+            if self.get_meta_unlocked('legacy_imported'):
+                return
+            for entry in entries:
+                if isinstance(entry, dict) and entry.get('title'):
+                    self.insert(entry, agent)
+            if last_scan:
+                self.set_meta_unlocked('last_scan', last_scan)
+            self.set_meta_unlocked('legacy_imported', datetime.now().isoformat())
+
+        try:
+            os.replace(self.legacy_file, self.legacy_file + '.migrated')
+        except OSError:
+            pass
+        print(f"📦 Imported {len(entries)} improvement(s) from {os.path.basename(self.legacy_file)}")
+
+    def insert(self, improvement, agent):
+        self.db.execute(
+            'INSERT INTO improvements (timestamp, title, title_key, file, type, agent) VALUES (?, ?, ?, ?, ?, ?)',
+            (
+                as_timestamp(improvement.get('timestamp')),
+                improvement['title'],
+                title_key(improvement['title']),
+                improvement.get('file') or '',
+                improvement.get('type'),
+                agent,
+            )
+        )
+
+    def add(self, improvement, agent=None):
+        """Record an applied improvement (needs at least a title)"""
+        with self.lock, self.db:
+            self.insert(improvement, agent)
+
+    def seen(self, title, file=None):
+        """True if an improvement with this title (on this file, if given) was already applied"""
+        query = 'SELECT 1 FROM improvements WHERE title_key = ?'
+        params = [title_key(title)]
+        if file is not None:
+            query += ' AND file = ?'
+            params.append(file)
+        with self.lock:
+            return self.db.execute(query + ' LIMIT 1', params).fetchone() is not None
+
+    def for_file(self, file):
+        """Every improvement applied to one file, oldest first"""
+        with self.lock:
+            rows = self.db.execute('SELECT * FROM improvements WHERE file = ? ORDER BY id', (file,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def recent(self, limit=20):
+        """The most recent improvements, oldest first"""
+        with self.lock:
+            rows = self.db.execute('SELECT * FROM improvements ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def count(self):
+        with self.lock:
+            return self.db.execute('SELECT COUNT(*) FROM improvements').fetchone()[0]
+
+    def get_meta_unlocked(self, key):
+        row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta_unlocked(self, key, value):
+        self.db.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def get_meta(self, key):
+        with self.lock:
+            return self.get_meta_unlocked(key)
+
+    def set_meta(self, key, value):
+        with self.lock, self.db:
+            self.set_meta_unlocked(key, value)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,147 @@
+"""
+ScoutPulse JSON Stream
+Pulls the objects of a JSON array out of a model response as they arrive, so
+scanners can show the first result within seconds instead of waiting for the
+whole response. Prose and code fences around the array are ignored
+"""
+
+import json
+
+from rate_limiter import get_rate_limiter
+
+TITLE_KEYS = ('title', 'feature_name', 'enhancement_name', 'name')
+
+
+class JsonArrayParser:
+    """Incremental parser: feed() text chunks, get back each array element object once it closes"""
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0
+        self.in_array = False
+        self.finished = False
+        self.depth = 0  # nesting below the top-level array
+        self.in_string = False
+        self.escaped = False
+        self.start = None  # buffer offset of the element being read
+        self.skipped = 0  # elements that were not valid JSON objects
+
+    def feed(self, text):
+        self.buffer += text
+        items = []
+        buffer = self.buffer
+
+        while self.pos < len(buffer) and not self.finished:
+            ch = buffer[self.pos]
+
+            if not self.in_array:
+                if ch == '[':
+                    rest = buffer[self.pos + 1:].lstrip()
+                    if not rest:
+                        break  # can't tell yet whether this bracket opens the array
+                    self.in_array = rest[0] in '{]'  # an array of objects, not a [link] in prose
+                self.pos += 1
+                continue
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in '{[':
+                if self.depth == 0:
+                    self.start = self.pos
+                self.depth += 1
+            elif ch in '}]':
+                if self.depth == 0:
+                    self.finished = ch == ']'
+                else:
+                    self.depth -= 1
+                    if self.depth == 0:
+                        item = self.decode(buffer[self.start:self.pos + 1])
+                        if item is not None:
+                            items.append(item)
+                        self.start = None
+            self.pos += 1
+
+        # Keep only what may still be needed
+        keep = self.start if self.start is not None else self.pos
+        self.buffer = buffer[keep:]
+        self.pos -= keep
+        if self.start is not None:
+            self.start = 0
+        return items
+
+    def decode(self, text):
+        try:
+            item = json.loads(text, strict=False)  # models put raw newlines in strings
+        except ValueError:
+            self.skipped += 1
+            return None
+        if not isinstance(item, dict):
+            self.skipped += 1
+            return None
+        return item
+
+
+def parse_items(text):
+    """All objects of the first JSON array of objects in `text`"""
+    return JsonArrayParser().feed(text)
+
+
+def preview(item, number, label=''):
+    title = next((item[key] for key in TITLE_KEYS if item.get(key)), 'Untitled')
+    print(f"   📥 {label}{number}. {title}")
+
+
+def stream_json_items(client, cache, prompt, max_tokens=8000, on_item=preview, label=''):
+    """(items, complete): objects of the JSON array in the response to `prompt`, each passed to
+    on_item as it arrives
+
+    complete is True only if the model finished (end_turn), the array was closed and no item was
+    malformed; only complete responses are cached. Served from the response cache when the
+    request and source tree are unchanged.
+    """
+    request = dict(
+        model="claude-sonnet-4-20250514",
+        max_tokens=max_tokens,
+        messages=[{"role": "user", "content": prompt}]
+    )
+    key = cache.key(request, cache.tree_hash()) if cache.enabled else None
+    text = cache.get(key) if key else None
+    if text is not None:
+        print("⚡ Using cached response (code and prompt unchanged)")
+        parser = JsonArrayParser()
+        items = parser.feed(text)
+        for number, item in enumerate(items, 1):
+            if on_item:
+                on_item(item, number, label)
+        return items, parser.finished and not parser.skipped
+
+    parser = JsonArrayParser()
+    items = []
+    parts = []
+    with get_rate_limiter().stream(client, **request) as stream:
+        for chunk in stream.text_stream:
+            parts.append(chunk)
+            for item in parser.feed(chunk):
+                items.append(item)
+                if on_item:
+                    on_item(item, len(items), label)
+        stop_reason = stream.current_message_snapshot.stop_reason
+
+    if stop_reason == "max_tokens":
+        print(f"⚠️  {label}Response hit max_tokens - keeping the {len(items)} complete item(s)")
+    elif not parser.finished:
+        print(f"⚠️  {label}No complete JSON array in the response")
+    if parser.skipped:
+        print(f"⚠️  {label}Skipped {parser.skipped} malformed item(s)")
+
+    complete = stop_reason == "end_turn" and parser.finished and not parser.skipped
+    if key and complete:
+        cache.put(key, "".join(parts), stop_reason)  # partial answers are never replayed
+    return items, complete
@@ -5,17 +5,22 @@ Makes the home page, login, and onboarding experience absolutely stunning
 """
 
 import anthropic
-import time
-import json
 import os
 import sys
 from pathlib import Path
 
+from rate_limiter import get_rate_limiter
+from json_stream import stream_json_items
+from plan_prefetcher import PlanPrefetcher
+from response_cache import ResponseCache
+
 class LandingPageAgent:
-    def __init__(self, api_key, project_path):
+    def __init__(self, api_key, project_path, use_cache=True):
         self.client = anthropic.Anthropic(api_key=api_key)
+        self.rate_limiter = get_rate_limiter()
         self.project_path = project_path
         self.enhancements_added = 0
+        self.cache = ResponseCache(project_path, enabled=use_cache)
         
     def scan_landing_page_enhancements(self):
         """Scan for landing page, login, and onboarding enhancements"""
@@ -249,26 +254,11 @@ Return as JSON array. Focus on HIGH wow-factor items.
         print(f"\n🔍 Analyzing landing page, login, and onboarding...")
         print(f"   🎯 Goal: Premium SaaS first impression")
         
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=16000,
-            messages=[{"role": "user", "content": enhancement_prompt}]
-        )
-        
-        content = response.content[0].text
-        
-        # Extract JSON
-        try:
-            start = content.find('[')
-            end = content.rfind(']') + 1
-            if start >= 0 and end > start:
-                enhancements = json.loads(content[start:end])
-                return enhancements
-        except Exception as e:
-            print(f"❌ Error parsing: {e}")
-            return []
-        
-        return []
+        # Enhancements are listed as they stream in
+        enhancements, complete = stream_json_items(self.client, self.cache, enhancement_prompt, max_tokens=16000)
+        if not complete:
+            print(f"⚠️  Partial list: only the {len(enhancements)} enhancement(s) that arrived intact - run again for the rest")
+        return enhancements
     
     def present_enhancement(self, enhancement, number, total):
         """Present enhancement to user"""
@@ -401,57 +391,72 @@ Return as JSON array. Focus on HIGH wow-factor items.
                     print("\n")
             return
         
-        # Present each enhancement
-        for i, enhancement in enumerate(enhancements, 1):
-            self.present_enhancement(enhancement, i, len(enhancements))
-            
-            print("\n" + "-"*70)
-            try:
-                response = input("\nAdd this enhancement? (y/n/skip/quit): ").lower().strip()
-            except (EOFError, KeyboardInterrupt):
-                print("\n⚠️  Session ended")
-                break
-            
-            if response == 'quit' or response == 'q':
-                print("\n⚠️  Session ended")
-                break
-            elif response == 'skip' or response == 's':
-                print("⏭️  Skipped")
-                continue
-            elif response != 'y' and response != 'yes':
-                print("⏭️  Skipped")
-                continue
-            
-            # Implementation instructions
-            print("\n✅ Excellent choice!")
-            print("\n📋 To implement:")
-            print("   1. Open Cursor (Cmd+L)")
-            print("   2. Copy the IMPLEMENTATION prompt above")
-            print("   3. Paste into Cursor chat")
-            print("   4. Let Cursor build it")
-            print("   5. Test it in browser")
-            print("   6. Come back here")
-            
-            try:
-                input("\nPress Enter when implemented and tested...")
-                verify = input("\n✓ Does it look amazing? (y/n): ").lower().strip()
-            except (EOFError, KeyboardInterrupt):
-                print("\n⚠️  Skipping verification")
-                continue
-            
-            if verify == 'y' or verify == 'yes':
-                print("✅ Enhancement added!")
-                self.enhancements_added += 1
-            else:
-                print("⚠️  May need refinement")
+        # Plans for this and the next few enhancements are generated while you read
+        plans = PlanPrefetcher(self.client, self.cache, self.project_path)
+        
+        try:
+            # Present each enhancement
+            for i, enhancement in enumerate(enhancements, 1):
+                plans.schedule(enhancements, i - 1)
+                self.present_enhancement(enhancement, i, len(enhancements))
+                
+                print("\n" + "-"*70)
+                try:
+                    response = input("\nAdd this enhancement? (y/n/skip/quit): ").lower().strip()
+                except (EOFError, KeyboardInterrupt):
+                    print("\n⚠️  Session ended")
+                    break
+                
+                if response == 'quit' or response == 'q':
+                    print("\n⚠️  Session ended")
+                    break
+                elif response == 'skip' or response == 's':
+                    print("⏭️  Skipped")
+                    plans.cancel(i - 1)
+                    continue
+                elif response != 'y' and response != 'yes':
+                    print("⏭️  Skipped")
+                    plans.cancel(i - 1)
+                    continue
+                
+                # Implementation instructions
+                print("\n✅ Excellent choice!")
+                
+                plan = plans.get(enhancements, i - 1)
+                if plan:
+                    print("\n" + "="*70)
+                    print("📐 IMPLEMENTATION PLAN (Copy to Cursor):")
+                    print("="*70)
+                    print(plan)
+                    print("="*70)
+                print("\n📋 To implement:")
+                print("   1. Open Cursor (Cmd+L)")
+                print("   2. Copy the IMPLEMENTATION PLAN above (or the prompt, if no plan)")
+                print("   3. Paste into Cursor chat")
+                print("   4. Let Cursor build it")
+                print("   5. Test it in browser")
+                print("   6. Come back here")
+                
                 try:
-                    feedback = input("What needs adjustment? ").strip()
-                    if feedback:
-                        print(f"📝 Noted: {feedback}")
+                    input("\nPress Enter when implemented and tested...")
+                    verify = input("\n✓ Does it look amazing? (y/n): ").lower().strip()
                 except (EOFError, KeyboardInterrupt):
-                    pass
-            
-            time.sleep(1)
+                    print("\n⚠️  Skipping verification")
+                    continue
+                
+                if verify == 'y' or verify == 'yes':
+                    print("✅ Enhancement added!")
+                    self.enhancements_added += 1
+                else:
+                    print("⚠️  May need refinement")
+                    try:
+                        feedback = input("What needs adjustment? ").strip()
+                        if feedback:
+                            print(f"📝 Noted: {feedback}")
+                    except (EOFError, KeyboardInterrupt):
+                        pass
+        finally:
+            plans.close()
         
         # Summary
         print("\n" + "="*70)
@@ -513,9 +518,10 @@ def main():
     
     # Check for command-line arguments
     non_interactive = '--list' in sys.argv or '--non-interactive' in sys.argv
+    USE_CACHE = '--no-cache' not in sys.argv
     
     if non_interactive:
-        agent = LandingPageAgent(API_KEY, PROJECT_PATH)
+        agent = LandingPageAgent(API_KEY, PROJECT_PATH, use_cache=USE_CACHE)
         agent.list_all_enhancements()
         return
     
@@ -532,7 +538,7 @@ def main():
         confirm = input("Ready to make ScoutPulse stunning? (yes/no): ").lower().strip()
     except (EOFError, KeyboardInterrupt):
         print("\n⚠️  Running in list mode")
-        agent = LandingPageAgent(API_KEY, PROJECT_PATH)
+        agent = LandingPageAgent(API_KEY, PROJECT_PATH, use_cache=USE_CACHE)
         agent.list_all_enhancements()
         return
     
@@ -540,7 +546,7 @@ def main():
         print("\n❌ Cancelled")
         return
     
-    agent = LandingPageAgent(API_KEY, PROJECT_PATH)
+    agent = LandingPageAgent(API_KEY, PROJECT_PATH, use_cache=USE_CACHE)
     agent.run_landing_enhancement()
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+"""
+ScoutPulse Plan Prefetcher
+While someone reads enhancement i, the implementation plans for i and the next
+few enhancements are generated in the background, so the plan is usually
+ready the moment they say yes. Rejected items cancel their stream mid-flight,
+and a plan built from source that has changed since is regenerated
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from completion_watcher import paths_in
+from context_packer import ContextPacker
+from rate_limiter import get_rate_limiter
+
+PLAN_PROMPT = """Turn this approved enhancement for the ScoutPulse project at {project_path} into a
+ready-to-apply implementation plan.
+
+ENHANCEMENT:
+{enhancement}
+
+{sources}
+Write the plan as a single prompt to paste into Cursor:
+1. Every file to create or modify, with its exact path
+2. For each file, the concrete code to add or change (complete snippets, not descriptions)
+3. Any new dependencies, routes or database changes
+4. How to check it works
+
+Return only the plan.
+"""
+
+
+class PlanPrefetcher:
+    def __init__(self, client, cache, project_path, depth=None, max_tokens=4000):
+        if depth is None:
+            depth = int(os.getenv('PREFETCH_DEPTH', '2'))
+        self.client = client
+        self.cache = cache
+        self.project_path = project_path
+        self.depth = depth  # items generated ahead of the one being reviewed
+        self.max_tokens = max_tokens
+        self.rate_limiter = get_rate_limiter()
+        self.packer = ContextPacker(project_path)
+        self.packer_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=depth + 1)
+        self.jobs = {}  # item index -> (future, cancelled Event, tree hash it was built from)
+        self.ready = 0  # plans that were done before they were asked for
+        self.waited = 0
+
+    def prompt(self, enhancement):
+        text = json.dumps(enhancement, indent=2)
+        with self.packer_lock:
+            sources, _, _ = self.packer.pack_files(paths_in(text), self.packer.budget_tokens // 2)
+        if sources:
+            sources = f"CURRENT SOURCE FILES:\n{sources}\n"
+        return PLAN_PROMPT.format(project_path=self.project_path, enhancement=text, sources=sources)
+
+    def expand(self, enhancement, cancelled, tree):
+        """Stream one plan; None if cancelled part-way (nothing is cached then)"""
+        if cancelled.is_set():
+            return None
+
+        request = dict(
+            model="claude-sonnet-4-20250514",
+            max_tokens=self.max_tokens,
+            messages=[{"role": "user", "content": self.prompt(enhancement)}]
+        )
+        key = self.cache.key(request, tree) if self.cache.enabled else None
+        text = self.cache.get(key) if key else None
+        if text is not None:
+            return text
+
+        parts = []
+        with self.rate_limiter.stream(self.client, **request) as stream:
+            for chunk in stream.text_stream:
+                if cancelled.is_set():
+                    return None  # closing the stream stops generation
+                parts.append(chunk)
+            stop_reason = stream.current_message_snapshot.stop_reason
+
+        text = "".join(parts)
+        if stop_reason == "max_tokens":
+            print(f"⚠️  Implementation plan hit max_tokens ({self.max_tokens}) - its end is cut off")
+        if key:
+            self.cache.put(key, text, stop_reason)
+        return text
+
+    def submit(self, items, index, tree=None):
+        if index in self.jobs or not 0 <= index < len(items):
+            return
+        if tree is None:
+            tree = self.cache.tree_hash()
+        cancelled = threading.Event()
+        future = self.executor.submit(self.expand, items[index], cancelled, tree)
+        self.jobs[index] = (future, cancelled, tree)
+
+    def schedule(self, items, current):
+        """Make sure items[current] and the `depth` items after it are being generated"""
+        tree = self.cache.tree_hash()
+        for index in range(current, current + self.depth + 1):
+            self.submit(items, index, tree)
+
+    def get(self, items, index):
+        """The plan for items[index], waiting for it if needed; None if it failed"""
+        self.submit(items, index)
+        tree = self.cache.tree_hash()
+        if self.jobs[index][2] != tree:
+            # e.g. the previous item was implemented while this plan was generated ahead
+            print("🔄 Code changed since this plan was started - regenerating it")
+            self.cancel(index)
+            self.submit(items, index, tree)
+        future = self.jobs[index][0]
+        if future.done():
+            self.ready += 1
+        else:
+            self.waited += 1
+            print("⏳ Finishing the implementation plan...")
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"⚠️  Could not generate an implementation plan: {e}")
+            return None
+
+    def cancel(self, index):
+        """Drop a rejected item's plan, stopping its stream if it is already running"""
+        job = self.jobs.pop(index, None)
+        if job:
+            job[1].set()
+            job[0].cancel()
+
+    def close(self):
+        for index in list(self.jobs):
+            self.cancel(index)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.ready or self.waited:
+            print(f"📐 Plans ready on approval: {self.ready}/{self.ready + self.waited}")
@@ -5,69 +5,49 @@ Complete audit and polish for production deployment
 """
 
 import anthropic
-import subprocess
 import time
 import os
 import sys
-import json
+
+from audit_prompts import PromptCacheStats, build_audit_system
+from batch_runner import BatchRunner
+from completion_watcher import CompletionWatcher, paths_in
+from context_packer import ContextPacker
+from ide_transport import get_transport
+from rate_limiter import get_rate_limiter
+from task_extraction import (ISSUES_FORMAT, MAX_REPORT_TOKENS, REPORT_ISSUES_TOOL, TOOL_CHOICE, is_truncated,
+                             response_text, tasks_from_audits)
 
 class ProductionPolisher:
-    def __init__(self, api_key, scoutpulse_path):
+    def __init__(self, api_key, scoutpulse_path, batch_mode=False):
         self.client = anthropic.Anthropic(api_key=api_key)
+        self.rate_limiter = get_rate_limiter()
         self.scoutpulse_path = scoutpulse_path
         self.audit_results = {}
+        self.context_packer = ContextPacker(scoutpulse_path)
+        self.audit_system = None
+        self.cache_stats = PromptCacheStats()
+        self.batch_mode = batch_mode
+        self.batch_runner = BatchRunner(self.client, scoutpulse_path)
+        self.pending_audits = None
+        self.watcher = CompletionWatcher(scoutpulse_path)
+        self.transport = get_transport(scoutpulse_path)
         
     def open_cursor(self):
         """Open Cursor and load ScoutPulse project"""
         print("🚀 Opening Cursor...")
         
-        applescript = f'''
-        tell application "Cursor"
-            activate
-        end tell
-        
-        delay 2
-        
-        tell application "System Events"
-            keystroke "o" using {{command down}}
-            delay 1
-            keystroke "{self.scoutpulse_path}"
-            delay 0.5
-            keystroke return
-        end tell
-        '''
-        
-        subprocess.run(['osascript', '-e', applescript])
+        self.transport.open_project(self.scoutpulse_path)
         time.sleep(3)
         
     def send_to_cursor_ai(self, prompt):
         """Send prompt to Cursor AI"""
         print(f"💬 Sending to Cursor AI...")
         
-        # Clean the prompt for AppleScript
-        clean_prompt = prompt.replace('"', '\\"').replace("'", "'").replace('\n', ' ')
-        
-        applescript = f'''
-        tell application "Cursor"
-            activate
-        end tell
-        
-        tell application "System Events"
-            keystroke "l" using {{command down}}
-            delay 1
-            keystroke "{clean_prompt}"
-            delay 0.5
-            keystroke return
-        end tell
-        '''
-        
-        try:
-            subprocess.run(['osascript', '-e', applescript], check=True)
+        if self.transport.send(prompt):
             print("✓ Sent to Cursor")
             return True
-        except Exception as e:
-            print(f"✗ Error: {e}")
-            return False
+        return False
     
     def comprehensive_audit(self):
         """Ultra-comprehensive production audit"""
@@ -76,72 +56,132 @@ class ProductionPolisher:
         print("="*70 + "\n")
         
         audits = []
+        self.cache_stats = PromptCacheStats()
+        self.audit_system = build_audit_system(self.scoutpulse_path, ISSUES_FORMAT, self.context_packer.pack_shared(),
+                                               tools=[REPORT_ISSUES_TOOL])
+        if self.batch_mode:
+            self.pending_audits = []
         
         # 1. FEATURE COMPLETENESS AUDIT
         print("📋 1/10 - Auditing Feature Completeness...")
         feature_audit = self.audit_features()
         audits.append(("FEATURES", feature_audit))
-        time.sleep(2)
         
         # 2. UI/UX COMPLETENESS AUDIT
         print("🎨 2/10 - Auditing UI/UX Completeness...")
         ui_audit = self.audit_ui_ux()
         audits.append(("UI_UX", ui_audit))
-        time.sleep(2)
         
         # 3. NAVIGATION & ROUTING AUDIT
         print("🗺️  3/10 - Auditing Navigation & Routing...")
         routing_audit = self.audit_routing()
         audits.append(("ROUTING", routing_audit))
-        time.sleep(2)
         
         # 4. GLASSMORPHISM & ANIMATIONS AUDIT
         print("✨ 4/10 - Auditing Glassmorphism & Animations...")
         design_audit = self.audit_design_system()
         audits.append(("DESIGN", design_audit))
-        time.sleep(2)
         
         # 5. INTERACTIVITY & STATES AUDIT
         print("🖱️  5/10 - Auditing Interactivity & States...")
         interaction_audit = self.audit_interactions()
         audits.append(("INTERACTIONS", interaction_audit))
-        time.sleep(2)
         
         # 6. ERROR HANDLING AUDIT
         print("⚠️  6/10 - Auditing Error Handling...")
         error_audit = self.audit_error_handling()
         audits.append(("ERRORS", error_audit))
-        time.sleep(2)
         
         # 7. PERFORMANCE AUDIT
         print("⚡ 7/10 - Auditing Performance...")
         perf_audit = self.audit_performance()
         audits.append(("PERFORMANCE", perf_audit))
-        time.sleep(2)
         
         # 8. ACCESSIBILITY AUDIT
         print("♿ 8/10 - Auditing Accessibility...")
         a11y_audit = self.audit_accessibility()
         audits.append(("ACCESSIBILITY", a11y_audit))
-        time.sleep(2)
         
         # 9. MOBILE RESPONSIVENESS AUDIT
         print("📱 9/10 - Auditing Mobile Responsiveness...")
         mobile_audit = self.audit_mobile()
         audits.append(("MOBILE", mobile_audit))
-        time.sleep(2)
         
         # 10. CODE QUALITY AUDIT
         print("🔍 10/10 - Auditing Code Quality...")
         quality_audit = self.audit_code_quality()
         audits.append(("QUALITY", quality_audit))
-        time.sleep(2)
+        
+        if self.batch_mode:
+            audits = self.run_audit_batch()
+        else:
+            audits = [(category, text) for category, text in audits if text is not None]  # drop truncated reports
+        
+        self.cache_stats.report()
+        
+        return audits
+    
+    def run_audit(self, category, prompt):
+        """Send one audit category on top of the shared, cached project context"""
+        prompt = self.context_packer.with_context(category, prompt)
+        
+        if self.pending_audits is not None:
+            # Batch mode: queue it, comprehensive_audit submits all categories together
+            self.pending_audits.append((category, prompt))
+            return None
+        
+        max_tokens = 4000
+        while True:
+            response = self.cache_stats.timed_call(category, lambda: self.rate_limiter.create(
+                self.client,
+                model="claude-sonnet-4-20250514",
+                max_tokens=max_tokens,
+                system=self.audit_system,
+                tools=[REPORT_ISSUES_TOOL],
+                tool_choice=TOOL_CHOICE,
+                messages=[{"role": "user", "content": prompt}]
+            ))
+            if not is_truncated(response):
+                return response_text(response)
+            if max_tokens >= MAX_REPORT_TOKENS:
+                print(f"❌ {category} report was truncated at max_tokens - dropping the partial issue list")
+                return None
+            max_tokens = min(max_tokens * 2, MAX_REPORT_TOKENS)
+            print(f"⚠️  {category} report hit max_tokens - retrying with {max_tokens}")
+    
+    def run_audit_batch(self):
+        """Submit the queued audit categories as one batch job and collect the results"""
+        pending, self.pending_audits = self.pending_audits, None
+        requests = [
+            (f"audit-{category.lower()}", dict(
+                model="claude-sonnet-4-20250514",
+                max_tokens=4000,
+                system=self.audit_system,
+                tools=[REPORT_ISSUES_TOOL],
+                tool_choice=TOOL_CHOICE,
+                messages=[{"role": "user", "content": prompt}]
+            ))
+            for category, prompt in pending
+        ]
+        
+        messages = self.batch_runner.run('production-audits', requests)
+        
+        audits = []
+        for category, _ in pending:
+            message = messages.get(f"audit-{category.lower()}")
+            if message is None:
+                print(f"⚠️  {category} audit failed in batch")
+                continue
+            if is_truncated(message):
+                print(f"⚠️  {category} report was truncated at max_tokens - dropping it")
+                continue
+            audits.append((category, response_text(message)))
         
         return audits
     
     def audit_features(self):
         """Audit feature completeness"""
-        prompt = f"""Audit the ScoutPulse project at {self.scoutpulse_path} for FEATURE COMPLETENESS.
+        prompt = """AUDIT CATEGORY: FEATURE COMPLETENESS
 
 Check EVERY feature from the original vision:
 
@@ -187,26 +227,13 @@ List MISSING or INCOMPLETE features with:
 - What needs to be done
 - File path
 - Cursor prompt to complete it
-
-Format as JSON:
-{{
-  "missing": [...],
-  "incomplete": [...],
-  "broken": [...]
-}}
 """
         
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        return response.content[0].text
+        return self.run_audit("FEATURES", prompt)
     
     def audit_ui_ux(self):
         """Audit UI/UX completeness"""
-        prompt = f"""Audit ScoutPulse at {self.scoutpulse_path} for UI/UX COMPLETENESS.
+        prompt = """AUDIT CATEGORY: UI/UX COMPLETENESS
 
 Check EVERY screen for:
 
@@ -243,17 +270,11 @@ Check EVERY screen for:
 List ALL issues with file paths and fix prompts.
 """
         
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        return response.content[0].text
+        return self.run_audit("UI_UX", prompt)
     
     def audit_routing(self):
         """Audit navigation and routing"""
-        prompt = f"""Audit ScoutPulse at {self.scoutpulse_path} for NAVIGATION & ROUTING.
+        prompt = """AUDIT CATEGORY: NAVIGATION & ROUTING
 
 Check:
 
@@ -291,17 +312,11 @@ Check:
 List all missing routes, broken links, and navigation issues with fixes.
 """
         
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        return response.content[0].text
+        return self.run_audit("ROUTING", prompt)
     
     def audit_design_system(self):
         """Audit glassmorphism and animations"""
-        prompt = f"""Audit ScoutPulse at {self.scoutpulse_path} for GLASSMORPHISM & ANIMATIONS.
+        prompt = """AUDIT CATEGORY: GLASSMORPHISM & ANIMATIONS
 
 **GLASSMORPHISM CHECK:**
 Every card, modal, sidebar, dropdown should have:
@@ -334,17 +349,11 @@ Check EVERY component:
 List ALL missing glassmorphism and animations with files and fixes.
 """
         
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        return response.content[0].text
+        return self.run_audit("DESIGN", prompt)
     
     def audit_interactions(self):
         """Audit interactivity and states"""
-        prompt = f"""Audit ScoutPulse at {self.scoutpulse_path} for INTERACTIVITY & STATES.
+        prompt = """AUDIT CATEGORY: INTERACTIVITY & STATES
 
 **INTERACTIVE ELEMENTS:**
 Every interactive element should work:
@@ -383,17 +392,11 @@ Every interactive element should work:
 List ALL broken interactions and missing states with fixes.
 """
         
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        return response.content[0].text
+        return self.run_audit("INTERACTIONS", prompt)
     
     def audit_error_handling(self):
         """Audit error handling"""
-        prompt = f"""Audit ScoutPulse at {self.scoutpulse_path} for ERROR HANDLING.
+        prompt = """AUDIT CATEGORY: ERROR HANDLING
 
 **ERROR SCENARIOS:**
 Check handling for:
@@ -424,17 +427,11 @@ Check handling for:
 List ALL missing error handling with files and fixes.
 """
         
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        return response.content[0].text
+        return self.run_audit("ERRORS", prompt)
     
     def audit_performance(self):
         """Audit performance"""
-        prompt = f"""Audit ScoutPulse at {self.scoutpulse_path} for PERFORMANCE.
+        prompt = """AUDIT CATEGORY: PERFORMANCE
 
 **PERFORMANCE CHECKS:**
 - Page load time <2s
@@ -460,17 +457,11 @@ List ALL missing error handling with files and fixes.
 List ALL performance issues with measurements and fixes.
 """
         
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        return response.content[0].text
+        return self.run_audit("PERFORMANCE", prompt)
     
     def audit_accessibility(self):
         """Audit accessibility"""
-        prompt = f"""Audit ScoutPulse at {self.scoutpulse_path} for ACCESSIBILITY (WCAG AA).
+        prompt = """AUDIT CATEGORY: ACCESSIBILITY (WCAG AA)
 
 **KEYBOARD NAVIGATION:**
 - All interactive elements accessible via keyboard
@@ -505,17 +496,11 @@ List ALL performance issues with measurements and fixes.
 List ALL accessibility issues with WCAG criteria and fixes.
 """
         
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        return response.content[0].text
+        return self.run_audit("ACCESSIBILITY", prompt)
     
     def audit_mobile(self):
         """Audit mobile responsiveness"""
-        prompt = f"""Audit ScoutPulse at {self.scoutpulse_path} for MOBILE RESPONSIVENESS.
+        prompt = """AUDIT CATEGORY: MOBILE RESPONSIVENESS
 
 **RESPONSIVE DESIGN:**
 Check at breakpoints: mobile (375px), tablet (768px), desktop (1440px)
@@ -547,17 +532,11 @@ Check at breakpoints: mobile (375px), tablet (768px), desktop (1440px)
 List ALL mobile issues with breakpoint-specific fixes.
 """
         
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        return response.content[0].text
+        return self.run_audit("MOBILE", prompt)
     
     def audit_code_quality(self):
         """Audit code quality"""
-        prompt = f"""Audit ScoutPulse at {self.scoutpulse_path} for CODE QUALITY.
+        prompt = """AUDIT CATEGORY: CODE QUALITY
 
 **CODE ISSUES:**
 - TypeScript errors
@@ -590,13 +569,7 @@ List ALL mobile issues with breakpoint-specific fixes.
 List ALL code quality issues with files and fixes.
 """
         
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        return response.content[0].text
+        return self.run_audit("QUALITY", prompt)
     
     def save_audit_report(self, audits):
         """Save comprehensive audit report"""
@@ -620,52 +593,12 @@ List ALL code quality issues with files and fixes.
         return filename
     
     def parse_all_tasks(self, audits):
-        """Parse all audit results into tasks"""
+        """Turn the audits' reported issues into validated, de-duplicated tasks"""
         print("\n📋 Parsing tasks from audit results...")
         
-        parse_prompt = """Given these audit results, extract ALL actionable tasks.
-
-For each task provide:
-- PRIORITY: CRITICAL/HIGH/MEDIUM/LOW
-- FILE: file path
-- ISSUE: what's wrong
-- PROMPT: exact Cursor AI prompt to fix it (be specific!)
-
-Format as:
-PRIORITY | FILE | ISSUE | PROMPT
-
-Make prompts detailed and specific so Cursor knows exactly what to do.
-"""
-        
-        all_audit_text = "\n\n".join([f"{cat}:\n{res}" for cat, res in audits])
-        
-        response = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=8000,
-            messages=[
-                {"role": "user", "content": all_audit_text},
-                {"role": "user", "content": parse_prompt}
-            ]
-        )
-        
-        tasks_text = response.content[0].text
-        
-        # Parse into task list
-        tasks = []
-        for line in tasks_text.split('\n'):
-            if '|' in line and any(p in line.upper() for p in ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']):
-                parts = [p.strip() for p in line.split('|')]
-                if len(parts) >= 4:
-                    tasks.append({
-                        'priority': parts[0],
-                        'file': parts[1],
-                        'issue': parts[2],
-                        'prompt': parts[3]
-                    })
-        
-        # Sort by priority
-        priority_order = {'CRITICAL': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
-        tasks.sort(key=lambda x: priority_order.get(x['priority'], 4))
+        tasks = tasks_from_audits(audits)
+        for task in tasks:
+            task['prompt'] = task['action']  # the action doubles as the Cursor prompt
         
         return tasks
     
@@ -677,13 +610,13 @@ Make prompts detailed and specific so Cursor knows exactly what to do.
         print(f"⚡ PRIORITY: {task['priority']}")
         print(f"{'='*70}\n")
         
-        # Send to Cursor
+        # Send to Cursor, then wait until the files it touches stop changing
+        targets = paths_in(task['file'])
+        self.watcher.start(targets)
         self.send_to_cursor_ai(task['prompt'])
-        
-        # Wait for generation
-        wait_time = 20
-        print(f"⏳ Waiting {wait_time}s for Cursor...")
-        time.sleep(wait_time)
+        status, changed = self.watcher.wait(targets)
+        for path in changed:
+            print(f"  📝 {path}")
         
         # Verify
         while True:
@@ -811,7 +744,9 @@ def main():
             sys.exit(1)
     SCOUTPULSE_PATH = input("📂 Enter ScoutPulse project path: ")
     
-    polisher = ProductionPolisher(API_KEY, SCOUTPULSE_PATH)
+    BATCH_MODE = '--batch' in sys.argv
+    
+    polisher = ProductionPolisher(API_KEY, SCOUTPULSE_PATH, batch_mode=BATCH_MODE)
     
     # Run
     polisher.run_production_polish()
@@ -0,0 +1,268 @@
+"""
+ScoutPulse Quality Gates
+Runs the project's build, type check, lint and test commands side by side,
+streaming each one's output live with a [gate] prefix. Concurrency is capped
+by CPU count, and the first hard failure stops the remaining gates. Verdicts
+are cached under a hash of the whole project tree (everything not ignored), so
+an unchanged tree is not rebuilt, re-linted or re-tested
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from repo_index import get_repo_index
+from response_cache import hash_files
+from stream_writer import write_atomic
+
+TAIL_LINES = 200
+CACHED_STATUSES = ('passed', 'failed')  # timeouts, skips and cancellations say nothing about the code
+# Usually git-ignored, but builds and tests read them
+ENV_FILES = ['.env', '.env.local', '.env.production', '.env.production.local', '.env.test', '.env.test.local']
+# Written by the gates themselves (tsc --incremental) or by the agents into the project root;
+# hashing them would invalidate every verdict on the next run
+UNHASHED_PATTERNS = [
+    '*.tsbuildinfo',
+    'ASSEMBLY_LINE_PLAN.json',
+    'scoutpulse_audit_*.txt',
+    'scoutpulse_production_audit_*.txt',
+    '.improvement_history.json',
+]
+
+
+def gate(name, command, timeout, hard=True, missing_ok=False, passed="", failed="", summarise=None):
+    """Description of one gate
+
+    hard: a failure stops the other gates. missing_ok: pass if the tool is not installed.
+    summarise(lines) -> text for the failure message (defaults to the last lines of output).
+    """
+    return {
+        'name': name,
+        'command': command,
+        'timeout': timeout,
+        'hard': hard,
+        'missing_ok': missing_ok,
+        'passed': passed or f"{name} passed",
+        'failed': failed or f"{name} failed",
+        'summarise': summarise,
+    }
+
+
+def print_log(message, level="INFO"):
+    print(message)
+
+
+def default_workers():
+    # Builds, tsc and test runners are CPU-hungry themselves: leave them room
+    return int(os.getenv('GATE_CONCURRENCY', str(max(1, (os.cpu_count() or 2) // 2))))
+
+
+class GateCache:
+    """Last verdict of each gate, keyed by a hash of the command and the project tree"""
+
+    def __init__(self, project_path):
+        self.project_path = project_path
+        self.cache_file = os.path.join(project_path, '.scoutpulse_cache', 'gate_results.json')
+        self.digest_file = os.path.join(project_path, '.scoutpulse_cache', 'gate_digests.json')
+        self.tree = None
+
+    def load(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def key(self, spec):
+        if self.tree is None:
+            # tsc, eslint and next read far more than the source dirs (e2e/, scripts/, public/,
+            # root configs): hash every file that is not ignored. Unchanged files reuse their digests
+            files = [
+                path for path in get_repo_index(self.project_path).files()
+                if not any(fnmatch.fnmatchcase(path, pattern) for pattern in UNHASHED_PATTERNS)
+            ]
+            files += [name for name in ENV_FILES if name not in files]
+            self.tree = hash_files(self.project_path, files, self.digest_file)
+        payload = json.dumps([spec['name'], spec['command'], self.tree])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def save(self, entries):
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        write_atomic(self.cache_file, json.dumps(entries, indent=2))
+
+
+class GateRunner:
+    def __init__(self, project_path, max_workers=None, fail_fast=True, log=print_log, cache=True, force=False):
+        self.project_path = project_path
+        self.max_workers = max_workers or default_workers()
+        self.fail_fast = fail_fast
+        self.log = log
+        self.cache = GateCache(project_path) if cache else None
+        self.force = force  # run every gate even when its cached verdict is still valid
+        self.print_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.running = {}  # gate name -> Popen
+        self.stopped = threading.Event()
+
+    def echo(self, name, line):
+        with self.print_lock:
+            print(f"   [{name}] {line}", flush=True)
+
+    def kill(self, process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def stop_all(self):
+        """Fail fast: kill every gate that is still running and skip the queued ones"""
+        self.stopped.set()
+        with self.lock:
+            processes = list(self.running.values())
+        for process in processes:
+            self.kill(process)
+
+    def result(self, spec, ok, status, started, detail=""):
+        return {
+            'name': spec['name'],
+            'ok': ok,
+            'status': status,
+            'seconds': round(time.monotonic() - started, 2),
+            'detail': detail,
+        }
+
+    def run_gate(self, spec):
+        name = spec['name']
+        started = time.monotonic()
+        if self.stopped.is_set():
+            return self.result(spec, None, 'cancelled', started)
+
+        try:
+            process = subprocess.Popen(
+                spec['command'],
+                cwd=self.project_path,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors='replace',
+                bufsize=1,
+                start_new_session=True,  # so a timeout or fail-fast kills the whole tree
+            )
+        except FileNotFoundError:
+            if spec['missing_ok']:
+                return self.result(spec, True, 'skipped', started, f"{spec['command'][0]} not found")
+            return self.result(spec, False, 'failed', started, f"{spec['command'][0]} not found")
+
+        with self.lock:
+            self.running[name] = process
+        if self.stopped.is_set():
+            self.kill(process)  # fail-fast fired while this one was starting
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            self.kill(process)
+
+        timer = threading.Timer(spec['timeout'], expire)
+        timer.daemon = True
+        timer.start()
+        tail = deque(maxlen=TAIL_LINES)
+        try:
+            for line in process.stdout:
+                line = line.rstrip('\n')
+                tail.append(line)
+                self.echo(name, line)
+            process.wait()
+        finally:
+            timer.cancel()
+            process.stdout.close()
+            with self.lock:
+                self.running.pop(name, None)
+
+        lines = list(tail)
+        if timed_out.is_set():
+            return self.result(spec, False, 'timeout', started, f"timed out after {spec['timeout']}s")
+        if process.returncode == 0:
+            return self.result(spec, True, 'passed', started)
+        if self.stopped.is_set() and process.returncode < 0:
+            return self.result(spec, None, 'cancelled', started)
+        summarise = spec['summarise'] or (lambda output: "\n".join(output[-10:]))
+        return self.result(spec, False, 'failed', started, summarise(lines))
+
+    def finish(self, spec, result):
+        """Report one gate and trigger fail-fast"""
+        seconds = result['seconds']
+        if result.get('cached'):
+            verdict = f"✅ {spec['passed']}" if result['ok'] else f"{'❌' if spec['hard'] else '⚠️ '} {spec['failed']}"
+            level = "INFO" if result['ok'] else "ERROR" if spec['hard'] else "WARN"
+            self.log(f"⚡ {spec['name']} unchanged since {result['at']}: {verdict} (cached, ran in {seconds}s)", level)
+        elif result['status'] == 'passed':
+            self.log(f"✅ {spec['passed']} ({seconds}s)")
+        elif result['status'] == 'skipped':
+            self.log(f"⚠️  {spec['name']}: {result['detail']}, skipping", "WARN")
+        elif result['status'] == 'cancelled':
+            self.log(f"⏭️  {spec['name']} cancelled after an earlier failure", "WARN")
+        elif result['status'] == 'timeout':
+            self.log(f"⚠️  {spec['name']} {result['detail']}", "WARN")
+        else:
+            level = "ERROR" if spec['hard'] else "WARN"
+            self.log(f"{'❌' if spec['hard'] else '⚠️ '} {spec['failed']} ({seconds}s): {result['detail']}", level)
+
+        if spec['hard'] and result['ok'] is False and self.fail_fast and not self.stopped.is_set():
+            self.log(f"Stopping remaining gates: {spec['name']} failed", "ERROR")
+            self.stop_all()
+
+    def run(self, specs):
+        """Run the gates concurrently; returns {name: result} in the order given"""
+        if not specs:
+            return {}
+        self.stopped.clear()
+        started = time.monotonic()
+        results = {}
+
+        stored = self.cache.load() if self.cache else {}
+        keys = {spec['name']: self.cache.key(spec) for spec in specs} if self.cache else {}
+        pending = []
+        for spec in specs:
+            entry = stored.get(spec['name'])
+            if not self.force and entry and entry.get('key') == keys.get(spec['name']):
+                results[spec['name']] = dict(entry['result'], cached=True, at=entry['at'])
+                self.finish(spec, results[spec['name']])
+            else:
+                pending.append(spec)
+
+        def run_and_report(spec):
+            result = self.run_gate(spec)
+            self.finish(spec, result)
+            return result
+
+        if pending:
+            workers = min(self.max_workers, len(pending))
+            self.log(f"Running {', '.join(s['name'] for s in pending)} ({workers} at a time)")
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [(spec['name'], pool.submit(run_and_report, spec)) for spec in pending]
+                for name, future in futures:
+                    results[name] = future.result()
+
+        if self.cache:
+            at = datetime.now().strftime("%Y-%m-%d %H:%M")
+            for spec in pending:
+                result = results[spec['name']]
+                if result['status'] in CACHED_STATUSES:
+                    stored[spec['name']] = {'key': keys[spec['name']], 'at': at, 'result': result}
+            if pending:
+                self.cache.save(stored)
+
+        total = round(time.monotonic() - started, 2)
+        serial = round(sum(r['seconds'] for r in results.values() if not r.get('cached')), 2)
+        self.log(f"Quality gates finished in {total}s ({serial}s of gate time)")
+        return {spec['name']: results[spec['name']] for spec in specs}
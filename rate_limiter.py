@@ -0,0 +1,228 @@
+"""
+ScoutPulse Rate Limiter
+Process-wide token-bucket limiter for Claude API calls (requests, input and
+output tokens per minute). It adapts to the anthropic-ratelimit-* response
+headers and backs off with jitter on 429/529 instead of fixed sleeps
+"""
+
+import asyncio
+import contextlib
+import inspect
+import json
+import os
+import random
+import threading
+import time
+
+import anthropic
+
+RETRYABLE_STATUS = (429, 529)
+
+
+def estimate_tokens(text):
+    """Cheap local token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` tokens are available (capped at a full bucket)"""
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0
+        return (needed - self.tokens) * 60 / self.capacity
+
+    def sync(self, limit, remaining):
+        """Adopt the server's view of the limit and what's left of it"""
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.tokens = min(self.capacity, float(remaining))
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute=50, input_tokens_per_minute=30000,
+                 output_tokens_per_minute=8000, max_retries=6, base_delay=1, max_delay=60):
+        self.requests = TokenBucket(requests_per_minute)
+        self.input_tokens = TokenBucket(input_tokens_per_minute)
+        self.output_tokens = TokenBucket(output_tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+
+    def reserve(self, input_tokens):
+        """Take capacity for one request if available; otherwise return seconds to wait"""
+        with self.lock:
+            now = time.monotonic()
+            for bucket in (self.requests, self.input_tokens, self.output_tokens):
+                bucket.refill(now)
+
+            wait = max(
+                self.requests.wait_time(1),
+                self.input_tokens.wait_time(input_tokens),
+                # Output is only known afterwards; just wait until we're not in debt
+                self.output_tokens.wait_time(1),
+            )
+            if wait == 0:
+                self.requests.tokens -= 1
+                self.input_tokens.tokens -= input_tokens
+            return wait
+
+    def acquire(self, input_tokens):
+        while True:
+            wait = self.reserve(input_tokens)
+            if wait == 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, input_tokens):
+        while True:
+            wait = self.reserve(input_tokens)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers):
+        """Sync buckets with anthropic-ratelimit-{requests,input-tokens,output-tokens}-* headers"""
+        buckets = {
+            'requests': self.requests,
+            'input-tokens': self.input_tokens,
+            'output-tokens': self.output_tokens,
+        }
+        with self.lock:
+            for name, bucket in buckets.items():
+                limit = headers.get(f'anthropic-ratelimit-{name}-limit')
+                remaining = headers.get(f'anthropic-ratelimit-{name}-remaining')
+                try:
+                    bucket.sync(
+                        int(limit) if limit else None,
+                        int(remaining) if remaining is not None else None,
+                    )
+                except ValueError:
+                    continue
+
+    def record_usage(self, estimated_input, usage):
+        """Correct the input estimate and charge actual output tokens"""
+        if usage is None:
+            return
+        with self.lock:
+            self.input_tokens.tokens -= getattr(usage, 'input_tokens', estimated_input) - estimated_input
+            self.output_tokens.tokens -= getattr(usage, 'output_tokens', 0)
+
+    def backoff_delay(self, attempt, error=None):
+        """Full-jitter exponential backoff, honouring retry-after when the API sends it"""
+        retry_after = None
+        if error is not None and getattr(error, 'response', None) is not None:
+            try:
+                retry_after = float(error.response.headers.get('retry-after'))
+            except (TypeError, ValueError):
+                retry_after = None
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def estimate_request(self, kwargs):
+        text = json.dumps(kwargs.get('messages', []), default=str) + str(kwargs.get('system', ''))
+        return estimate_tokens(text)
+
+    def create(self, client, **kwargs):
+        """Rate-limited client.messages.create with backoff on 429/529"""
+        estimated = self.estimate_request(kwargs)
+        raw_client = client.with_options(max_retries=0)
+
+        for attempt in range(self.max_retries + 1):
+            self.acquire(estimated)
+            try:
+                raw = raw_client.messages.with_raw_response.create(**kwargs)
+            except anthropic.APIStatusError as e:
+                if e.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    raise
+                self.update_from_headers(e.response.headers)
+                delay = self.backoff_delay(attempt, e)
+                print(f"⏳ API returned {e.status_code}, retrying in {delay:.1f}s...")
+                time.sleep(delay)
+                continue
+
+            self.update_from_headers(raw.headers)
+            response = raw.parse()
+            self.record_usage(estimated, getattr(response, 'usage', None))
+            return response
+
+    @contextlib.contextmanager
+    def stream(self, client, **kwargs):
+        """Rate-limited client.messages.stream; 429/529 are retried only before any text arrives"""
+        estimated = self.estimate_request(kwargs)
+        raw_client = client.with_options(max_retries=0)
+
+        for attempt in range(self.max_retries + 1):
+            self.acquire(estimated)
+            opened = False
+            try:
+                with raw_client.messages.stream(**kwargs) as stream:
+                    opened = True
+                    self.update_from_headers(stream.response.headers)
+                    yield stream
+                    self.record_usage(estimated, getattr(stream.current_message_snapshot, 'usage', None))
+                return
+            except anthropic.APIStatusError as e:
+                if opened or e.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    raise
+                self.update_from_headers(e.response.headers)
+                delay = self.backoff_delay(attempt, e)
+                print(f"⏳ API returned {e.status_code}, retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+    async def create_async(self, client, **kwargs):
+        """Async version of create() for AsyncAnthropic clients"""
+        estimated = self.estimate_request(kwargs)
+        raw_client = client.with_options(max_retries=0)
+
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async(estimated)
+            try:
+                raw = await raw_client.messages.with_raw_response.create(**kwargs)
+            except anthropic.APIStatusError as e:
+                if e.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    raise
+                self.update_from_headers(e.response.headers)
+                delay = self.backoff_delay(attempt, e)
+                print(f"⏳ API returned {e.status_code}, retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                continue
+
+            self.update_from_headers(raw.headers)
+            response = raw.parse()
+            if inspect.isawaitable(response):  # newer SDKs make async parse() a coroutine
+                response = await response
+            self.record_usage(estimated, getattr(response, 'usage', None))
+            return response
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide limiter, configured from RATE_LIMIT_* env vars"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter(
+                requests_per_minute=int(os.getenv('RATE_LIMIT_RPM', '50')),
+                input_tokens_per_minute=int(os.getenv('RATE_LIMIT_ITPM', '30000')),
+                output_tokens_per_minute=int(os.getenv('RATE_LIMIT_OTPM', '8000')),
+            )
+        return _shared_limiter
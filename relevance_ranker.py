@@ -0,0 +1,236 @@
+"""
+ScoutPulse Relevance Ranker
+Ranks source files for a task by import-graph centrality (PageRank over
+TS/TSX imports), recent git churn and overlap with the task description, then
+fills a token budget greedily with whole files, or with the whole top-level
+symbols of files too large to include entirely
+"""
+
+import math
+import os
+import re
+import subprocess
+
+from rate_limiter import estimate_tokens
+from repo_index import get_repo_index
+
+CODE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx')
+RESOLVE_SUFFIXES = ('', '.ts', '.tsx', '.js', '.jsx', '/index.ts', '/index.tsx', '/index.js', '/index.jsx')
+PINNED_FILES = ['package.json', 'README.md']
+
+IMPORT_PATTERN = re.compile(
+    r'''(?:\bimport\s+(?:[\w*{}\s,]+\s+from\s+)?|\bexport\s+[\w*{}\s,]+\s+from\s+|\brequire\(\s*|\bimport\(\s*)['"]([^'"]+)['"]'''
+)
+# A top-level declaration starts at column 0
+SYMBOL_START = re.compile(
+    r'^(?:export\s+(?:default\s+)?)?(?:async\s+)?(?:function|const|let|var|class|interface|type|enum)\b|^export\s+default\b',
+    re.M
+)
+WORD_PATTERN = re.compile(r'[A-Za-z][a-z]+|[A-Z]+(?![a-z])|\d+')
+STOP_WORDS = {
+    'the', 'and', 'for', 'with', 'that', 'this', 'from', 'are', 'all', 'into', 'should', 'make', 'each', 'more',
+    'add', 'use', 'new', 'every', 'have', 'has', 'will', 'can', 'not', 'but', 'our', 'your', 'their', 'page',
+    'index', 'tsx', 'app', 'lib', 'components', 'src',
+}
+
+WEIGHTS = {'centrality': 0.4, 'churn': 0.2, 'relevance': 0.4}
+
+
+def terms(text):
+    """Lower-case words of text (camelCase and path separators split), minus stop words"""
+    words = (w.lower() for w in WORD_PATTERN.findall(text or ''))
+    return {w for w in words if len(w) >= 3 and w not in STOP_WORDS}
+
+
+def normalise(scores):
+    top = max(scores.values(), default=0)
+    return {path: value / top for path, value in scores.items()} if top else {path: 0.0 for path in scores}
+
+
+class RelevanceRanker:
+    def __init__(self, project_path, churn_days=30):
+        self.project_path = project_path
+        self.churn_days = churn_days
+        self.parsed = {}  # rel_path -> ((mtime_ns, size), content, imports)
+
+    def read(self, rel_path):
+        """(content, raw import specifiers) for one file, reused while its mtime and size are unchanged"""
+        full_path = os.path.join(self.project_path, rel_path)
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return '', []
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self.parsed.get(rel_path)
+        if cached and cached[0] == signature:
+            return cached[1], cached[2]
+        try:
+            with open(full_path, 'r', errors='replace') as f:
+                content = f.read()
+        except OSError:
+            return '', []
+        imports = IMPORT_PATTERN.findall(content)
+        self.parsed[rel_path] = (signature, content, imports)
+        return content, imports
+
+    def resolve(self, importer, specifier, known):
+        """Project file an import refers to, or None for packages and unresolvable paths"""
+        if specifier.startswith('@/'):
+            base = specifier[2:]
+        elif specifier.startswith('.'):
+            base = os.path.normpath(os.path.join(os.path.dirname(importer), specifier)).replace(os.sep, '/')
+        else:
+            return None
+        for suffix in RESOLVE_SUFFIXES:
+            if base + suffix in known:
+                return base + suffix
+        return None
+
+    def graph(self, files):
+        """rel_path -> set of project files it imports"""
+        known = set(files)
+        edges = {}
+        for rel_path in files:
+            _, imports = self.read(rel_path)
+            edges[rel_path] = {
+                target for target in (self.resolve(rel_path, spec, known) for spec in imports)
+                if target and target != rel_path
+            }
+        return edges
+
+    def centrality(self, edges, damping=0.85, iterations=30):
+        """PageRank: a file matters if files that matter import it"""
+        nodes = list(edges)
+        if not nodes:
+            return {}
+        rank = {node: 1 / len(nodes) for node in nodes}
+        for _ in range(iterations):
+            dangling = sum(rank[node] for node in nodes if not edges[node])
+            fresh = {node: (1 - damping + damping * dangling) / len(nodes) for node in nodes}
+            for node in nodes:
+                if edges[node]:
+                    share = damping * rank[node] / len(edges[node])
+                    for target in edges[node]:
+                        fresh[target] += share
+            rank = fresh
+        return rank
+
+    def churn(self, files):
+        """Commits touching each file over the last churn_days (log-scaled)"""
+        counts = dict.fromkeys(files, 0)
+        try:
+            result = subprocess.run(
+                ['git', '-C', self.project_path, 'log', f'--since={self.churn_days}.days', '--name-only', '--format='],
+                capture_output=True,
+                text=True,
+                timeout=30
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return counts
+        if result.returncode != 0:
+            return counts
+        for line in result.stdout.splitlines():
+            if line in counts:
+                counts[line] += 1
+        return {path: math.log1p(count) for path, count in counts.items()}
+
+    def relevance(self, files, query_terms):
+        """Share of the task's terms found in each file; path matches count double"""
+        if not query_terms:
+            return dict.fromkeys(files, 0.0)
+        scores = {}
+        for rel_path in files:
+            content, _ = self.read(rel_path)
+            path_hits = terms(rel_path) & query_terms
+            content_hits = terms(content) & query_terms
+            scores[rel_path] = (2 * len(path_hits) + len(content_hits)) / len(query_terms)
+        return scores
+
+    def rank(self, query, files=None):
+        """[(score, rel_path)] best first"""
+        if files is None:
+            files = get_repo_index(self.project_path).files(extensions=CODE_EXTENSIONS)
+        files = [f for f in files if not f.endswith('.d.ts')]
+        edges = self.graph(files)
+        components = {
+            'centrality': normalise(self.centrality(edges)),
+            'churn': normalise(self.churn(files)),
+            'relevance': normalise(self.relevance(files, terms(query))),
+        }
+        scores = [
+            (sum(WEIGHTS[name] * values.get(path, 0.0) for name, values in components.items()), path)
+            for path in files
+        ]
+        return sorted(scores, key=lambda item: (-item[0], item[1]))
+
+    def symbols(self, content):
+        """Split a file into its preamble (imports etc.) and whole top-level declarations"""
+        starts = [m.start() for m in SYMBOL_START.finditer(content)]
+        if not starts:
+            return content, []
+        preamble = content[:starts[0]]
+        bounds = starts + [len(content)]
+        return preamble, [content[bounds[i]:bounds[i + 1]] for i in range(len(starts))]
+
+    def excerpt(self, content, query_terms, allowance):
+        """Whole top-level symbols of a large file, most relevant first, within `allowance` tokens"""
+        _, declarations = self.symbols(content)
+        ranked = sorted(
+            enumerate(declarations),
+            key=lambda item: (-len(terms(item[1]) & query_terms), item[0])
+        )
+        chosen, used = [], 0
+        for position, declaration in ranked:
+            tokens = estimate_tokens(declaration)
+            if used + tokens <= allowance:
+                chosen.append((position, declaration))
+                used += tokens
+        if not chosen:
+            return None
+        kept = [declaration for _, declaration in sorted(chosen)]
+        omitted = len(declarations) - len(kept)
+        note = f"\n// ... {omitted} other top-level declaration(s) omitted\n" if omitted else ""
+        return "".join(kept).rstrip() + "\n" + note
+
+    def pack(self, query, budget_tokens=None, max_file_tokens=3000):
+        """Prompt section with the most relevant files for `query` under budget_tokens; returns (text, paths)"""
+        if budget_tokens is None:
+            budget_tokens = int(os.getenv('ANALYSIS_CONTEXT_TOKENS', '20000'))
+        query_terms = terms(query)
+        index = get_repo_index(self.project_path)
+
+        parts, packed, used = [], [], 0
+
+        def add(rel_path, body, label=''):
+            nonlocal used
+            text = f"FILE: {rel_path}{label}\n```\n{body.rstrip()}\n```\n"
+            tokens = estimate_tokens(text)
+            if used + tokens > budget_tokens:
+                return False
+            parts.append(text)
+            packed.append(rel_path)
+            used += tokens
+            return True
+
+        for rel_path in PINNED_FILES:
+            if index.exists(rel_path):
+                content, _ = self.read(rel_path)
+                if estimate_tokens(content) <= max_file_tokens:
+                    add(rel_path, content)
+
+        for score, rel_path in self.rank(query):
+            if budget_tokens - used < 200:
+                break
+            content, _ = self.read(rel_path)
+            if not content.strip():
+                continue
+            if estimate_tokens(content) <= max_file_tokens:
+                add(rel_path, content)
+                continue
+            allowance = min(max_file_tokens, budget_tokens - used - 50)
+            body = self.excerpt(content, query_terms, allowance)
+            if body:
+                add(rel_path, body, " (selected top-level declarations)")
+
+        print(f"📚 Packed {len(packed)} files by relevance, ~{used} tokens")
+        return "\n".join(parts), packed
@@ -0,0 +1,202 @@
+"""
+ScoutPulse Repository Index
+One os.scandir pass over the project that prunes node_modules, .next and
+.gitignore'd paths, persisted to disk. Later refreshes only stat directories
+and re-list the ones whose mtime moved, so file lists, counts and trees come
+back in milliseconds
+"""
+
+import fnmatch
+import json
+import os
+import threading
+
+from stream_writer import write_atomic
+
+SKIP_DIRS = {'node_modules', '.next', '.git', '__pycache__', '.scoutpulse_cache'}
+INDEX_VERSION = 1
+
+
+class IgnoreRules:
+    """The root .gitignore: plain, anchored (/x or a/b) and directory-only (x/) patterns"""
+
+    def __init__(self, project_path):
+        self.rules = []
+        try:
+            with open(os.path.join(project_path, '.gitignore'), 'r') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            lines = []
+
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith(('#', '!')):
+                continue  # negations are not supported; the path stays ignored
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            anchored = '/' in line
+            self.rules.append((line.lstrip('/'), anchored, dir_only))
+
+    def ignored(self, rel_path, is_dir):
+        name = rel_path.rsplit('/', 1)[-1]
+        for pattern, anchored, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if fnmatch.fnmatchcase(rel_path if anchored else name, pattern):
+                return True
+        return False
+
+
+class RepoIndex:
+    def __init__(self, project_path, index_file=None):
+        self.project_path = os.path.abspath(project_path)
+        self.index_file = index_file or os.path.join(self.project_path, '.scoutpulse_cache', 'repo_index.json')
+        self.dirs = {}  # rel dir ('' = root) -> {'mtime': ns, 'files': [...], 'dirs': [...]}
+        self.ignore_mtime = None
+        self.ignore = None
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INDEX_VERSION:
+            self.dirs = data.get('dirs', {})
+            self.ignore_mtime = data.get('ignore_mtime')
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+        payload = {'version': INDEX_VERSION, 'ignore_mtime': self.ignore_mtime, 'dirs': self.dirs}
+        write_atomic(self.index_file, json.dumps(payload))
+
+    def full_path(self, rel_dir):
+        return os.path.join(self.project_path, rel_dir) if rel_dir else self.project_path
+
+    def list_dir(self, rel_dir, mtime):
+        """Read one directory, dropping skipped and ignored entries"""
+        files, subdirs = [], []
+        try:
+            entries = list(os.scandir(self.full_path(rel_dir)))
+        except OSError:
+            entries = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if entry.name not in SKIP_DIRS and not self.ignore.ignored(rel_path, True):
+                    subdirs.append(entry.name)
+            elif not self.ignore.ignored(rel_path, False):
+                files.append(entry.name)
+        return {'mtime': mtime, 'files': sorted(files), 'dirs': sorted(subdirs)}
+
+    def refresh(self):
+        """Bring the index up to date: one stat per directory, re-listing only changed ones"""
+        with self.lock:
+            try:
+                ignore_mtime = os.stat(os.path.join(self.project_path, '.gitignore')).st_mtime_ns
+            except OSError:
+                ignore_mtime = None
+            if self.ignore is None or ignore_mtime != self.ignore_mtime:
+                self.ignore = IgnoreRules(self.project_path)
+                if ignore_mtime != self.ignore_mtime:
+                    self.dirs = {}  # ignore rules changed: rebuild everything
+                self.ignore_mtime = ignore_mtime
+
+            fresh = {}
+            relisted = 0
+            pending = ['']
+            while pending:
+                rel_dir = pending.pop()
+                try:
+                    mtime = os.stat(self.full_path(rel_dir)).st_mtime_ns
+                except OSError:
+                    continue
+                entry = self.dirs.get(rel_dir)
+                if not entry or entry['mtime'] != mtime:
+                    entry = self.list_dir(rel_dir, mtime)
+                    relisted += 1
+                fresh[rel_dir] = entry
+                pending.extend(f"{rel_dir}/{name}" if rel_dir else name for name in entry['dirs'])
+
+            changed = relisted or fresh.keys() != self.dirs.keys()
+            self.dirs = fresh
+            if changed:
+                self.save()
+        return self
+
+    def walk(self, rel_dir=''):
+        """Paths under rel_dir: each directory's files (sorted) before its subdirectories"""
+        rel_dir = rel_dir.strip('/')
+        entry = self.dirs.get(rel_dir)
+        if entry is None:
+            return
+        for name in entry['files']:
+            yield f"{rel_dir}/{name}" if rel_dir else name
+        for name in entry['dirs']:
+            yield from self.walk(f"{rel_dir}/{name}" if rel_dir else name)
+
+    def files(self, under='', extensions=None, pattern=None, recursive=True):
+        """Relative file paths, optionally filtered by extension(s) and a basename glob"""
+        if recursive:
+            paths = self.walk(under)
+        else:
+            rel_dir = under.strip('/')
+            entry = self.dirs.get(rel_dir, {'files': []})
+            paths = (f"{rel_dir}/{name}" if rel_dir else name for name in entry['files'])
+        return [
+            path for path in paths
+            if (extensions is None or path.endswith(extensions))
+            and (pattern is None or fnmatch.fnmatchcase(path.rsplit('/', 1)[-1], pattern))
+        ]
+
+    def count(self, under='', extensions=None, pattern=None, recursive=True):
+        return len(self.files(under, extensions, pattern, recursive))
+
+    def exists(self, rel_path):
+        rel_dir, _, name = rel_path.strip('/').rpartition('/')
+        entry = self.dirs.get(rel_dir)
+        return bool(entry) and name in entry['files']
+
+    def tree(self, max_depth=3, rel_dir=''):
+        """Directory tree in the style of `tree -L max_depth`"""
+        lines = [rel_dir or '.']
+        dirs = files = 0
+
+        def render(current, prefix, depth):
+            nonlocal dirs, files
+            entry = self.dirs.get(current, {'files': [], 'dirs': []})
+            children = [(name, True) for name in entry['dirs']] + [(name, False) for name in entry['files']]
+            children.sort(key=lambda child: child[0].lower())
+            for i, (name, is_dir) in enumerate(children):
+                last = i == len(children) - 1
+                lines.append(f"{prefix}{'└── ' if last else '├── '}{name}")
+                if is_dir:
+                    dirs += 1
+                    if depth < max_depth:
+                        render(f"{current}/{name}" if current else name, prefix + ('    ' if last else '│   '), depth + 1)
+                else:
+                    files += 1
+
+        render(rel_dir.strip('/'), '', 1)
+        lines.append(f"\n{dirs} directories, {files} files")
+        return "\n".join(lines)
+
+
+_shared_indexes = {}
+_shared_lock = threading.Lock()
+
+
+def get_repo_index(project_path):
+    """Process-wide, freshly refreshed index for a project"""
+    key = os.path.abspath(project_path)
+    with _shared_lock:
+        index = _shared_indexes.get(key)
+        if index is None:
+            index = _shared_indexes[key] = RepoIndex(key)
+    return index.refresh()
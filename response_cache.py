@@ -0,0 +1,176 @@
+"""
+ScoutPulse Response Cache
+On-disk cache of Claude responses keyed by model, prompt and a hash of the source tree,
+so re-running an audit or scan on unchanged code costs nothing
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from repo_index import get_repo_index
+from stream_writer import write_atomic
+
+SOURCE_DIRS = ['app', 'components', 'lib', 'hooks', 'types', 'styles', 'supabase/migrations']
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.css', '.sql', '.json', '.md')
+SOURCE_FILES = ['package.json', 'next.config.js', 'tailwind.config.ts', 'tsconfig.json']
+TRUNCATED_STOP_REASONS = ('max_tokens',)
+
+
+def iter_source_files(project_path, dirs=None):
+    """Yield relative paths of the files that make up the source tree"""
+    index = get_repo_index(project_path)
+    for name in SOURCE_FILES:
+        if index.exists(name):
+            yield name
+
+    for top in dirs or SOURCE_DIRS:
+        yield from index.files(top, SOURCE_EXTENSIONS)
+
+
+def hash_files(project_path, rel_paths, digest_file):
+    """Content hash of the given files; those whose mtime and size match `digest_file` reuse their digest"""
+    try:
+        with open(digest_file, 'r') as f:
+            known = json.load(f)
+    except (OSError, ValueError):
+        known = {}
+
+    digests = {}
+    tree = hashlib.sha256()
+    for rel_path in rel_paths:
+        full_path = os.path.join(project_path, rel_path)
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            continue
+
+        signature = [stat.st_mtime_ns, stat.st_size]
+        entry = known.get(rel_path)
+        if entry and entry[:2] == signature:
+            digest = entry[2]
+        else:
+            with open(full_path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+
+        digests[rel_path] = signature + [digest]
+        tree.update(f"{rel_path}\0{digest}\n".encode())
+
+    if digests != known:
+        os.makedirs(os.path.dirname(digest_file), exist_ok=True)
+        write_atomic(digest_file, json.dumps(digests))  # scans in other threads may read it
+
+    return tree.hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, project_path, enabled=True, ttl_hours=72, max_mb=50):
+        self.project_path = project_path
+        self.enabled = enabled
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_bytes = max_mb * 1024 * 1024
+        self.cache_dir = os.path.join(project_path, '.scoutpulse_cache', 'responses')
+        self.digest_file = os.path.join(project_path, '.scoutpulse_cache', 'file_digests.json')
+        self.hits = 0
+        self.misses = 0
+
+    def tree_hash(self, dirs=None):
+        """Content hash of the source tree; unchanged files reuse their stored digest"""
+        return hash_files(self.project_path, iter_source_files(self.project_path, dirs), self.digest_file)
+
+    def key(self, request, tree_hash):
+        """Cache key for a request's full parameters (model, max_tokens, system, tools, messages...) against a source tree"""
+        payload = json.dumps([request, tree_hash], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached response text, or None on a miss or expired entry"""
+        if not self.enabled:
+            return None
+
+        path = self.path_for(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                self.remove(path)
+                self.misses += 1
+                return None
+            with open(path, 'r') as f:
+                text = json.load(f)['text']
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return text
+
+    def put(self, key, text, stop_reason=None):
+        """Store a response and evict old entries if the cache is over budget
+
+        Truncated responses (stop_reason "max_tokens") are never stored, so a
+        partial answer is not replayed on the next run.
+        """
+        if not self.enabled:
+            return
+        if stop_reason in TRUNCATED_STOP_REASONS:
+            print("⚠️  Response was truncated - not caching it")
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.path_for(key) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'created': time.time(), 'text': text}, f)
+        os.replace(tmp_path, self.path_for(key))
+
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the oldest ones until under max size"""
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                self.remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.remove(path)
+            total -= size
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # another writer already evicted it
+
+    def get_or_create(self, request, create):
+        """Return cached text for this request and tree, or call create() -> (text, stop_reason) and cache it"""
+        if not self.enabled:
+            return create()[0]
+
+        key = self.key(request, self.tree_hash())
+        text = self.get(key)
+        if text is not None:
+            print("⚡ Using cached response (code and prompt unchanged)")
+            return text
+
+        text, stop_reason = create()
+        self.put(key, text, stop_reason)
+        return text
+
+    def summary(self):
+        return f"cache: {self.hits} hit(s), {self.misses} miss(es)"
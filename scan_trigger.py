@@ -0,0 +1,119 @@
+"""
+ScoutPulse Scan Trigger
+Decides when continuous mode should scan again: after a commit (HEAD moved) or
+a burst of file saves, once activity has been quiet for a debounce window and
+at least a minimum interval after the previous scan. A long fallback interval
+still fires when nothing was noticed
+"""
+
+import os
+import subprocess
+import time
+
+from completion_watcher import Observer, PollingSource, WatchdogSource
+
+
+class ScanTrigger:
+    def __init__(self, project_path, debounce_seconds=None, min_interval=None, max_interval=None, poll_interval=2):
+        self.project_path = project_path
+        if debounce_seconds is None:
+            debounce_seconds = float(os.getenv('SCAN_DEBOUNCE_SECONDS', '120'))
+        if min_interval is None:
+            min_interval = float(os.getenv('SCAN_MIN_INTERVAL_MINUTES', '30')) * 60
+        self.debounce_seconds = debounce_seconds
+        self.min_interval = min_interval
+        self.max_interval = max_interval  # seconds; None = only scan on activity
+        self.poll_interval = poll_interval
+        self.source = None
+        self.head = None
+        self.last_scan = None  # for min_interval: last scan that actually ran
+        self.last_check = time.monotonic()  # for max_interval: last time a scan was due
+        self.last_event = None
+        self.reasons = set()
+
+    def start(self):
+        """Begin watching source files and HEAD"""
+        self.stop()
+        if Observer is not None:
+            self.source = WatchdogSource(self.project_path, [])
+        else:
+            self.source = PollingSource(self.project_path, [])
+        self.head = self.current_head()
+
+    def stop(self):
+        if self.source:
+            self.source.close()
+            self.source = None
+
+    def current_head(self):
+        """Commit HEAD points at, or None outside a git checkout"""
+        try:
+            result = subprocess.run(
+                ['git', '-C', self.project_path, 'rev-parse', 'HEAD'],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def poll(self):
+        """Record any new commits or file saves"""
+        now = time.monotonic()
+        head = self.current_head()
+        if head != self.head:
+            self.head = head
+            self.last_event = now
+            self.reasons.add('commit')
+        if self.source.changes():
+            self.last_event = now
+            self.reasons.add('edits')
+
+    def due(self):
+        """Why a scan should run now, or None"""
+        now = time.monotonic()
+        since_scan = now - self.last_scan if self.last_scan is not None else float('inf')
+
+        if self.last_event is not None:
+            if now - self.last_event >= self.debounce_seconds and since_scan >= self.min_interval:
+                return " + ".join(sorted(self.reasons))
+        elif self.max_interval is not None and now - self.last_check >= self.max_interval:
+            return 'interval'
+        return None
+
+    def wait(self):
+        """Block until a scan is due; returns the reason ('commit', 'edits', 'commit + edits' or 'interval')"""
+        if self.source is None:
+            self.start()
+
+        print(f"👂 Waiting for commits or saves (debounce {self.debounce_seconds:g}s, "
+              f"min interval {self.min_interval / 60:g}m)...")
+        while True:
+            self.poll()
+            reason = self.due()
+            if reason:
+                return reason
+            time.sleep(self.poll_interval)
+
+    def mark_scanned(self, scanned=True, own_paths=()):
+        """Reset after a scan (or a skipped one); returns the reasons still pending
+
+        Saves of own_paths (the files the agent itself wrote) are dropped. Anything else
+        saved or committed while the scan ran stays pending and triggers the next scan.
+        """
+        now = time.monotonic()
+        own = {os.path.normpath(path) for path in own_paths}
+        reasons = set()
+        if self.source and {path for path in self.source.changes() if os.path.normpath(path) not in own}:
+            reasons.add('edits')
+        head = self.current_head()
+        if head != self.head:
+            reasons.add('commit')
+        self.head = head
+        self.last_check = now
+        if scanned:
+            self.last_scan = now
+        self.last_event = now if reasons else None
+        self.reasons = reasons
+        return reasons
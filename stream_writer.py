@@ -0,0 +1,138 @@
+"""
+ScoutPulse Stream Writer
+Atomic file writes (temp file beside the target, renamed over it on success)
+and incremental code-fence stripping for streamed Claude output
+"""
+
+import os
+import re
+import stat
+import time
+import uuid
+
+OPENING_FENCE = re.compile(r'^```[\w+.-]*[ \t]*\r?\n?$')
+
+
+class AtomicWriter:
+    """Writes to a hidden temp file next to `path`; commit() renames it over the target"""
+
+    def __init__(self, path):
+        self.path = path
+        directory, name = os.path.split(path)
+        os.makedirs(directory or '.', exist_ok=True)
+        self.tmp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+        self.file = open(self.tmp_path, 'x')
+        self.bytes = 0
+        self.done = False
+
+    def write(self, text):
+        self.file.write(text)
+        self.bytes += len(text.encode())
+
+    def commit(self):
+        """Flush to disk and atomically replace the target, keeping its permissions"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        if os.path.exists(self.path):
+            os.chmod(self.tmp_path, stat.S_IMODE(os.stat(self.path).st_mode))
+        os.replace(self.tmp_path, self.path)
+        self.done = True
+
+    def abort(self):
+        """Throw the partial output away and leave the target untouched"""
+        if self.done:
+            return
+        self.file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+        self.done = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.abort()  # no-op after a successful commit()
+        return False
+
+
+def write_atomic(path, content):
+    with AtomicWriter(path) as writer:
+        writer.write(content)
+        writer.commit()
+
+
+class FenceStripper:
+    """Drops a leading ```lang line and a trailing ``` line from text that arrives in chunks"""
+
+    def __init__(self):
+        self.started = False
+        self.partial = ''   # text after the last newline
+        self.held = []      # a possible closing fence plus any blank lines after it
+
+    def feed(self, chunk):
+        """Return the text that is safe to write now"""
+        self.partial += chunk
+        out = []
+        while '\n' in self.partial:
+            line, self.partial = self.partial.split('\n', 1)
+            line += '\n'
+            if not self.started:
+                self.started = True
+                if OPENING_FENCE.match(line):
+                    continue
+            out.append(self.push_line(line))
+        return ''.join(out)
+
+    def push_line(self, line):
+        if line.strip() == '```':
+            flushed = ''.join(self.held)
+            self.held = [line]
+            return flushed
+        if self.held and not line.strip():
+            self.held.append(line)
+            return ''
+        flushed = ''.join(self.held) + line
+        self.held = []
+        return flushed
+
+    def finish(self):
+        """Return whatever is left, minus a closing fence at the very end"""
+        tail = self.partial
+        self.partial = ''
+        if not self.started and OPENING_FENCE.match(tail):
+            return ''
+        if tail.strip() == '```':
+            flushed = ''.join(self.held)
+            self.held = []
+            return flushed
+        if self.held and self.held[0].strip() == '```' and not tail.strip():
+            self.held = []
+            return ''
+        flushed = ''.join(self.held) + tail
+        self.held = []
+        return flushed
+
+
+class StreamProgress:
+    """Prints bytes and approximate tokens received, at most every `interval` seconds"""
+
+    def __init__(self, label, interval=2):
+        self.label = label
+        self.interval = interval
+        self.chars = 0
+        self.bytes = 0
+        self.last = time.monotonic()
+
+    def update(self, text):
+        self.chars += len(text)
+        self.bytes += len(text.encode())
+        now = time.monotonic()
+        if now - self.last >= self.interval:
+            self.last = now
+            self.show()
+
+    def show(self):
+        print(f"   ✍️  {self.label}: {self.bytes:,} bytes, ~{self.chars // 4:,} tokens")
@@ -0,0 +1,180 @@
+"""
+ScoutPulse Task Extraction
+Audits report issues through a forced `report_issues` tool call, so tasks come
+back as validated JSON in the audit response itself. Near-duplicate tasks that
+several categories raise for the same file are collapsed with MinHash
+"""
+
+import hashlib
+import json
+import random
+import re
+
+from fix_scheduler import PRIORITY_ORDER, normalize_path, priority_rank
+
+REPORT_ISSUES_TOOL = {
+    "name": "report_issues",
+    "description": "Report every concrete issue found by this audit, one entry per issue.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "issues": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "priority": {"type": "string", "enum": list(PRIORITY_ORDER)},
+                        "file": {
+                            "type": "string",
+                            "description": "Path relative to the project root, e.g. app/(dashboard)/player/page.tsx",
+                        },
+                        "issue": {"type": "string", "description": "What is wrong, in one or two sentences"},
+                        "action": {
+                            "type": "string",
+                            "description": "Self-contained instruction to fix it, specific enough to hand to an AI coding assistant",
+                        },
+                    },
+                    "required": ["priority", "file", "issue", "action"],
+                },
+            },
+        },
+        "required": ["issues"],
+    },
+}
+
+TOOL_CHOICE = {"type": "tool", "name": "report_issues"}
+MAX_REPORT_TOKENS = 16000  # ceiling when a truncated report is retried with a larger budget
+
+ISSUES_FORMAT = """
+# OUTPUT FORMAT
+Report your findings by calling the report_issues tool exactly once, with every issue you found.
+If there are no issues, call it with an empty list.
+"""
+
+
+def is_truncated(response):
+    """A report cut off at max_tokens holds a partial issue list and must not be used or cached"""
+    return getattr(response, 'stop_reason', None) == 'max_tokens'
+
+
+def response_text(response):
+    """The audit result as text: the report_issues input as JSON, or plain text if no tool was called"""
+    for block in response.content:
+        if getattr(block, 'type', None) == 'tool_use' and block.name == REPORT_ISSUES_TOOL['name']:
+            return json.dumps(block.input, indent=2)
+    return "".join(getattr(block, 'text', '') for block in response.content)
+
+
+def validate_issue(raw, category):
+    """Normalise one reported issue into a task, or None if it is unusable"""
+    if not isinstance(raw, dict):
+        return None
+    file = str(raw.get('file') or '').strip()
+    issue = str(raw.get('issue') or '').strip()
+    action = str(raw.get('action') or '').strip()
+    priority = str(raw.get('priority') or '').strip().upper()
+    if not file or not issue:
+        return None
+    if priority not in PRIORITY_ORDER:
+        priority = 'MEDIUM'
+    return {
+        'priority': priority,
+        'file': normalize_path(file),
+        'issue': issue,
+        'action': action or issue,
+        'category': category,
+    }
+
+
+def parse_pipe_lines(text):
+    """Fallback for plain-text audits: PRIORITY | FILE | ISSUE | ACTION lines"""
+    issues = []
+    for line in text.split('\n'):
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) >= 4 and parts[0].upper() in PRIORITY_ORDER:
+            issues.append({'priority': parts[0], 'file': parts[1], 'issue': parts[2], 'action': parts[3]})
+    return issues
+
+
+def tasks_from_audits(audits, threshold=0.5):
+    """Validated, de-duplicated tasks from (category, audit text) pairs, most urgent first"""
+    tasks = []
+    for category, text in audits:
+        try:
+            issues = json.loads(text).get('issues', [])
+        except (ValueError, AttributeError):
+            issues = parse_pipe_lines(text)
+        for raw in issues:
+            task = validate_issue(raw, category)
+            if task:
+                tasks.append(task)
+
+    tasks.sort(key=lambda t: priority_rank(t['priority']))
+    unique = deduplicate(tasks, threshold)
+    if len(unique) < len(tasks):
+        print(f"🧹 Collapsed {len(tasks) - len(unique)} near-duplicate tasks")
+    return unique
+
+
+def shingles(text, size=5):
+    """Character shingles of the normalised text"""
+    text = " ".join(re.findall(r'[a-z0-9]+', text.lower()))
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    PRIME = (1 << 61) - 1
+
+    def __init__(self, num_perm=64, seed=7):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, self.PRIME), rng.randrange(0, self.PRIME)) for _ in range(num_perm)]
+
+    def signature(self, items):
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), 'big') for s in items]
+        return tuple(min((a * h + b) % self.PRIME for h in hashes) for a, b in self.params)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def deduplicate(tasks, threshold=0.5, num_perm=64, bands=16):
+    """Collapse tasks on the same file whose issue text is near-identical
+
+    Signatures are bucketed per file with LSH banding, so only likely
+    matches are compared. The first (most urgent) task of a group is kept
+    and records the other categories that raised it.
+    """
+    hasher = MinHasher(num_perm)
+    rows = num_perm // bands
+    buckets = {}
+    kept = []
+
+    for task in tasks:
+        signature = hasher.signature(shingles(task['issue']))
+        band_keys = [(task['file'], b, signature[b * rows:(b + 1) * rows]) for b in range(bands)]
+
+        match = None
+        for key in band_keys:
+            for index in buckets.get(key, []):
+                if similarity(signature, kept[index][1]) >= threshold:
+                    match = index
+                    break
+            if match is not None:
+                break
+
+        if match is None:
+            for key in band_keys:
+                buckets.setdefault(key, []).append(len(kept))
+            kept.append((task, signature))
+            continue
+
+        original = kept[match][0]
+        original['duplicates'] = original.get('duplicates', 0) + 1
+        categories = set(filter(None, original.get('category', '').split(', '))) | {task['category']}
+        original['category'] = ", ".join(sorted(categories))
+
+    return [task for task, _ in kept]
@@ -0,0 +1,51 @@
+"""AssemblyLine quality gates: a rerun on an unchanged tree is served from the gate cache"""
+
+import sys
+
+import pytest
+
+from assembly_line import AssemblyLine
+from quality_gates import gate
+
+
+@pytest.fixture
+def project(tmp_path):
+    for name in ("package.json", "next.config.js", ".env.local"):
+        (tmp_path / name).write_text("{}")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "page.tsx").write_text("export default function Page() { return null }\n")
+    return tmp_path
+
+
+def make_line(project, monkeypatch):
+    line = AssemblyLine(str(project))
+    # Stand-ins for npm run build / tsc / npm test / npm run lint
+    monkeypatch.setattr(line, "quality_gates", lambda: [
+        gate(name, [sys.executable, "-c", "pass"], timeout=30) for name in ("build", "types", "tests", "lint")
+    ])
+    return line
+
+
+def test_second_run_on_an_unchanged_tree_is_cached(project, monkeypatch, capsys):
+    assert make_line(project, monkeypatch).start_assembly_line()
+    assert (project / "ASSEMBLY_LINE_PLAN.json").exists()
+    capsys.readouterr()
+
+    # The plan written by the first run is not part of the tree the gates are keyed on
+    assert make_line(project, monkeypatch).start_assembly_line()
+
+    output = capsys.readouterr().out
+    for name in ("build", "types", "tests", "lint"):
+        assert f"⚡ {name} unchanged since" in output
+    assert "Running build" not in output
+
+
+def test_source_edit_reruns_the_gates(project, monkeypatch, capsys):
+    make_line(project, monkeypatch).start_assembly_line()
+    (project / "app" / "page.tsx").write_text("export default function Page() { return <main /> }\n")
+    capsys.readouterr()
+
+    make_line(project, monkeypatch).start_assembly_line()
+
+    assert "unchanged since" not in capsys.readouterr().out
@@ -0,0 +1,66 @@
+"""BatchRunner against the local batch stub: submit, poll, resume after a restart, collect"""
+
+import anthropic
+import pytest
+
+from batch_runner import BatchRunner
+from batch_stub_server import BatchStubServer
+
+REQUESTS = [
+    (custom_id, {"model": "claude-sonnet-4-20250514", "max_tokens": 100,
+                 "messages": [{"role": "user", "content": f"audit {custom_id}"}]})
+    for custom_id in ("audit-ui", "audit-errored", "audit-expired")
+]
+
+
+@pytest.fixture
+def server():
+    server = BatchStubServer(polls_until_end=2).start()
+    yield server
+    server.stop()
+
+
+def make_runner(server, project_path):
+    client = anthropic.Anthropic(api_key="test", base_url=server.url, max_retries=0)
+    return BatchRunner(client, str(project_path), poll_interval=0)
+
+
+def test_run_collects_succeeded_and_reports_the_rest(server, tmp_path, capsys):
+    messages = make_runner(server, tmp_path).run('audits', REQUESTS)
+
+    assert list(messages) == ["audit-ui"]
+    assert messages["audit-ui"].content[0].text == "stub response to audit-ui"
+    output = capsys.readouterr().out
+    assert "audit-errored errored: stub error for audit-errored" in output
+    assert "audit-expired expired" in output
+    assert make_runner(server, tmp_path).load_state() == {}  # finished jobs are forgotten
+
+
+def test_restart_resumes_the_saved_batch(server, tmp_path):
+    batch_id = make_runner(server, tmp_path).submit('audits', REQUESTS)
+
+    # A new process with the same requests picks the batch up instead of paying for it again
+    messages = make_runner(server, tmp_path).run('audits', REQUESTS)
+
+    assert server.created == 1
+    assert batch_id in server.batches
+    assert list(messages) == ["audit-ui"]
+
+
+def test_changed_requests_are_not_resumed(server, tmp_path):
+    make_runner(server, tmp_path).submit('audits', REQUESTS)
+
+    make_runner(server, tmp_path).run('audits', REQUESTS[:1])
+
+    assert server.created == 2
+
+
+def test_missing_saved_batch_is_resubmitted(server, tmp_path):
+    runner = make_runner(server, tmp_path)
+    runner.submit('audits', REQUESTS)
+    server.batches.clear()  # e.g. the batch was deleted or the saved ID is from another account
+
+    messages = make_runner(server, tmp_path).run('audits', REQUESTS)
+
+    assert server.created == 2
+    assert list(messages) == ["audit-ui"]
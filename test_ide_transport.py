@@ -0,0 +1,67 @@
+"""QueueTransport round trip: the agent queues prompts, the consumer claims and handles them"""
+
+import threading
+
+from ide_queue_consumer import QueueConsumer
+from ide_transport import QueueTransport
+
+
+def test_prompts_are_handled_in_order(tmp_path):
+    transport = QueueTransport(str(tmp_path))
+    seen = []
+    consumer = QueueConsumer(transport, handler=lambda message: (seen.append(message) or True, "done"))
+
+    transport.open_project(str(tmp_path))
+    transport.send("first prompt")
+    first = transport.last_id
+    transport.send("second prompt")
+    second = transport.last_id
+    assert transport.status(second) == 'pending'
+
+    assert consumer.run(once=True) == 3
+    assert [m['action'] for m in seen] == ['open', 'send', 'send']
+    assert [m.get('text') for m in seen[1:]] == ["first prompt", "second prompt"]
+    assert transport.status(first) == 'ok'
+    assert transport.status(second) == 'ok'
+    assert consumer.process_one() is None
+
+
+def test_command_runs_in_project_with_prompt_on_stdin(tmp_path):
+    transport = QueueTransport(str(tmp_path))
+    consumer = QueueConsumer(transport, command="cat > received.txt && echo applied")
+
+    transport.send("add a loading state")
+    consumer.process_one()
+
+    assert (tmp_path / "received.txt").read_text() == "add a loading state"
+    assert transport.status(transport.last_id) == 'ok'
+
+
+def test_failing_command_is_reported(tmp_path):
+    transport = QueueTransport(str(tmp_path))
+    consumer = QueueConsumer(transport, command="echo no agent >&2; exit 3")
+
+    transport.send("fix it")
+    consumer.process_one()
+
+    assert transport.wait(transport.last_id, timeout=1) == 'error'
+
+
+def test_wait_returns_once_a_background_consumer_finishes(tmp_path):
+    transport = QueueTransport(str(tmp_path))
+    consumer = QueueConsumer(QueueTransport(str(tmp_path)), handler=lambda message: (True, ""))
+
+    transport.send("prompt")
+    worker = threading.Thread(target=consumer.run, kwargs={'poll_interval': 0.05, 'once': True})
+    worker.start()
+
+    assert transport.wait(transport.last_id, timeout=5, poll_interval=0.05) == 'ok'
+    worker.join()
+
+
+def test_each_message_is_claimed_once(tmp_path):
+    transport = QueueTransport(str(tmp_path))
+    transport.send("only once")
+
+    assert QueueTransport(str(tmp_path)).claim() is not None
+    assert QueueTransport(str(tmp_path)).claim() is None
@@ -0,0 +1,355 @@
+"""
+ScoutPulse Tool Executor
+Runs the bash and str_replace_editor tool calls of a Computer Use turn locally.
+Calls from the same turn run concurrently unless they touch the same path, in
+which case they run in the order the model emitted them; a bash command whose
+paths cannot be seen waits for everything before it and blocks everything after.
+
+Bash commands run with a scrubbed environment and a timeout, confined so they
+can only write to the project directory and a private scratch directory: under
+bubblewrap when `bwrap` is installed (the whole filesystem read-only bound),
+otherwise in an `unshare` mount namespace where every mount (/, /tmp, /home,
+/dev/shm...) is remounted read-only. Where neither works, bash calls are refused
+unless BASH_TOOL_UNCONFINED=1 is set. BASH_TOOL_NETWORK=0 also cuts network
+access. Close the executor to remove the scratch directory
+"""
+
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from completion_watcher import paths_in
+from stream_writer import write_atomic
+
+MAX_OUTPUT_CHARS = 16000
+SAFE_ENV_KEYS = ('PATH', 'HOME', 'LANG', 'LC_ALL', 'TERM', 'USER', 'SHELL', 'NODE_ENV')
+BARRIER = '*'  # resource of a call that may touch anything
+# Runs inside the unshare namespace: make the writable directories their own mounts, freeze every
+# other mount, then exec the command. Any mount that cannot be frozen aborts before the command runs
+UNSHARE_SETUP = r"""
+import os, re, subprocess, sys
+root, scratch, command = sys.argv[1:4]
+for path in (root, scratch):
+    subprocess.run(['mount', '--rbind', path, path], check=True)
+with open('/proc/self/mountinfo') as f:
+    mounts = [line.split() for line in f]
+for fields in mounts:
+    target = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), fields[4])
+    options = fields[5].split(',')
+    if 'ro' in options or any(target == path or target.startswith(path + '/') for path in (root, scratch)):
+        continue
+    # Keep the flags the parent namespace locked, or the remount is refused
+    flags = ['remount', 'bind', 'ro'] + [o for o in options if o in ('nosuid', 'nodev', 'noexec')]
+    subprocess.run(['mount', '-o', ','.join(flags), target], check=True)
+os.chdir(root)
+os.execvp('bash', ['bash', '-c', command])
+"""
+
+
+class ToolError(Exception):
+    """A tool call that should be reported back to the model as an error"""
+
+
+def truncate(text, limit=MAX_OUTPUT_CHARS):
+    if len(text) <= limit:
+        return text
+    return text[:limit // 2] + f"\n... ({len(text) - limit} characters omitted) ...\n" + text[-limit // 2:]
+
+
+def unshare_argv(root, scratch, command, network=True):
+    argv = ['unshare', '--user', '--map-root-user', '--mount', '--fork', '--kill-child']
+    if not network:
+        argv.append('--net')
+    return argv + [sys.executable, '-c', UNSHARE_SETUP, root, scratch, command]
+
+
+def unshare_works():
+    """Whether the unshare setup can freeze every mount here and still write to the project"""
+    if not shutil.which('unshare'):
+        return False
+    root = tempfile.mkdtemp(prefix='scoutpulse-probe-')
+    try:
+        result = subprocess.run(
+            unshare_argv(root, root, 'touch "$PWD/ok" && ! touch /ok /dev/shm/ok 2>/dev/null'),
+            stdin=subprocess.DEVNULL, capture_output=True, timeout=10
+        )
+        return result.returncode == 0 and os.path.exists(os.path.join(root, 'ok'))
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def detect_confinement():
+    if shutil.which('bwrap'):
+        return 'bwrap'
+    if unshare_works():
+        return 'unshare'
+    return None
+
+
+class BashTool:
+    """One-shot `bash -c` per call: no shared shell state, so calls can run side by side"""
+
+    def __init__(self, cwd, timeout=None, confinement=None, network=None):
+        if timeout is None:
+            timeout = float(os.getenv('BASH_TOOL_TIMEOUT', '120'))
+        if network is None:
+            network = os.getenv('BASH_TOOL_NETWORK', '1') != '0'
+        self.cwd = os.path.realpath(cwd)
+        self.timeout = timeout
+        self.network = network
+        self.confinement = confinement if confinement is not None else detect_confinement()
+        self.unconfined_ok = os.getenv('BASH_TOOL_UNCONFINED') == '1'
+        # Writable scratch space: /tmp itself is read-only under unshare
+        self.scratch = tempfile.mkdtemp(prefix='scoutpulse-bash-')
+        # API keys and other secrets stay out of model-run commands
+        self.env = {key: os.environ[key] for key in SAFE_ENV_KEYS if key in os.environ}
+        self.env['TMPDIR'] = self.scratch
+        if self.confinement:
+            print(f"🔒 Bash tool confined with {self.confinement} (writable: project, scratch)")
+        elif self.unconfined_ok:
+            print("⚠️  Bash tool is NOT confined (BASH_TOOL_UNCONFINED=1): commands can write anywhere")
+
+    def argv(self, command):
+        """The command line that runs `command` under the chosen confinement"""
+        if self.confinement == 'bwrap':
+            argv = [
+                'bwrap', '--ro-bind', '/', '/', '--dev', '/dev', '--proc', '/proc',
+                '--bind', self.cwd, self.cwd, '--bind', self.scratch, self.scratch,
+                '--unshare-pid', '--die-with-parent', '--chdir', self.cwd,
+            ]
+            if not self.network:
+                argv.append('--unshare-net')
+            return argv + ['bash', '-c', command]
+        if self.confinement == 'unshare':
+            return unshare_argv(self.cwd, self.scratch, command, self.network)
+        if self.unconfined_ok:
+            return ['bash', '-c', command]
+        raise ToolError(
+            "bash is disabled: no confinement available (install bubblewrap, allow unprivileged "
+            "user namespaces, or set BASH_TOOL_UNCONFINED=1 to run commands unconfined)"
+        )
+
+    def run(self, tool_input):
+        if tool_input.get('restart'):
+            return "Shell restarted (each command already runs in a fresh shell)."
+        command = tool_input.get('command')
+        if not command:
+            raise ToolError("No command given")
+
+        process = subprocess.Popen(
+            self.argv(command),
+            cwd=self.cwd,
+            env=self.env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            start_new_session=True,  # so a timeout kills the whole process group
+        )
+        try:
+            output, _ = process.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            output, _ = process.communicate()
+            raise ToolError(f"Command timed out after {self.timeout:g}s\n{truncate(output or '')}")
+
+        output = truncate(output or '')
+        if process.returncode != 0:
+            raise ToolError(f"Exit code {process.returncode}\n{output}")
+        return output or "(no output)"
+
+    def close(self):
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+
+class EditorTool:
+    """The str_replace_editor commands, confined to the project directory"""
+
+    def __init__(self, root):
+        self.root = os.path.realpath(root)
+        self.history = {}  # path -> previous contents, for undo_edit
+        self.lock = threading.Lock()
+
+    def resolve(self, path):
+        if not path:
+            raise ToolError("No path given")
+        full_path = os.path.realpath(path if os.path.isabs(path) else os.path.join(self.root, path))
+        if full_path != self.root and not full_path.startswith(self.root + os.sep):
+            raise ToolError(f"{path} is outside the project")
+        return full_path
+
+    def read(self, full_path):
+        try:
+            with open(full_path, 'r') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise ToolError(f"{full_path} does not exist")
+        except (OSError, UnicodeDecodeError) as e:
+            raise ToolError(f"Cannot read {full_path}: {e}")
+
+    def write(self, full_path, content):
+        previous = None
+        if os.path.exists(full_path):
+            previous = self.read(full_path)
+        with self.lock:
+            self.history.setdefault(full_path, []).append(previous)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        write_atomic(full_path, content)
+
+    def run(self, tool_input):
+        command = tool_input.get('command')
+        full_path = self.resolve(tool_input.get('path'))
+
+        if command == 'view':
+            return self.view(full_path, tool_input.get('view_range'))
+
+        if command == 'create':
+            if 'file_text' not in tool_input:
+                raise ToolError("create needs file_text")
+            self.write(full_path, tool_input['file_text'])
+            return f"Created {full_path}"
+
+        if command == 'str_replace':
+            content = self.read(full_path)
+            old, new = tool_input.get('old_str') or '', tool_input.get('new_str') or ''
+            count = content.count(old) if old else 0
+            if count != 1:
+                raise ToolError(f"old_str must match exactly once in {full_path}, found {count} matches")
+            self.write(full_path, content.replace(old, new, 1))
+            return f"Edited {full_path}"
+
+        if command == 'insert':
+            lines = self.read(full_path).split('\n')
+            line = tool_input.get('insert_line')
+            if not isinstance(line, int) or not 0 <= line <= len(lines):
+                raise ToolError(f"insert_line must be between 0 and {len(lines)}")
+            lines[line:line] = (tool_input.get('new_str') or '').split('\n')
+            self.write(full_path, '\n'.join(lines))
+            return f"Inserted text after line {line} of {full_path}"
+
+        if command == 'undo_edit':
+            with self.lock:
+                versions = self.history.get(full_path)
+                previous = versions.pop() if versions else False
+            if previous is False:
+                raise ToolError(f"No edits to undo for {full_path}")
+            if previous is None:
+                os.remove(full_path)
+                return f"Removed {full_path} (it was created by the last edit)"
+            write_atomic(full_path, previous)
+            return f"Restored the previous version of {full_path}"
+
+        raise ToolError(f"Unknown command {command!r}")
+
+    def view(self, full_path, view_range=None):
+        if os.path.isdir(full_path):
+            entries = []
+            for current, dirs, files in os.walk(full_path):
+                dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d != 'node_modules')
+                depth = os.path.relpath(current, full_path).count(os.sep)
+                if depth >= 2:
+                    dirs[:] = []
+                for name in sorted(files):
+                    entries.append(os.path.relpath(os.path.join(current, name), full_path))
+            return truncate("\n".join(entries) or "(empty directory)")
+
+        lines = self.read(full_path).split('\n')
+        start, end = 1, len(lines)
+        if view_range:
+            start = max(1, view_range[0])
+            end = len(lines) if view_range[1] == -1 else min(len(lines), view_range[1])
+        return truncate("\n".join(f"{n:6}\t{lines[n - 1]}" for n in range(start, end + 1)))
+
+
+class ToolExecutor:
+    def __init__(self, project_path, max_workers=None):
+        if max_workers is None:
+            max_workers = int(os.getenv('TOOL_WORKERS', '4'))
+        self.project_path = project_path
+        self.tools = {
+            'bash': BashTool(project_path),
+            'str_replace_editor': EditorTool(project_path),
+        }
+        self.max_workers = max_workers
+        self.latencies = {}  # tool name -> [seconds]
+        self.lock = threading.Lock()
+
+    def resources(self, block):
+        """What a call touches; calls sharing a resource run in order"""
+        if block.name == 'str_replace_editor':
+            try:
+                return {self.tools['str_replace_editor'].resolve(block.input.get('path'))}
+            except ToolError:
+                return {'editor'}
+        if block.name == 'bash':
+            # The files a command names; one that names none (npm test, git stash) may touch anything
+            root = self.tools['str_replace_editor'].root
+            touched = set()
+            for path in paths_in(block.input.get('command', '')):
+                absolute = '/' + path
+                touched.add(os.path.realpath(absolute if absolute.startswith(root + os.sep) else os.path.join(root, path)))
+            return touched or {BARRIER}
+        return {block.name}  # e.g. the computer: one screen, one call at a time
+
+    def execute(self, block, waits):
+        for future in waits:
+            future.result()
+
+        start = time.monotonic()
+        is_error = False
+        tool = self.tools.get(block.name)
+        try:
+            if tool is None:
+                raise ToolError(f"The {block.name} tool is not available in this environment")
+            content = tool.run(block.input or {})
+        except ToolError as e:
+            content, is_error = str(e), True
+        except Exception as e:
+            content, is_error = f"{type(e).__name__}: {e}", True
+        elapsed = time.monotonic() - start
+
+        with self.lock:
+            self.latencies.setdefault(block.name, []).append(elapsed)
+        print(f"   {'❌' if is_error else '✅'} {block.name} ({elapsed:.2f}s)")
+        return {"type": "tool_result", "tool_use_id": block.id, "content": content, "is_error": is_error}
+
+    def run(self, blocks):
+        """Execute one turn's tool_use blocks; results come back in the same order"""
+        if not blocks:
+            return []
+        last_user = {}  # resource -> future of the latest call that touched it
+        futures = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(blocks))) as pool:
+            for block in blocks:
+                touched = self.resources(block)
+                if BARRIER in touched:
+                    waits = set(futures)  # everything before it
+                else:
+                    waits = {last_user[r] for r in touched | {BARRIER} if r in last_user}
+                # Submitted in order, so every call we wait on is already running or done
+                future = pool.submit(self.execute, block, list(waits))
+                if BARRIER in touched:
+                    last_user = {BARRIER: future}  # later calls only need to wait for the barrier
+                else:
+                    for r in touched:
+                        last_user[r] = future
+                futures.append(future)
+            return [future.result() for future in futures]
+
+    def close(self):
+        """Remove the bash tool's scratch directory"""
+        self.tools['bash'].close()
+
+    def summary(self):
+        parts = []
+        for name, times in sorted(self.latencies.items()):
+            parts.append(f"{name}: {len(times)} call(s), avg {sum(times) / len(times):.2f}s, max {max(times):.2f}s")
+        return "; ".join(parts)
@@ -0,0 +1,253 @@
+"""
+ScoutPulse Type Check Verifier
+Keeps one tsserver process running for the whole session, so checking a
+rewritten file takes well under a second instead of a cold `tsc --noEmit`.
+A write that adds type errors to the file it touched is rolled back
+"""
+
+import atexit
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import Counter
+
+from stream_writer import write_atomic
+
+TS_EXTENSIONS = ('.ts', '.tsx')
+
+
+class TSServerError(Exception):
+    """Raised when tsserver dies, times out or rejects a request"""
+
+
+class TSServer:
+    """Minimal tsserver client: Content-Length framed JSON over stdio"""
+
+    def __init__(self, project_path, timeout=60):
+        self.project_path = os.path.abspath(project_path)
+        self.timeout = timeout
+        self.process = None
+        self.closed = True
+        self.seq = 0
+        self.pending = {}  # request seq -> [Event, response]
+        self.lock = threading.Lock()
+        self.opened = set()
+
+    def script_path(self):
+        return os.path.join(self.project_path, 'node_modules', 'typescript', 'lib', 'tsserver.js')
+
+    def available(self):
+        return shutil.which('node') is not None and os.path.isfile(self.script_path())
+
+    def start(self):
+        if self.process and self.process.poll() is None and not self.closed:
+            return
+        self.stop()
+        self.process = subprocess.Popen(
+            ['node', self.script_path(), '--disableAutomaticTypingAcquisition', '--suppressDiagnosticEvents'],
+            cwd=self.project_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self.closed = False
+        self.opened = set()
+        threading.Thread(target=self.read_loop, args=(self.process,), daemon=True).start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+        self.process = None
+
+    def read_loop(self, process):
+        """Read framed messages and hand responses to whoever is waiting for them"""
+        stdout = process.stdout
+        while True:
+            line = stdout.readline()
+            if not line:
+                break
+            if not line.startswith(b'Content-Length:'):
+                continue
+            length = int(line.split(b':', 1)[1])
+            stdout.readline()  # blank line after the header
+            message = json.loads(stdout.read(length))
+
+            if message.get('type') != 'response':
+                continue  # events and telemetry
+            with self.lock:
+                waiter = self.pending.pop(message.get('request_seq'), None)
+            if waiter:
+                waiter[1] = message
+                waiter[0].set()
+
+        with self.lock:
+            if self.process is process:
+                self.closed = True
+            for waiter in self.pending.values():
+                waiter[0].set()  # wake everyone up; they'll see no response
+            self.pending.clear()
+
+    def request(self, command, arguments):
+        if not self.process or self.closed or self.process.poll() is not None:
+            raise TSServerError("tsserver is not running")
+
+        with self.lock:
+            self.seq += 1
+            seq = self.seq
+            waiter = [threading.Event(), None]
+            self.pending[seq] = waiter
+            payload = {"seq": seq, "type": "request", "command": command, "arguments": arguments}
+            try:
+                self.process.stdin.write((json.dumps(payload) + '\n').encode())
+                self.process.stdin.flush()
+            except OSError as e:
+                self.pending.pop(seq, None)
+                raise TSServerError(f"tsserver pipe closed: {e}")
+
+        if not waiter[0].wait(self.timeout):
+            with self.lock:
+                self.pending.pop(seq, None)
+            raise TSServerError(f"tsserver timed out on {command}")
+
+        response = waiter[1]
+        if response is None:
+            raise TSServerError("tsserver exited")
+        if not response.get('success', False):
+            raise TSServerError(f"{command} failed: {response.get('message')}")
+        return response.get('body')
+
+    def diagnostics(self, rel_path):
+        """Syntactic + semantic errors for one file, read fresh from disk"""
+        path = os.path.join(self.project_path, rel_path)
+        if path in self.opened:
+            self.request('reload', {"file": path, "tmpfile": path})
+        else:
+            self.request('open', {"file": path, "projectRootPath": self.project_path})
+            self.opened.add(path)
+
+        errors = []
+        for command in ('syntacticDiagnosticsSync', 'semanticDiagnosticsSync'):
+            for diag in self.request(command, {"file": path}) or []:
+                if diag.get('category', 'error') == 'error':
+                    errors.append({
+                        'line': diag.get('start', {}).get('line'),
+                        'code': diag.get('code'),
+                        'text': diag.get('text', ''),
+                    })
+        return errors
+
+    def close(self, rel_path):
+        path = os.path.join(self.project_path, rel_path)
+        if path in self.opened:
+            self.opened.discard(path)
+            self.request('close', {"file": path})
+
+
+class TypeCheckVerifier:
+    def __init__(self, project_path, enabled=True):
+        self.project_path = project_path
+        self.server = TSServer(project_path)
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.warned = False
+
+    def usable(self):
+        if not self.enabled:
+            return False
+        if not self.server.available():
+            if not self.warned:
+                print("⚠️  node_modules/typescript not found - skipping type verification")
+                self.warned = True
+            return False
+        return True
+
+    def warm_up(self):
+        """Start tsserver and load the project in the background, so the first check is fast"""
+        if not self.usable():
+            return
+
+        def load():
+            with self.lock:
+                try:
+                    self.server.start()
+                    self.server.diagnostics(os.path.join('app', 'layout.tsx'))
+                except (TSServerError, OSError):
+                    pass  # the first real check will report it
+
+        threading.Thread(target=load, daemon=True).start()
+
+    def guarded_write(self, rel_path, write):
+        """Run write(), then roll the file back if it added type errors; True if the write was kept"""
+        rel_path = rel_path.lstrip('/')
+        if not rel_path.endswith(TS_EXTENSIONS) or not self.usable():
+            write()
+            return True
+
+        full_path = os.path.join(self.project_path, rel_path)
+
+        # One check at a time, so a parallel fix to an imported file can't skew the comparison
+        with self.lock:
+            try:
+                with open(full_path, 'r') as f:
+                    previous = f.read()
+            except OSError:
+                previous = None
+
+            try:
+                self.server.start()
+                before = self.server.diagnostics(rel_path) if previous is not None else []
+            except (TSServerError, OSError) as e:
+                print(f"⚠️  Type check unavailable ({e}) - keeping {rel_path} unverified")
+                self.server.stop()
+                write()
+                return True
+
+            write()
+
+            start = time.monotonic()
+            try:
+                after = self.server.diagnostics(rel_path)
+            except (TSServerError, OSError) as e:
+                print(f"⚠️  Type check failed ({e}) - keeping {rel_path} unverified")
+                self.server.stop()
+                return True
+
+            known = Counter((d['code'], d['text']) for d in before)
+            new_errors = []
+            for diag in after:
+                key = (diag['code'], diag['text'])
+                if known[key]:
+                    known[key] -= 1
+                else:
+                    new_errors.append(diag)
+
+            elapsed = time.monotonic() - start
+            if not new_errors:
+                print(f"🧪 {rel_path}: no new type errors ({elapsed:.2f}s)")
+                return True
+
+            print(f"❌ {rel_path}: {len(new_errors)} new type error(s), rolling back")
+            for diag in new_errors[:5]:
+                print(f"   line {diag['line']}: TS{diag['code']} {diag['text']}")
+
+            try:
+                if previous is None:
+                    os.remove(full_path)
+                    self.server.close(rel_path)
+                else:
+                    write_atomic(full_path, previous)
+                    self.server.diagnostics(rel_path)  # resync tsserver with the restored file
+            except (TSServerError, OSError):
+                self.server.stop()
+            return False
+
+    def stop(self):
+        self.server.stop()